@@ -0,0 +1,373 @@
+﻿using System;
+using System.Collections.Generic;
+using System.Globalization;
+using System.Linq;
+using System.Reflection;
+
+namespace IglooCastle.CLI
+{
+	/// <summary>
+	/// Resolves the <c>cref</c> attributes of XML comments, e.g. <c>T:IglooCastle.CLI.Documentation</c>
+	/// or <c>M:IglooCastle.CLI.Documentation.Find(System.Type)</c>, to the elements they refer to,
+	/// and prints the links to them.
+	/// </summary>
+	/// <remarks>
+	/// The types of the documentation and their constructors, methods, properties and enum members
+	/// are indexed by documentation ID once, when the first cref is resolved.
+	/// So are their operators and explicit interface implementations, which have no pages of their own.
+	/// Every cref is resolved and printed at most once per run; crefs that can't be resolved are remembered too,
+	/// so they are reported once, by whoever calls <see cref="TakeUnresolved"/>. Several threads can resolve crefs at once.
+	/// </remarks>
+	public sealed class CrefResolver
+	{
+		private const BindingFlags DeclaredMembers =
+			BindingFlags.Instance | BindingFlags.Static | BindingFlags.Public | BindingFlags.NonPublic | BindingFlags.DeclaredOnly;
+
+		private readonly Documentation _documentation;
+		private readonly object _lock = new object();
+		private Dictionary<string, object> _index;
+		private readonly HashSet<object> _withoutPage = new HashSet<object>();
+		private readonly Dictionary<string, object> _resolved = new Dictionary<string, object>(StringComparer.Ordinal);
+		private readonly Dictionary<string, string> _printed = new Dictionary<string, string>(StringComparer.Ordinal);
+		private readonly List<string> _unresolved = new List<string>();
+
+		/// <summary>
+		/// Creates an instance of this class.
+		/// </summary>
+		/// <param name="documentation">The documentation whose elements the crefs refer to.</param>
+		public CrefResolver(Documentation documentation)
+		{
+			_documentation = documentation;
+		}
+
+		/// <summary>
+		/// Gets the element that the given cref refers to.
+		/// </summary>
+		/// <param name="cref">The cref, which is a documentation ID.</param>
+		/// <returns>
+		/// A <see cref="TypeElement"/>, <see cref="ConstructorElement"/>, <see cref="MethodElement"/>,
+		/// <see cref="PropertyElement"/> or <see cref="EnumMemberElement"/>, or <c>null</c> if the cref can't be resolved.
+		/// </returns>
+		public object Resolve(string cref)
+		{
+			lock (_lock)
+			{
+				object element;
+				if (!_resolved.TryGetValue(cref, out element))
+				{
+					element = Lookup(cref);
+					if (element == null)
+					{
+						_unresolved.Add(cref);
+					}
+
+					_resolved.Add(cref, element);
+				}
+
+				return element;
+			}
+		}
+
+		/// <summary>
+		/// Gets the HTML of the link to the element that the given cref refers to.
+		/// </summary>
+		/// <param name="cref">The cref, which is a documentation ID.</param>
+		/// <returns>The HTML, or <c>null</c> if the cref can't be resolved.</returns>
+		public string Print(string cref)
+		{
+			lock (_lock)
+			{
+				string html;
+				if (!_printed.TryGetValue(cref, out html))
+				{
+					html = Print(Resolve(cref));
+					_printed.Add(cref, html);
+				}
+
+				return html;
+			}
+		}
+
+		/// <summary>
+		/// Gets the crefs that couldn't be resolved since the previous call.
+		/// </summary>
+		/// <returns>The crefs, in the order they were first resolved.</returns>
+		public ICollection<string> TakeUnresolved()
+		{
+			lock (_lock)
+			{
+				List<string> unresolved = new List<string>(_unresolved);
+				_unresolved.Clear();
+				return unresolved;
+			}
+		}
+
+		private string Print(object element)
+		{
+			if (element == null)
+			{
+				return null;
+			}
+
+			if (element is TypeElement)
+			{
+				return new TypePrinter(_documentation).Print((TypeElement)element);
+			}
+
+			if (element is EnumMemberElement)
+			{
+				// enum members have no pages of their own, they are listed on the page of their type
+				EnumMemberElement enumMember = (EnumMemberElement)element;
+				return new TypePrinter(_documentation).Print(enumMember.OwnerType) + "." + enumMember.Member.Name;
+			}
+
+			if (element is ConstructorElement)
+			{
+				return ((ConstructorElement)element).ToHtml();
+			}
+
+			// operators and explicit interface implementations have no pages either
+			MethodElement method = element as MethodElement;
+			if (method != null)
+			{
+				return _withoutPage.Contains(method)
+					? new TypePrinter(_documentation).Print(method.OwnerType) + "." + method.Member.Name
+					: method.ToHtml();
+			}
+
+			PropertyElement property = (PropertyElement)element;
+			return _withoutPage.Contains(property)
+				? new TypePrinter(_documentation).Print(property.OwnerType) + "." + property.Member.Name
+				: property.ToHtml();
+		}
+
+		private object Lookup(string cref)
+		{
+			if (_index == null)
+			{
+				_index = BuildIndex();
+			}
+
+			object element;
+			if (_index.TryGetValue(cref, out element))
+			{
+				return element;
+			}
+
+			// members without parameters have no parentheses in their documentation ID
+			if (cref.EndsWith("()", StringComparison.Ordinal) && _index.TryGetValue(cref.Substring(0, cref.Length - 2), out element))
+			{
+				return element;
+			}
+
+			if (cref.StartsWith("T:", StringComparison.Ordinal))
+			{
+				// a type of another assembly, e.g. of the framework
+				Type type = Type.GetType(cref.Substring(2), false);
+				if (type != null)
+				{
+					return _documentation.Find(type);
+				}
+			}
+
+			return null;
+		}
+
+		private Dictionary<string, object> BuildIndex()
+		{
+			Dictionary<string, object> index = new Dictionary<string, object>(StringComparer.Ordinal);
+			foreach (TypeElement type in _documentation.Types)
+			{
+				string typeId = TypeId(type.Type);
+				Add(index, "T:" + typeId, type);
+
+				foreach (ConstructorElement constructor in type.Constructors)
+				{
+					Add(index, "M:" + typeId + ".#ctor" + Parameters(constructor.Member.GetParameters()), constructor);
+				}
+
+				foreach (MethodElement method in type.Methods.Where(m => !m.IsInherited))
+				{
+					Add(index, MethodId(typeId, method.Member), method);
+				}
+
+				foreach (PropertyElement property in type.Properties.Where(p => !p.IsInherited))
+				{
+					Add(index, PropertyId(typeId, property.Member), property);
+				}
+
+				// the documentation doesn't list these, but comments can refer to them
+				foreach (MethodInfo method in type.Type.GetMethods(DeclaredMembers).Where(m => IsOperator(m) || IsExplicitImplementation(m)))
+				{
+					MethodElement element = new MethodElement(_documentation, type, method);
+					_withoutPage.Add(element);
+					Add(index, MethodId(typeId, method), element);
+				}
+
+				foreach (PropertyInfo property in type.Type.GetProperties(DeclaredMembers).Where(IsExplicitImplementation))
+				{
+					PropertyElement element = new PropertyElement(_documentation, type, property);
+					_withoutPage.Add(element);
+					Add(index, PropertyId(typeId, property), element);
+				}
+
+				foreach (EnumMemberElement enumMember in type.EnumMembers)
+				{
+					Add(index, "F:" + typeId + "." + enumMember.Member.Name, enumMember);
+				}
+			}
+
+			return index;
+		}
+
+		private static void Add(Dictionary<string, object> index, string id, object element)
+		{
+			// the first one wins, as with the types of the documentation
+			if (!index.ContainsKey(id))
+			{
+				index.Add(id, element);
+			}
+		}
+
+		private static string MethodId(string typeId, MethodInfo method)
+		{
+			string id = "M:" + typeId + "." + MemberName(method.Name);
+			if (method.IsGenericMethodDefinition)
+			{
+				id += "``" + method.GetGenericArguments().Length;
+			}
+
+			id += Parameters(method.GetParameters());
+			if (method.IsSpecialName && (method.Name == "op_Implicit" || method.Name == "op_Explicit"))
+			{
+				// conversion operators differ only by the type they return
+				id += "~" + ParameterTypeId(method.ReturnType);
+			}
+
+			return id;
+		}
+
+		private static string PropertyId(string typeId, PropertyInfo property)
+		{
+			return "P:" + typeId + "." + MemberName(property.Name) + Parameters(property.GetIndexParameters());
+		}
+
+		/// <summary>
+		/// Gets the name of a member in its documentation ID.
+		/// The name of an explicit interface implementation, e.g. <c>System.IDisposable.Dispose</c>,
+		/// has <c>#</c> instead of dots and braces instead of angle brackets.
+		/// </summary>
+		private static string MemberName(string name)
+		{
+			return name.Replace('.', '#').Replace('<', '{').Replace('>', '}');
+		}
+
+		private static bool IsOperator(MethodInfo method)
+		{
+			return method.IsSpecialName && method.Name.StartsWith("op_", StringComparison.Ordinal);
+		}
+
+		private static bool IsExplicitImplementation(MethodInfo method)
+		{
+			return method.IsPrivate && !method.IsSpecialName && method.Name.Contains('.');
+		}
+
+		private static bool IsExplicitImplementation(PropertyInfo property)
+		{
+			return property.Name.Contains('.');
+		}
+
+		private static string Parameters(ParameterInfo[] parameters)
+		{
+			if (parameters.Length == 0)
+			{
+				return string.Empty;
+			}
+
+			return "(" + string.Join(",", parameters.Select(p => ParameterTypeId(p.ParameterType))) + ")";
+		}
+
+		/// <summary>
+		/// Gets the documentation ID of the given documented type, without the <c>T:</c> prefix,
+		/// e.g. <c>System.Collections.Generic.List`1</c>, as the compiler writes it in the XML documentation file.
+		/// </summary>
+		private static string TypeId(Type type)
+		{
+			return (type.FullName ?? type.Name).Replace('+', '.');
+		}
+
+		/// <summary>
+		/// Gets the documentation ID of the given type in the parameters of a member,
+		/// e.g. <c>System.Collections.Generic.List{System.Int32}</c>, as the compiler writes it in the XML documentation file.
+		/// </summary>
+		private static string ParameterTypeId(Type type)
+		{
+			if (type.IsGenericParameter)
+			{
+				return (type.DeclaringMethod != null ? "``" : "`") + type.GenericParameterPosition;
+			}
+
+			if (type.IsByRef)
+			{
+				return ParameterTypeId(type.GetElementType()) + "@";
+			}
+
+			if (type.IsPointer)
+			{
+				return ParameterTypeId(type.GetElementType()) + "*";
+			}
+
+			if (type.IsArray)
+			{
+				int rank = type.GetArrayRank();
+				return ParameterTypeId(type.GetElementType())
+					+ (rank == 1 ? "[]" : "[" + string.Join(",", Enumerable.Repeat("0:", rank)) + "]");
+			}
+
+			if (type.IsGenericType)
+			{
+				// a generic type definition here is the declaring type, e.g. Outer<T> in a method of Outer<T>,
+				// which is written with its type parameters too
+				return GenericTypeId(type);
+			}
+
+			return TypeId(type);
+		}
+
+		/// <summary>
+		/// Gets the documentation ID of a generic type with its type arguments,
+		/// which are written after the name of the type, or of the declaring type, that declares them,
+		/// e.g. <c>Outer{System.Int32}.Inner</c> for a type nested in a generic type.
+		/// </summary>
+		private static string GenericTypeId(Type type)
+		{
+			Type definition = type.IsGenericTypeDefinition ? type : type.GetGenericTypeDefinition();
+			Type[] arguments = type.GetGenericArguments();
+
+			List<Type> nesting = new List<Type>();
+			for (Type t = definition; t != null; t = t.DeclaringType)
+			{
+				nesting.Insert(0, t);
+			}
+
+			List<string> names = new List<string>();
+			int position = 0;
+			foreach (Type t in nesting)
+			{
+				string name = t.Name;
+				int tick = name.IndexOf('`');
+				if (tick >= 0)
+				{
+					int arity = int.Parse(name.Substring(tick + 1), CultureInfo.InvariantCulture);
+					name = name.Substring(0, tick)
+						+ "{" + string.Join(",", arguments.Skip(position).Take(arity).Select(ParameterTypeId)) + "}";
+					position += arity;
+				}
+
+				names.Add(name);
+			}
+
+			return (string.IsNullOrEmpty(definition.Namespace) ? string.Empty : definition.Namespace + ".") + string.Join(".", names);
+		}
+	}
+}
@@ -92,4 +92,41 @@ namespace IglooCastle.Demo
 	{
 		public double? Price { get; set; }
 	}
+
+	public class GenericNestingDemo<T>
+	{
+		public class NestedDemo
+		{
+		}
+
+		public void Copy(GenericNestingDemo<T> other, NestedDemo nested)
+		{
+		}
+
+		public void CopyNested(GenericNestingDemo<int>.NestedDemo nested)
+		{
+		}
+	}
+
+	public sealed class ExplicitImplementationDemo : IDisposable, IComparable<string>
+	{
+		void IDisposable.Dispose()
+		{
+		}
+
+		int IComparable<string>.CompareTo(string other)
+		{
+			return 0;
+		}
+
+		public static implicit operator int(ExplicitImplementationDemo demo)
+		{
+			return 0;
+		}
+
+		public static explicit operator string(ExplicitImplementationDemo demo)
+		{
+			return string.Empty;
+		}
+	}
 }
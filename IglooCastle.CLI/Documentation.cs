@@ -15,7 +15,14 @@ namespace IglooCastle.CLI
 	{
 		private NamespaceElement[] _namespaces = new NamespaceElement[0];
 		private TypeElement[] _types = new TypeElement[0];
-		private readonly List<XmlDocument> _documentationSources = new List<XmlDocument>();
+		private readonly Dictionary<Type, TypeElement> _typesByType = new Dictionary<Type, TypeElement>();
+		private TypeHierarchy _typeHierarchy;
+		private ExtensionMethodIndex _extensionMethods;
+		private CrefResolver _crefs;
+		private readonly object _crefsLock = new object();
+		private Documentation _crefsDocumentation;
+		private readonly List<XmlCommentStore> _documentationSources = new List<XmlCommentStore>();
+		private readonly Dictionary<string, string> _xmlMembers = new Dictionary<string, string>(StringComparer.Ordinal);
 
 		/// <summary>
 		/// Creates an instance of this class.
@@ -45,33 +52,119 @@ namespace IglooCastle.CLI
 		public ICollection<TypeElement> Types
 		{
 			get { return _types; }
-			set { _types = value != null ? value.ToArray() : new TypeElement[0]; }
+			set
+			{
+				_types = value != null ? value.ToArray() : new TypeElement[0];
+				_typesByType.Clear();
+				foreach (TypeElement type in _types)
+				{
+					if (!_typesByType.ContainsKey(type.Type))
+					{
+						_typesByType.Add(type.Type, type);
+					}
+				}
+
+				_typeHierarchy = null;
+				_extensionMethods = null;
+				lock (_crefsLock)
+				{
+					_crefs = null;
+				}
+			}
 		}
 
-		public ICollection<XmlDocument> DocumentationSources
+		/// <summary>
+		/// Gets the inheritance index of the types. It is built on first use.
+		/// </summary>
+		internal TypeHierarchy TypeHierarchy
+		{
+			get { return _typeHierarchy ?? (_typeHierarchy = new TypeHierarchy(_types)); }
+		}
+
+		/// <summary>
+		/// Gets the index of the extension methods of the types. It is built on first use.
+		/// </summary>
+		internal ExtensionMethodIndex ExtensionMethods
+		{
+			get { return _extensionMethods ?? (_extensionMethods = new ExtensionMethodIndex(_types)); }
+		}
+
+		/// <summary>
+		/// Gets the resolver of the crefs of the XML comments, which caches the links to the elements they refer to.
+		/// </summary>
+		/// <remarks>
+		/// After <see cref="ResolveCrefsWith"/>, the crefs are resolved against the given documentation instead.
+		/// </remarks>
+		public CrefResolver Crefs
+		{
+			get
+			{
+				Documentation crefsDocumentation = _crefsDocumentation;
+				if (crefsDocumentation != null)
+				{
+					return crefsDocumentation.Crefs;
+				}
+
+				// the pages are written by several threads
+				lock (_crefsLock)
+				{
+					return _crefs ?? (_crefs = new CrefResolver(this));
+				}
+			}
+		}
+
+		public ICollection<XmlCommentStore> DocumentationSources
 		{
 			get
 			{
-				return _documentationSources;
+				return _documentationSources.AsReadOnly();
 			}
 
 			private set
 			{
 				_documentationSources.Clear();
-				_documentationSources.AddRange(value ?? Enumerable.Empty<XmlDocument>());
+				_xmlMembers.Clear();
+				foreach (XmlCommentStore doc in value ?? Enumerable.Empty<XmlCommentStore>())
+				{
+					AddDocumentationSource(doc);
+				}
 			}
 		}
 
 		public Documentation Merge(Documentation that)
 		{
+			return Merge(new[] { this, that });
+		}
+
+		/// <summary>
+		/// Merges the given documentations into a new one, in a single pass.
+		/// </summary>
+		/// <remarks>
+		/// The elements keep the order of the documentations, and the first of equal elements wins,
+		/// as when merging the documentations one at a time, without building the intermediate ones.
+		/// </remarks>
+		public static Documentation Merge(IEnumerable<Documentation> documentations)
+		{
+			ICollection<Documentation> list = documentations.ToList();
 			return new Documentation
 				{
-					Namespaces = Namespaces.Union(that.Namespaces).ToArray(),
-					Types = Types.Union(that.Types).ToArray(),
-					DocumentationSources = DocumentationSources.Union(that.DocumentationSources).ToArray()
+					Namespaces = list.SelectMany(d => d.Namespaces).Distinct().ToArray(),
+					Types = list.SelectMany(d => d.Types).Distinct().ToArray(),
+					DocumentationSources = list.SelectMany(d => d.DocumentationSources).Distinct().ToArray()
 				};
 		}
 
+		/// <summary>
+		/// Resolves the crefs of the comments of this documentation against the given one from now on,
+		/// e.g. against the merged documentation of all the input assemblies,
+		/// so that the comments of one assembly can refer to the types of the others.
+		/// </summary>
+		/// <param name="documentation">The documentation to resolve the crefs against.</param>
+		public void ResolveCrefsWith(Documentation documentation)
+		{
+			_crefsDocumentation = documentation != this ? documentation : null;
+		}
+
 		public void Scan(Assembly assembly)
 		{
 			HashSet<string> namespaces = new HashSet<string>();
@@ -106,28 +199,45 @@ namespace IglooCastle.CLI
 		{
 			string paramString = string.Join(",", parameters.Select(p => p.ParameterType.FullName));
 			string attributeValue = type.FullName + "." + methodName + "(" + paramString + ")";
-			return GetXmlComment("//member[@name=\"M:" + attributeValue + "\"]");
+			return GetXmlComment("M:" + attributeValue);
 		}
 
-		internal XmlComment GetXmlComment(string selector)
+		/// <summary>
+		/// Gets the XML comment of the member with the given documentation ID,
+		/// e.g. <c>T:IglooCastle.CLI.Documentation</c>.
+		/// </summary>
+		/// <param name="memberName">The documentation ID, which is the name attribute of the member element.</param>
+		/// <returns>The XML comment, or <c>null</c> if the member is not documented.</returns>
+		internal XmlComment GetXmlComment(string memberName)
 		{
-			return DocumentationSources.Select(xmlDoc => GetXmlComment(xmlDoc, selector)).FirstOrDefault(c => c != null);
+			string xml;
+			if (!_xmlMembers.TryGetValue(memberName, out xml))
+			{
+				return null;
+			}
+
+			return new XmlComment(this, xml);
 		}
 
-		private XmlComment GetXmlComment(XmlDocument doc, string selector)
+		/// <summary>
+		/// Adds the comments of an XML documentation file and indexes them by member name.
+		/// When a member is documented more than once, the first one wins.
+		/// </summary>
+		private void AddDocumentationSource(XmlCommentStore doc)
 		{
 			if (doc == null)
 			{
-				return null;
+				return;
 			}
 
-			XmlNode node = doc.SelectSingleNode(selector);
-			if (node == null)
+			_documentationSources.Add(doc);
+			foreach (KeyValuePair<string, string> member in doc.Members)
 			{
-				return null;
+				if (!_xmlMembers.ContainsKey(member.Key))
+				{
+					_xmlMembers.Add(member.Key, member.Value);
+				}
 			}
-
-			return new XmlComment(this, (XmlElement)node);
 		}
 
 		public bool AddDocumentation(Assembly assembly)
@@ -141,6 +251,16 @@ namespace IglooCastle.CLI
 				|| AddDocumentationFromXmlFile(assembly, Path.ChangeExtension(assemblyFile, "XML"));
 		}
 
+		/// <summary>
+		/// Replaces the XML documentation with the one read again from the file next to the assembly,
+		/// e.g. after it changed on disk.
+		/// </summary>
+		public bool ReloadDocumentationFromAssemblyFile(Assembly assembly, string assemblyFile)
+		{
+			DocumentationSources = null;
+			return AddDocumentationFromAssemblyFile(assembly, assemblyFile);
+		}
+
 		private bool AddDocumentationFromXmlFile(Assembly assembly, string xmlFile)
 		{
 			if (!File.Exists(xmlFile))
@@ -149,22 +269,31 @@ namespace IglooCastle.CLI
 				return false;
 			}
 
-			XmlDocument doc = new XmlDocument();
-			doc.Load(xmlFile);
-			DocumentationSources.Add(doc);
+			AddDocumentationSource(XmlCommentStore.Load(xmlFile));
 			return true;
 		}
 
 		internal PropertyElement Find(PropertyInfo propertyInfo)
 		{
-			return Types.SelectMany(t => t.Properties).SingleOrDefault(p => p.Property == propertyInfo);
+			// a property belongs to the type it was reflected from
+			TypeElement owner;
+			if (propertyInfo.ReflectedType == null || !_typesByType.TryGetValue(propertyInfo.ReflectedType, out owner))
+			{
+				return null;
+			}
+
+			return owner.Properties.SingleOrDefault(p => p.Property == propertyInfo);
 		}
 
 		public TypeElement Find(Type type)
 		{
-			return type == null
-				? null :
-				(Types.FirstOrDefault(t => t.Type == type) ?? new ExternalTypeElement(this, type));
+			if (type == null)
+			{
+				return null;
+			}
+
+			TypeElement result;
+			return _typesByType.TryGetValue(type, out result) ? result : new ExternalTypeElement(this, type);
 		}
 
 		public NamespaceElement FindNamespace(string name)
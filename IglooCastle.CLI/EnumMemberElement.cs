@@ -22,9 +22,9 @@ namespace IglooCastle.CLI
 
 		protected override IXmlComment GetXmlComment()
 		{
-			return Documentation.GetXmlComment("//member[@name=\"F:" +
+			return Documentation.GetXmlComment("F:" +
 					OwnerType.Member.FullName + "." +
-					Member.Name + "\"]");
+					Member.Name);
 		}
 	}
 }
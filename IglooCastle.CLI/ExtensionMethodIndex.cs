@@ -0,0 +1,92 @@
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Runtime.CompilerServices;
+
+namespace IglooCastle.CLI
+{
+	/// <summary>
+	/// Indexes the extension methods of a documentation by the type they extend
+	/// and by the namespace they are declared in.
+	/// </summary>
+	/// <remarks>
+	/// The methods of all types are examined once, when the index is built.
+	/// Finding the extension methods of a type then only checks the distinct extended types
+	/// for assignability, which covers base types and interfaces.
+	/// </remarks>
+	internal sealed class ExtensionMethodIndex
+	{
+		private readonly List<MethodElement> _methods = new List<MethodElement>();
+		private readonly Dictionary<Type, List<int>> _byExtendedType = new Dictionary<Type, List<int>>();
+		private readonly Dictionary<string, List<MethodElement>> _byNamespace = new Dictionary<string, List<MethodElement>>();
+
+		/// <summary>
+		/// Creates an instance of this class.
+		/// </summary>
+		/// <param name="types">The types whose extension methods are indexed.</param>
+		public ExtensionMethodIndex(IEnumerable<TypeElement> types)
+		{
+			// compilers mark the types that declare extension methods with the ExtensionAttribute
+			foreach (TypeElement type in types.Where(t => t.Type.IsDefined(typeof(ExtensionAttribute), false)))
+			{
+				foreach (MethodElement method in type.Methods.Where(m => m.IsExtension()))
+				{
+					Type extendedType = method.Method.GetParameters()[0].ParameterType;
+					List<int> positions;
+					if (!_byExtendedType.TryGetValue(extendedType, out positions))
+					{
+						positions = new List<int>();
+						_byExtendedType.Add(extendedType, positions);
+					}
+
+					positions.Add(_methods.Count);
+					_methods.Add(method);
+
+					if (!method.IsInherited)
+					{
+						string ns = type.Namespace ?? string.Empty;
+						List<MethodElement> namespaceMethods;
+						if (!_byNamespace.TryGetValue(ns, out namespaceMethods))
+						{
+							namespaceMethods = new List<MethodElement>();
+							_byNamespace.Add(ns, namespaceMethods);
+						}
+
+						namespaceMethods.Add(method);
+					}
+				}
+			}
+		}
+
+		/// <summary>
+		/// Gets the extension methods that can be called on an instance of the given type.
+		/// </summary>
+		/// <param name="type">The extended type.</param>
+		/// <returns>The extension methods, in the order they are declared in the documentation.</returns>
+		public ICollection<MethodElement> ForType(TypeElement type)
+		{
+			return _byExtendedType
+				.Where(p => p.Key.IsAssignableFrom(type.Type))
+				.SelectMany(p => p.Value)
+				.OrderBy(position => position)
+				.Select(position => _methods[position])
+				.ToList();
+		}
+
+		/// <summary>
+		/// Gets the extension methods that are declared in the given namespace.
+		/// </summary>
+		/// <param name="ns">The name of the namespace.</param>
+		/// <returns>The extension methods, in the order they are declared in the documentation.</returns>
+		public ICollection<MethodElement> ForNamespace(string ns)
+		{
+			List<MethodElement> methods;
+			if (!_byNamespace.TryGetValue(ns ?? string.Empty, out methods))
+			{
+				return new List<MethodElement>();
+			}
+
+			return methods.ToList();
+		}
+	}
+}
@@ -0,0 +1,198 @@
+﻿using System;
+using System.IO;
+using System.Linq;
+using System.Reflection;
+using System.Security.Cryptography;
+using System.Text;
+using IronPython.Hosting;
+using Microsoft.Scripting.Hosting;
+
+namespace IglooCastle.CLI
+{
+	/// <summary>
+	/// Loads generator.py into an IronPython engine, from an assembly of compiled modules when possible.
+	/// </summary>
+	/// <remarks>
+	/// <para>
+	/// The first run compiles generator.py and the modules it imports into an assembly in the cache directory.
+	/// The assembly is named after a hash of their source and of the IronPython version,
+	/// so a change of either compiles them again, and later runs skip parsing and compiling the source.
+	/// </para>
+	/// <para>
+	/// The engine and the module are created once, and every later call of <see cref="Load"/> returns the same module.
+	/// </para>
+	/// </remarks>
+	public sealed class GeneratorLoader
+	{
+		/// <summary>
+		/// The python modules of the generator, compiled together.
+		/// </summary>
+		private static readonly string[] ModuleFiles = { "generator.py", "snapshot.py" };
+
+		private readonly string _scriptDirectory;
+		private readonly string _cacheDirectory;
+		private readonly object _lock = new object();
+		private ScriptEngine _engine;
+		private dynamic _generator;
+
+		/// <summary>
+		/// Creates an instance of this class.
+		/// </summary>
+		/// <param name="scriptDirectory">The directory of generator.py.</param>
+		/// <param name="cacheDirectory">The directory of the compiled modules, or <c>null</c> to always load the source.</param>
+		public GeneratorLoader(string scriptDirectory, string cacheDirectory)
+		{
+			_scriptDirectory = scriptDirectory;
+			_cacheDirectory = string.IsNullOrEmpty(cacheDirectory) ? null : cacheDirectory;
+		}
+
+		/// <summary>
+		/// Gets the engine that runs the generator, creating it on first use.
+		/// </summary>
+		public ScriptEngine Engine
+		{
+			get
+			{
+				lock (_lock)
+				{
+					if (_engine == null)
+					{
+						_engine = CreateEngine();
+					}
+
+					return _engine;
+				}
+			}
+		}
+
+		/// <summary>
+		/// Gets the assembly of the compiled modules for the current source, or <c>null</c> if there is no cache directory.
+		/// </summary>
+		public string CacheFile
+		{
+			get
+			{
+				if (_cacheDirectory == null)
+				{
+					return null;
+				}
+
+				return Path.Combine(_cacheDirectory, "generator-" + SourceHash() + ".dll");
+			}
+		}
+
+		/// <summary>
+		/// Gets a value indicating whether the generator was loaded from an assembly compiled by an earlier run.
+		/// </summary>
+		public bool FromCache
+		{
+			get;
+			private set;
+		}
+
+		/// <summary>
+		/// Loads the generator module, or returns it if it is already loaded.
+		/// </summary>
+		public dynamic Load()
+		{
+			lock (_lock)
+			{
+				if (_generator == null)
+				{
+					LoadCompiledModules();
+					_generator = Engine.ImportModule("generator");
+				}
+
+				return _generator;
+			}
+		}
+
+		private ScriptEngine CreateEngine()
+		{
+			ScriptEngine engine = Python.CreateEngine();
+			var searchPaths = engine.GetSearchPaths();
+			searchPaths.Add(_scriptDirectory);
+			engine.SetSearchPaths(searchPaths);
+			return engine;
+		}
+
+		/// <summary>
+		/// Loads the compiled modules into the engine, compiling them first if they are not in the cache.
+		/// Python imports them from the loaded assembly instead of from the source.
+		/// </summary>
+		private void LoadCompiledModules()
+		{
+			string cacheFile = CacheFile;
+			if (cacheFile == null)
+			{
+				return;
+			}
+
+			try
+			{
+				FromCache = File.Exists(cacheFile);
+				if (!FromCache)
+				{
+					Compile(cacheFile);
+				}
+
+				Engine.Runtime.LoadAssembly(Assembly.LoadFile(cacheFile));
+			}
+			catch (Exception ex)
+			{
+				// the source still works, only slower
+				FromCache = false;
+				Console.WriteLine("Could not use compiled generator {0}: {1}", cacheFile, ex.Message);
+			}
+		}
+
+		private void Compile(string cacheFile)
+		{
+			Directory.CreateDirectory(_cacheDirectory);
+
+			// concurrent runs, e.g. the shards of a build, compile to different files and the first one wins
+			string temporaryFile = Path.Combine(
+				_cacheDirectory,
+				Path.GetFileNameWithoutExtension(cacheFile) + "-" + Guid.NewGuid().ToString("N") + ".dll");
+
+			ScriptScope scope = Engine.CreateScope();
+			scope.SetVariable("assembly_file", temporaryFile);
+			scope.SetVariable("source_files", ModuleFiles.Select(f => Path.Combine(_scriptDirectory, f)).ToArray());
+			Engine.Execute("import clr\nclr.CompileModules(assembly_file, *source_files)", scope);
+
+			try
+			{
+				File.Move(temporaryFile, cacheFile);
+			}
+			catch (IOException)
+			{
+				if (!File.Exists(cacheFile))
+				{
+					throw;
+				}
+
+				File.Delete(temporaryFile);
+			}
+		}
+
+		/// <summary>
+		/// Gets a hash of the source of the modules and of the IronPython version that compiles them.
+		/// </summary>
+		private string SourceHash()
+		{
+			using (SHA1 sha1 = SHA1.Create())
+			{
+				byte[] version = Encoding.UTF8.GetBytes(typeof(Python).Assembly.GetName().Version.ToString());
+				sha1.TransformBlock(version, 0, version.Length, null, 0);
+				foreach (string file in ModuleFiles)
+				{
+					byte[] source = File.ReadAllBytes(Path.Combine(_scriptDirectory, file));
+					sha1.TransformBlock(source, 0, source.Length, null, 0);
+				}
+
+				sha1.TransformFinalBlock(new byte[0], 0, 0);
+				return BitConverter.ToString(sha1.Hash, 0, 8).Replace("-", string.Empty).ToLowerInvariant();
+			}
+		}
+	}
+}
@@ -0,0 +1,90 @@
+﻿using System;
+using System.Diagnostics;
+using System.IO;
+using System.IO.Compression;
+
+namespace IglooCastle.CLI
+{
+	/// <summary>
+	/// Writes gzip-compressed copies of the generated files, for web servers that serve them as they are,
+	/// and adds up their sizes and the time it took to compress them.
+	/// </summary>
+	/// <remarks>
+	/// Several threads can compress files at once.
+	/// </remarks>
+	public sealed class GzipCompressor
+	{
+		/// <summary>
+		/// The extension that is appended to the name of a file to name its compressed copy.
+		/// </summary>
+		public const string Extension = ".gz";
+
+		private readonly object _lock = new object();
+		private int _files;
+		private long _uncompressedSize;
+		private long _compressedSize;
+		private TimeSpan _compressionTime;
+
+		/// <summary>
+		/// Gets the number of files compressed so far.
+		/// </summary>
+		public int Files
+		{
+			get { lock (_lock) { return _files; } }
+		}
+
+		/// <summary>
+		/// Gets the total size of the compressed files, in bytes.
+		/// </summary>
+		public long UncompressedSize
+		{
+			get { lock (_lock) { return _uncompressedSize; } }
+		}
+
+		/// <summary>
+		/// Gets the total size of the compressed copies, in bytes.
+		/// </summary>
+		public long CompressedSize
+		{
+			get { lock (_lock) { return _compressedSize; } }
+		}
+
+		/// <summary>
+		/// Gets the total time spent compressing.
+		/// </summary>
+		public TimeSpan CompressionTime
+		{
+			get { lock (_lock) { return _compressionTime; } }
+		}
+
+		/// <summary>
+		/// Writes a compressed copy of the given file next to it, with <see cref="Extension"/> appended to its name.
+		/// </summary>
+		public void Compress(string file)
+		{
+			Stopwatch stopwatch = Stopwatch.StartNew();
+			long uncompressedSize;
+			long compressedSize;
+			using (FileStream source = File.OpenRead(file))
+			using (FileStream destination = File.Create(file + Extension))
+			{
+				using (GZipStream gzip = new GZipStream(destination, CompressionLevel.Optimal, true))
+				{
+					source.CopyTo(gzip);
+				}
+
+				uncompressedSize = source.Length;
+				compressedSize = destination.Length;
+			}
+
+			stopwatch.Stop();
+			lock (_lock)
+			{
+				_files++;
+				_uncompressedSize += uncompressedSize;
+				_compressedSize += compressedSize;
+				_compressionTime += stopwatch.Elapsed;
+			}
+		}
+	}
+}
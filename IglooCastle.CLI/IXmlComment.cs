@@ -4,6 +4,11 @@
 	{
 		string InnerText { get; }
 
+		/// <summary>
+		/// Gets the XML of the comment, which changes whenever anything in the comment changes.
+		/// </summary>
+		string Xml { get; }
+
 		string Section(string sectionName);
 
 		string Section(string sectionName, string attributeName, string attributeValue);
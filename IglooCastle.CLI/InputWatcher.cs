@@ -0,0 +1,105 @@
+﻿using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Threading;
+
+namespace IglooCastle.CLI
+{
+	/// <summary>
+	/// Watches a set of files for changes.
+	/// </summary>
+	/// <remarks>
+	/// A build writes an assembly and its XML documentation one after the other,
+	/// so changes are only reported once no watched file changed for <see cref="QuietPeriod"/>.
+	/// </remarks>
+	public sealed class InputWatcher : IDisposable
+	{
+		/// <summary>
+		/// How long no watched file must change before the changes are reported.
+		/// </summary>
+		public static readonly TimeSpan QuietPeriod = TimeSpan.FromMilliseconds(500);
+
+		private readonly HashSet<string> _files;
+		private readonly List<FileSystemWatcher> _watchers = new List<FileSystemWatcher>();
+		private readonly HashSet<string> _changed = new HashSet<string>(StringComparer.OrdinalIgnoreCase);
+		private readonly object _lock = new object();
+		private DateTime _lastChange;
+
+		/// <summary>
+		/// Starts watching the given files. They don't need to exist yet.
+		/// </summary>
+		/// <param name="files">The files to watch.</param>
+		public InputWatcher(IEnumerable<string> files)
+		{
+			_files = new HashSet<string>(files.Select(Path.GetFullPath), StringComparer.OrdinalIgnoreCase);
+			foreach (string directory in _files.Select(Path.GetDirectoryName).Distinct(StringComparer.OrdinalIgnoreCase))
+			{
+				FileSystemWatcher watcher = new FileSystemWatcher(directory)
+				{
+					NotifyFilter = NotifyFilters.LastWrite | NotifyFilters.FileName | NotifyFilters.Size
+				};
+
+				watcher.Changed += OnChanged;
+				watcher.Created += OnChanged;
+				watcher.Renamed += OnChanged;
+				watcher.EnableRaisingEvents = true;
+				_watchers.Add(watcher);
+			}
+		}
+
+		/// <summary>
+		/// Waits until watched files changed, and returns their full paths.
+		/// </summary>
+		/// <returns>The files that changed since the previous call.</returns>
+		public ICollection<string> WaitForChanges()
+		{
+			lock (_lock)
+			{
+				while (true)
+				{
+					if (_changed.Count == 0)
+					{
+						Monitor.Wait(_lock);
+						continue;
+					}
+
+					TimeSpan quiet = DateTime.UtcNow - _lastChange;
+					if (quiet < QuietPeriod)
+					{
+						Monitor.Wait(_lock, QuietPeriod - quiet);
+						continue;
+					}
+
+					List<string> result = _changed.ToList();
+					_changed.Clear();
+					return result;
+				}
+			}
+		}
+
+		public void Dispose()
+		{
+			foreach (FileSystemWatcher watcher in _watchers)
+			{
+				watcher.Dispose();
+			}
+		}
+
+		private void OnChanged(object sender, FileSystemEventArgs e)
+		{
+			string path = Path.GetFullPath(e.FullPath);
+			if (!_files.Contains(path))
+			{
+				return;
+			}
+
+			lock (_lock)
+			{
+				_changed.Add(path);
+				_lastChange = DateTime.UtcNow;
+				Monitor.PulseAll(_lock);
+			}
+		}
+	}
+}
@@ -12,6 +12,11 @@
 			get { return string.Empty; }
 		}
 
+		public string Xml
+		{
+			get { return string.Empty; }
+		}
+
 		public string Section(string sectionName, string attributeName, string attributeValue)
 		{
 			return string.Empty;
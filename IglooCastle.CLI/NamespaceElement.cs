@@ -51,6 +51,14 @@ namespace IglooCastle.CLI
 			}
 		}
 
+		/// <summary>
+		/// Gets the extension methods that are declared in this namespace.
+		/// </summary>
+		public ICollection<MethodElement> ExtensionMethods
+		{
+			get { return Documentation.ExtensionMethods.ForNamespace(Namespace); }
+		}
+
 		public string Filename(string prefix = "N")
 		{
 			return Documentation.FilenameProvider.Filename(this, prefix);
@@ -1,21 +1,58 @@
 using System;
+using System.Globalization;
+using System.IO;
 using System.Linq;
 
 namespace IglooCastle.CLI
 {
 	public class Options
 	{
+		/// <summary>
+		/// The port of the preview server, if <c>--serve</c> is given without one.
+		/// </summary>
+		public const int DefaultServePort = 8080;
+
 		private Options()
 		{
 		}
 
 		public static Options Parse(string[] args)
 		{
-			return new Options
+			int shardIndex;
+			int shardCount;
+			ParseShard(Find(args, "--shard="), out shardIndex, out shardCount);
+			Options options = new Options
 			{
 				InputAssemblies = args.Where(a => !string.IsNullOrEmpty(a) && !a.StartsWith("-")).ToArray(),
-				OutputDirectory = Find(args, "--output=")
+				OutputDirectory = Find(args, "--output="),
+				SharedNav = Has(args, "--shared-nav"),
+				Jobs = ParseJobs(Find(args, "--jobs=")),
+				Incremental = Has(args, "--incremental"),
+				DumpSnapshot = Find(args, "--dump-snapshot="),
+				Snapshot = Find(args, "--snapshot="),
+				Verbosity = ParseVerbosity(Find(args, "--verbosity=")),
+				Profile = Find(args, "--profile="),
+				FragmentCacheSize = ParseFragmentCacheSize(Find(args, "--fragment-cache-size=")),
+				PageSize = ParsePageSize(Find(args, "--page-size=")),
+				ShardIndex = shardIndex,
+				ShardCount = shardCount,
+				Namespaces = ParseList(Find(args, "--namespaces="), ','),
+				Merge = ParseList(Find(args, "--merge="), Path.PathSeparator),
+				Serve = ParseServe(args),
+				Watch = Has(args, "--watch"),
+				CompiledCache = Find(args, "--compiled-cache="),
+				Gzip = Has(args, "--gzip"),
+				Archive = Find(args, "--archive="),
+				Minify = Has(args, "--minify")
 			};
+
+			// watch mode writes some of the pages at a time, to the output directory
+			if (options.Watch && (options.Archive != null || options.IsShard || options.Merge != null))
+			{
+				throw new ArgumentException("--watch can't be combined with --archive, --shard, --namespaces or --merge");
+			}
+
+			return options;
 		}
 
 		public string[] InputAssemblies
@@ -30,6 +67,205 @@ namespace IglooCastle.CLI
 			set;
 		}
 
+		/// <summary>
+		/// Gets or sets a value indicating whether the navigation tree is written
+		/// once to a separate file, instead of being inlined into every page.
+		/// </summary>
+		public bool SharedNav
+		{
+			get;
+			set;
+		}
+
+		/// <summary>
+		/// Gets or sets the number of worker threads that render the pages.
+		/// </summary>
+		public int Jobs
+		{
+			get;
+			set;
+		}
+
+		/// <summary>
+		/// Gets or sets a value indicating whether only the pages that changed
+		/// since the previous run are written.
+		/// </summary>
+		public bool Incremental
+		{
+			get;
+			set;
+		}
+
+		/// <summary>
+		/// Gets or sets the file that the reflected documentation model is written to,
+		/// so that later runs can render from it with <see cref="Snapshot"/>.
+		/// </summary>
+		public string DumpSnapshot
+		{
+			get;
+			set;
+		}
+
+		/// <summary>
+		/// Gets or sets the snapshot file to render from, instead of loading the input assemblies.
+		/// </summary>
+		public string Snapshot
+		{
+			get;
+			set;
+		}
+
+		/// <summary>
+		/// Gets or sets how much the generator prints.
+		/// 0 prints only errors, 1 prints a summary of the run and 2 also prints every page.
+		/// </summary>
+		public int Verbosity
+		{
+			get;
+			set;
+		}
+
+		/// <summary>
+		/// Gets or sets the file that the timings of the run are written to, as JSON.
+		/// </summary>
+		public string Profile
+		{
+			get;
+			set;
+		}
+
+		/// <summary>
+		/// Gets or sets how many HTML fragments, e.g. member rows and type links,
+		/// the generator keeps to reuse across pages. 0 disables the cache.
+		/// </summary>
+		public int FragmentCacheSize
+		{
+			get;
+			set;
+		}
+
+		/// <summary>
+		/// Gets or sets the number of types of a namespace above which its types are listed on several pages,
+		/// and its class diagram only shows the types deriving from a type when the type is expanded.
+		/// 0 keeps every namespace on one page.
+		/// </summary>
+		public int PageSize
+		{
+			get;
+			set;
+		}
+
+		/// <summary>
+		/// Gets or sets the 1-based index of the share of the namespaces that this run renders,
+		/// out of <see cref="ShardCount"/> shares.
+		/// </summary>
+		public int ShardIndex
+		{
+			get;
+			set;
+		}
+
+		/// <summary>
+		/// Gets or sets the number of processes that a distributed build is split into.
+		/// Every process renders the pages of its share of the namespaces,
+		/// and a final run with <see cref="Merge"/> combines them.
+		/// </summary>
+		public int ShardCount
+		{
+			get;
+			set;
+		}
+
+		/// <summary>
+		/// Gets or sets the namespaces that this run renders the pages of,
+		/// instead of a share picked by <see cref="ShardIndex"/>.
+		/// </summary>
+		public string[] Namespaces
+		{
+			get;
+			set;
+		}
+
+		/// <summary>
+		/// Gets or sets the output directories of the shards of a distributed build.
+		/// Their pages are copied to the output directory, which also gets the shared
+		/// navigation tree and the static files.
+		/// </summary>
+		public string[] Merge
+		{
+			get;
+			set;
+		}
+
+		/// <summary>
+		/// Gets or sets the port of the local HTTP server that renders the pages when they are requested,
+		/// instead of writing them to the output directory. 0 writes the pages.
+		/// </summary>
+		public int Serve
+		{
+			get;
+			set;
+		}
+
+		/// <summary>
+		/// Gets or sets a value indicating whether the run keeps going after writing the pages,
+		/// and writes again the pages affected by changes of the input assemblies or their XML files.
+		/// It can't be combined with <see cref="Archive"/>, <see cref="Merge"/> or the options of a shard.
+		/// </summary>
+		public bool Watch
+		{
+			get;
+			set;
+		}
+
+		/// <summary>
+		/// Gets or sets the directory where generator.py is cached, compiled, for later runs.
+		/// An empty string disables the cache.
+		/// </summary>
+		public string CompiledCache
+		{
+			get;
+			set;
+		}
+
+		/// <summary>
+		/// Gets or sets a value indicating whether a gzip-compressed copy is written next to every file,
+		/// e.g. index.html.gz, for web servers that serve them as they are.
+		/// </summary>
+		public bool Gzip
+		{
+			get;
+			set;
+		}
+
+		/// <summary>
+		/// Gets or sets the zip archive that the pages and the static files are written to,
+		/// instead of the output directory. A shard ignores it, since the merge step needs its pages as files.
+		/// </summary>
+		public string Archive
+		{
+			get;
+			set;
+		}
+
+		/// <summary>
+		/// Gets or sets a value indicating whether the comments and the whitespace that don't change
+		/// how the pages render are removed from them before they are written.
+		/// </summary>
+		public bool Minify
+		{
+			get;
+			set;
+		}
+
+		/// <summary>
+		/// Gets a value indicating whether this run renders only part of the pages.
+		/// </summary>
+		public bool IsShard
+		{
+			get { return ShardCount > 1 || Namespaces != null; }
+		}
+
 		private static string Find(string[] args, string arg)
 		{
 			string value = args.FirstOrDefault(a => a.StartsWith(arg));
@@ -40,5 +276,111 @@ namespace IglooCastle.CLI
 
 			return null;
 		}
+
+		private static int ParseJobs(string value)
+		{
+			if (value == null)
+			{
+				return 1;
+			}
+
+			return Math.Max(1, ParseNumber("--jobs", value));
+		}
+
+		private static int ParseVerbosity(string value)
+		{
+			if (value == null)
+			{
+				return 1;
+			}
+
+			return Math.Max(0, ParseNumber("--verbosity", value));
+		}
+
+		private static int ParseFragmentCacheSize(string value)
+		{
+			if (value == null)
+			{
+				return 10000;
+			}
+
+			return Math.Max(0, ParseNumber("--fragment-cache-size", value));
+		}
+
+		private static int ParsePageSize(string value)
+		{
+			if (value == null)
+			{
+				return 1000;
+			}
+
+			return Math.Max(0, ParseNumber("--page-size", value));
+		}
+
+		private static void ParseShard(string value, out int index, out int count)
+		{
+			index = 1;
+			count = 1;
+			if (value == null)
+			{
+				return;
+			}
+
+			string[] parts = value.Split('/');
+			if (parts.Length != 2
+				|| !int.TryParse(parts[0], NumberStyles.None, CultureInfo.InvariantCulture, out index)
+				|| !int.TryParse(parts[1], NumberStyles.None, CultureInfo.InvariantCulture, out count)
+				|| count < 1
+				|| index < 1
+				|| index > count)
+			{
+				throw new ArgumentException("Expected --shard=i/N with 1 <= i <= N, but got " + value);
+			}
+		}
+
+		private static int ParseServe(string[] args)
+		{
+			string value = Find(args, "--serve=");
+			if (value != null)
+			{
+				int port;
+				if (!int.TryParse(value, NumberStyles.None, CultureInfo.InvariantCulture, out port)
+					|| port < 1
+					|| port > 65535)
+				{
+					throw new ArgumentException("Expected --serve=port with 1 <= port <= 65535, but got " + value);
+				}
+
+				return port;
+			}
+
+			return Has(args, "--serve") ? DefaultServePort : 0;
+		}
+
+		private static int ParseNumber(string option, string value)
+		{
+			int number;
+			if (!int.TryParse(value, NumberStyles.Integer, CultureInfo.InvariantCulture, out number))
+			{
+				throw new ArgumentException("Expected " + option + "=number, but got " + value);
+			}
+
+			return number;
+		}
+
+		private static string[] ParseList(string value, char separator)
+		{
+			if (value == null)
+			{
+				return null;
+			}
+
+			return value.Split(new[] { separator }, StringSplitOptions.RemoveEmptyEntries).Select(s => s.Trim()).ToArray();
+		}
+
+		private static bool Has(string[] args, string arg)
+		{
+			return args.Contains(arg);
+		}
 	}
 }
@@ -1,9 +1,10 @@
-﻿using IronPython.Hosting;
-using System;
+﻿using System;
 using System.Collections.Generic;
+using System.Diagnostics;
 using System.IO;
 using System.Linq;
 using System.Reflection;
+using System.Threading.Tasks;
 using System.Xml;
 
 namespace IglooCastle.CLI
@@ -18,6 +19,26 @@ namespace IglooCastle.CLI
 
 		private readonly Options _options;
 
+		private readonly StageTimer _stageTimer = new StageTimer();
+
+		/// <summary>
+		/// The loaded input assemblies and their documentation, by full path.
+		/// </summary>
+		private readonly Dictionary<string, Assembly> _assemblies = new Dictionary<string, Assembly>(StringComparer.OrdinalIgnoreCase);
+
+		private readonly Dictionary<string, Documentation> _documentations = new Dictionary<string, Documentation>(StringComparer.OrdinalIgnoreCase);
+
+		/// <summary>
+		/// In watch mode, the latest loaded version of every input assembly, by simple name.
+		/// </summary>
+		private readonly Dictionary<string, Assembly> _assembliesByName = new Dictionary<string, Assembly>(StringComparer.OrdinalIgnoreCase);
+
+		/// <summary>
+		/// Guards the state of the assembly resolver, which runs on the threads that scan the assemblies
+		/// and on the thread that starts the python engine.
+		/// </summary>
+		private readonly object _resolverLock = new object();
+
 		public Program(Options options)
 		{
 			_options = options;
@@ -33,6 +54,7 @@ namespace IglooCastle.CLI
 			#endif
 
 			_options.OutputDirectory = _options.OutputDirectory ?? Path.GetFullPath(Environment.CurrentDirectory);
+			_options.CompiledCache = _options.CompiledCache ?? Path.Combine(Path.GetTempPath(), "IglooCastle");
 		}
 
 		static void Main(string[] args)
@@ -43,20 +65,208 @@ namespace IglooCastle.CLI
 
 		private void Run()
 		{
-			// hook in assembly resolver event handler
-			AddAssemblyResolver();
+			dynamic generator;
+			object documentation;
+			if (_options.Snapshot != null)
+			{
+				// render from a previous run's snapshot, without loading any assembly
+				generator = LoadGenerator();
+				string snapshot = Path.GetFullPath(_options.Snapshot);
+				documentation = _stageTimer.Time("snapshot load", () => (object)generator.LoadSnapshot(snapshot));
+			}
+			else
+			{
+				// start the python engine while the assemblies are scanned
+				Task<object> loading = Task.Factory.StartNew(() => (object)LoadGenerator(), TaskCreationOptions.LongRunning);
+				documentation = ScanAssemblies();
+				generator = loading.GetAwaiter().GetResult();
+				if (_options.DumpSnapshot != null)
+				{
+					string snapshot = Path.GetFullPath(_options.DumpSnapshot);
+					_stageTimer.Time("snapshot dump", () => generator.DumpSnapshot(documentation, snapshot));
+				}
+			}
 
-			// aggregate documentation
-			Documentation documentation = new Documentation();
-			documentation = _options.InputAssemblies.Aggregate(
-				documentation,
-				(current, arg) => current.Merge(ProcessAssembly(arg)));
+			if (_options.Watch && _options.Snapshot != null)
+			{
+				Console.WriteLine("Can't watch a snapshot, generating once");
+			}
+			else if (_options.Watch)
+			{
+				Watch(generator, (Documentation)documentation);
+				return;
+			}
+
+			if (_options.Serve != 0)
+			{
+				// render the pages when they are requested, until the process is stopped
+				generator.Serve(documentation, _options, AssemblyPath);
+				return;
+			}
 
 			// run python generator
-			RunGenerator(documentation);
+			RunGenerator(generator, documentation);
 			Console.WriteLine("All done");
 		}
 
+		private Documentation ScanAssemblies()
+		{
+			// hook in assembly resolver event handler
+			AddAssemblyResolver();
+
+			ProcessAssemblies(InputAssemblyPaths.Distinct(StringComparer.OrdinalIgnoreCase).ToList());
+			return MergeDocumentations();
+		}
+
+		/// <summary>
+		/// Aggregates the documentation of the input assemblies.
+		/// </summary>
+		private Documentation MergeDocumentations()
+		{
+			return _stageTimer.Time("merge", () =>
+			{
+				List<Documentation> documentations = InputAssemblyPaths.Select(p => _documentations[p]).ToList();
+				Documentation merged = Documentation.Merge(documentations);
+
+				// the comments of an assembly can refer to the types of the others
+				foreach (Documentation documentation in documentations)
+				{
+					documentation.ResolveCrefsWith(merged);
+				}
+
+				return merged;
+			});
+		}
+
+		/// <summary>
+		/// Loads the given input assemblies, and then scans them and loads their XML files in parallel.
+		/// </summary>
+		/// <remarks>
+		/// All the assemblies are loaded before any is scanned, so that the references of every scanned type
+		/// bind to the assemblies loaded by this call, which matters when watch mode loads them again.
+		/// </remarks>
+		private void ProcessAssemblies(IList<string> paths)
+		{
+			foreach (string path in paths)
+			{
+				Console.WriteLine("Processing assembly {0}", path);
+				lock (_resolverLock)
+				{
+					_possibleAssemblyPaths.Add(Path.GetDirectoryName(path));
+				}
+
+				_assemblies[path] = _stageTimer.Time("assembly load", () => LoadAssembly(path));
+			}
+
+			Documentation[] documentations = new Documentation[paths.Count];
+			Parallel.For(0, paths.Count, i => documentations[i] = ProcessAssembly(paths[i]));
+			for (int i = 0; i < paths.Count; i++)
+			{
+				_documentations[paths[i]] = documentations[i];
+			}
+		}
+
+		/// <summary>
+		/// Writes the pages, and then writes again the pages affected by changes
+		/// of the input assemblies or their XML files, until the process is stopped.
+		/// </summary>
+		/// <remarks>
+		/// A changed XML file is reloaded, and only the pages that show a comment that changed are written.
+		/// A changed assembly is loaded again, along with the input assemblies that reference it,
+		/// since assemblies can't be unloaded and the references of the others would still bind to the old version.
+		/// </remarks>
+		private void Watch(dynamic generator, Documentation documentation)
+		{
+			string outputDirectory = Path.GetFullPath(_options.OutputDirectory);
+			dynamic session = generator.StartWatch(documentation, outputDirectory, _options, AssemblyPath);
+			ReportUnresolvedCrefs(documentation);
+
+			// the generator compresses the static files, like the pages
+			if (!_options.Gzip)
+			{
+				CopyStaticFiles(outputDirectory);
+			}
+
+			List<string> paths = InputAssemblyPaths.Distinct(StringComparer.OrdinalIgnoreCase).ToList();
+			IEnumerable<string> xmlFiles = paths.SelectMany(p => new[] { Path.ChangeExtension(p, "xml"), Path.ChangeExtension(p, "XML") });
+			using (InputWatcher watcher = new InputWatcher(paths.Concat(xmlFiles)))
+			{
+				Console.WriteLine("Watching {0} assemblies, press Ctrl+C to stop", paths.Count);
+				while (true)
+				{
+					ICollection<string> changed = watcher.WaitForChanges();
+					List<string> changedAssemblies = paths.Where(changed.Contains).ToList();
+					List<string> changedXml = paths
+						.Where(p => !changedAssemblies.Contains(p) && xmlFiles.Any(x => changed.Contains(x) && IsXmlFileOf(x, p)))
+						.ToList();
+
+					if (changedAssemblies.Any())
+					{
+						List<string> rescanned = WithDependents(changedAssemblies);
+						HashSet<string> typeNames = new HashSet<string>(rescanned.SelectMany(TypeNames));
+						ProcessAssemblies(rescanned);
+
+						typeNames.UnionWith(rescanned.SelectMany(TypeNames));
+						documentation = MergeDocumentations();
+						session.AssembliesChanged(documentation, typeNames.ToArray());
+						ReportUnresolvedCrefs(documentation);
+					}
+
+					foreach (string path in changedXml)
+					{
+						Console.WriteLine("Reloading xml documentation of {0}", path);
+						_documentations[path].ReloadDocumentationFromAssemblyFile(_assemblies[path], path);
+					}
+
+					if (changedXml.Any())
+					{
+						session.CommentsChanged();
+						ReportUnresolvedCrefs(documentation);
+					}
+				}
+			}
+		}
+
+		private IEnumerable<string> InputAssemblyPaths
+		{
+			get { return _options.InputAssemblies.Select(Path.GetFullPath); }
+		}
+
+		private static bool IsXmlFileOf(string xmlFile, string assemblyFile)
+		{
+			return string.Equals(xmlFile, Path.ChangeExtension(assemblyFile, Path.GetExtension(xmlFile)), StringComparison.OrdinalIgnoreCase);
+		}
+
+		private IEnumerable<string> TypeNames(string assemblyFile)
+		{
+			return _documentations[assemblyFile].Types.Select(t => t.ToString("f"));
+		}
+
+		/// <summary>
+		/// Returns the given input assemblies and the input assemblies that reference them, directly or not.
+		/// </summary>
+		private List<string> WithDependents(ICollection<string> assemblyFiles)
+		{
+			HashSet<string> names = new HashSet<string>(assemblyFiles.Select(p => _assemblies[p].GetName().Name), StringComparer.OrdinalIgnoreCase);
+			List<string> result = new List<string>(assemblyFiles);
+			bool added = true;
+			while (added)
+			{
+				added = false;
+				foreach (string path in _assemblies.Keys.Where(p => !result.Contains(p)).ToList())
+				{
+					if (_assemblies[path].GetReferencedAssemblies().Any(r => names.Contains(r.Name)))
+					{
+						result.Add(path);
+						names.Add(_assemblies[path].GetName().Name);
+						added = true;
+					}
+				}
+			}
+
+			return result;
+		}
+
 		private void AddAssemblyResolver()
 		{
 			AppDomain.CurrentDomain.AssemblyResolve += CurrentDomain_AssemblyResolve;
@@ -64,35 +274,97 @@ namespace IglooCastle.CLI
 		
 		private Assembly CurrentDomain_AssemblyResolve(object sender, ResolveEventArgs args)
 		{
+			Assembly loaded;
+			string[] possibleAssemblyPaths;
+			lock (_resolverLock)
+			{
+				if (_assembliesByName.TryGetValue(new AssemblyName(args.Name).Name, out loaded))
+				{
+					return loaded;
+				}
+
+				possibleAssemblyPaths = _possibleAssemblyPaths.ToArray();
+			}
+
 			return (
-				from p in _possibleAssemblyPaths
+				from p in possibleAssemblyPaths
 				let fullPath = Path.Combine(p, args.Name) + ".dll"
 				where File.Exists(fullPath)
 				select Assembly.LoadFrom(fullPath)
 			).FirstOrDefault();
 		}
 
-		private void RunGenerator(Documentation documentation)
+		/// <summary>
+		/// Gets the path of IglooCastle.exe.
+		/// This is also the path where the CSS/JS are supposed to be and also the generator.py.
+		/// </summary>
+		private static string AssemblyPath
+		{
+			get { return Path.GetFullPath(Path.GetDirectoryName(Assembly.GetExecutingAssembly().Location)); }
+		}
+
+		/// <summary>
+		/// Loads generator.py, timing the creation of the python engine and the loading of the module separately.
+		/// The same module, in the same engine, renders all the pages of the run, including those of watch mode.
+		/// </summary>
+		private dynamic LoadGenerator()
+		{
+			GeneratorLoader loader = new GeneratorLoader(AssemblyPath, _options.CompiledCache);
+			Stopwatch stopwatch = Stopwatch.StartNew();
+			_stageTimer.Time("python engine", () => loader.Engine);
+			TimeSpan engine = stopwatch.Elapsed;
+			dynamic module = _stageTimer.Time("generator load", () => loader.Load());
+			TimeSpan startup = stopwatch.Elapsed;
+			Console.WriteLine(
+				"Started the generator in {0:F3} s: python engine {1:F3} s, generator load {2:F3} s ({3})",
+				startup.TotalSeconds,
+				engine.TotalSeconds,
+				(startup - engine).TotalSeconds,
+				loader.CacheFile == null ? "from source" : loader.FromCache ? "compiled, cached" : "compiled now");
+			return module;
+		}
+
+		private void RunGenerator(dynamic generator, object documentation)
 		{
 			string outputDirectory = Path.GetFullPath(_options.OutputDirectory);
 
-			// path of IglooCastle.exe
-			// this is also the path where the CSS/JS are supposed to be and also the generator.py
-			string assemblyPath = Path.GetFullPath(Path.GetDirectoryName(Assembly.GetExecutingAssembly().Location));
+			// run dynamic generator
+			generator.Generate(documentation, outputDirectory, _options, _stageTimer, AssemblyPath);
+			if (documentation is Documentation)
+			{
+				ReportUnresolvedCrefs((Documentation)documentation);
+			}
 
-			// prepare python engine
-			var engine = Python.CreateEngine();
-			var searchPaths = engine.GetSearchPaths();
-			searchPaths.Add(assemblyPath);
-			engine.SetSearchPaths(searchPaths);
+			// for a sharded build, the merge step copies the static files;
+			// the generator writes them to an archive and compresses them, like the pages
+			if (!_options.IsShard && _options.Archive == null && !_options.Gzip)
+			{
+				CopyStaticFiles(outputDirectory);
+			}
+		}
 
-			// load generator.py
-			dynamic generator = engine.Runtime.UseFile("generator.py");
+		/// <summary>
+		/// Prints the crefs of the XML comments that couldn't be resolved since the previous report,
+		/// unless only errors are printed.
+		/// </summary>
+		private void ReportUnresolvedCrefs(Documentation documentation)
+		{
+			ICollection<string> unresolved = documentation.Crefs.TakeUnresolved();
+			if (_options.Verbosity < 1)
+			{
+				return;
+			}
 
-			// run dynamic generator
-			generator.Generate(documentation, outputDirectory);
+			foreach (string cref in unresolved)
+			{
+				Console.WriteLine("Could not resolve cref {0}", cref);
+			}
+		}
 
+		private static void CopyStaticFiles(string outputDirectory)
+		{
 			// copy CSS/JS to output folder
+			string assemblyPath = AssemblyPath;
 			if (assemblyPath != outputDirectory)
 			{
 				Console.WriteLine("Copying static files");
@@ -116,18 +388,34 @@ namespace IglooCastle.CLI
 			}
 		}
 
-		private Documentation ProcessAssembly(string file)
+		private Assembly LoadAssembly(string fullPath)
 		{
-			Console.WriteLine("Processing assembly {0}", file);
+			if (!_options.Watch)
+			{
+				return Assembly.LoadFrom(fullPath);
+			}
 
+			// LoadFrom would return the assembly that was loaded before the file changed
+			Assembly assembly = Assembly.Load(File.ReadAllBytes(fullPath));
+			lock (_resolverLock)
+			{
+				_assembliesByName[assembly.GetName().Name] = assembly;
+			}
+
+			return assembly;
+		}
+
+		/// <summary>
+		/// Scans the loaded input assembly with the given full path and loads its XML file.
+		/// </summary>
+		private Documentation ProcessAssembly(string fullPath)
+		{
 			try
 			{
-				string fullPath = Path.GetFullPath(file);
-				_possibleAssemblyPaths.Add(Path.GetDirectoryName(fullPath));
-				Assembly assembly = Assembly.LoadFrom(fullPath);
+				Assembly assembly = _assemblies[fullPath];
 				Documentation documentation = new Documentation();
-				documentation.Scan(assembly);
-				if (!documentation.AddDocumentationFromAssemblyFile(assembly, fullPath))
+				_stageTimer.Time("scan", () => documentation.Scan(assembly));
+				if (!_stageTimer.Time("xml load", () => documentation.AddDocumentationFromAssemblyFile(assembly, fullPath)))
 				{
 					Console.WriteLine("Could not find matching xml file for assembly {0}", fullPath);
 				}
@@ -136,7 +424,7 @@ namespace IglooCastle.CLI
 			}
 			catch (ReflectionTypeLoadException ex)
 			{
-				Console.WriteLine("Could not load assembly {0}", file);
+				Console.WriteLine("Could not load assembly {0}", fullPath);
 				foreach (Exception loaderEx in ex.LoaderExceptions)
 				{
 					Console.WriteLine(loaderEx);
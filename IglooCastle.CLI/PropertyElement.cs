@@ -94,9 +94,9 @@ namespace IglooCastle.CLI
 
 		protected override IXmlComment GetXmlComment()
 		{
-			IXmlComment result = Documentation.GetXmlComment("//member[@name=\"P:" +
+			IXmlComment result = Documentation.GetXmlComment("P:" +
 					Property.ReflectedType.FullName + "." +
-					Property.Name + "\"]");
+					Property.Name);
 
 			if (result == null)
 			{
@@ -0,0 +1,106 @@
+﻿using System;
+using System.Diagnostics;
+using System.IO;
+using System.IO.Compression;
+
+namespace IglooCastle.CLI
+{
+	/// <summary>
+	/// A zip archive that the generated files are written to, instead of one file each in the output directory.
+	/// </summary>
+	/// <remarks>
+	/// Several threads can add files at once; the entries are written one at a time.
+	/// </remarks>
+	public sealed class SiteArchive : IDisposable
+	{
+		private readonly object _lock = new object();
+		private readonly string _fileName;
+		private ZipArchive _archive;
+		private int _files;
+		private long _uncompressedSize;
+		private TimeSpan _compressionTime;
+
+		/// <summary>
+		/// Creates the archive with the given file name, replacing the file if it exists.
+		/// </summary>
+		public SiteArchive(string fileName)
+		{
+			_fileName = fileName;
+			_archive = new ZipArchive(File.Create(fileName), ZipArchiveMode.Create);
+		}
+
+		/// <summary>
+		/// Gets the number of files added so far.
+		/// </summary>
+		public int Files
+		{
+			get { lock (_lock) { return _files; } }
+		}
+
+		/// <summary>
+		/// Gets the total size of the added files, in bytes.
+		/// </summary>
+		public long UncompressedSize
+		{
+			get { lock (_lock) { return _uncompressedSize; } }
+		}
+
+		/// <summary>
+		/// Gets the size of the archive, in bytes. It is known once the archive is disposed.
+		/// </summary>
+		public long CompressedSize
+		{
+			get { return new FileInfo(_fileName).Length; }
+		}
+
+		/// <summary>
+		/// Gets the total time spent compressing, including writing the end of the archive when it is disposed.
+		/// </summary>
+		public TimeSpan CompressionTime
+		{
+			get { lock (_lock) { return _compressionTime; } }
+		}
+
+		/// <summary>
+		/// Adds a file with the given name and contents.
+		/// </summary>
+		public void Add(string name, byte[] contents)
+		{
+			lock (_lock)
+			{
+				Stopwatch stopwatch = Stopwatch.StartNew();
+				ZipArchiveEntry entry = _archive.CreateEntry(name, CompressionLevel.Optimal);
+				using (Stream stream = entry.Open())
+				{
+					stream.Write(contents, 0, contents.Length);
+				}
+
+				_files++;
+				_uncompressedSize += contents.Length;
+				_compressionTime += stopwatch.Elapsed;
+			}
+		}
+
+		/// <summary>
+		/// Adds a copy of the given file, with the given name.
+		/// </summary>
+		public void AddFile(string name, string file)
+		{
+			Add(name, File.ReadAllBytes(file));
+		}
+
+		public void Dispose()
+		{
+			lock (_lock)
+			{
+				if (_archive != null)
+				{
+					Stopwatch stopwatch = Stopwatch.StartNew();
+					_archive.Dispose();
+					_archive = null;
+					_compressionTime += stopwatch.Elapsed;
+				}
+			}
+		}
+	}
+}
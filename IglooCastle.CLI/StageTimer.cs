@@ -0,0 +1,91 @@
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Linq;
+
+namespace IglooCastle.CLI
+{
+	/// <summary>
+	/// Measures how long the stages of a run take.
+	/// </summary>
+	/// <remarks>
+	/// A stage that runs several times, e.g. once per assembly, is reported once,
+	/// with the total time of all its runs. Stages can run on several threads at once,
+	/// so the total of a stage can be longer than the wall time of the run.
+	/// </remarks>
+	public sealed class StageTimer
+	{
+		private readonly object _lock = new object();
+		private readonly List<string> _names = new List<string>();
+		private readonly Dictionary<string, TimeSpan> _elapsed = new Dictionary<string, TimeSpan>();
+
+		/// <summary>
+		/// Gets the stages, in the order they first ran, with their total time.
+		/// </summary>
+		public ICollection<KeyValuePair<string, TimeSpan>> Stages
+		{
+			get
+			{
+				lock (_lock)
+				{
+					return _names.Select(n => new KeyValuePair<string, TimeSpan>(n, _elapsed[n])).ToList();
+				}
+			}
+		}
+
+		/// <summary>
+		/// Runs the given function as part of the given stage.
+		/// </summary>
+		/// <param name="stage">The name of the stage.</param>
+		/// <param name="function">The function to run.</param>
+		/// <returns>The result of the function.</returns>
+		public T Time<T>(string stage, Func<T> function)
+		{
+			Stopwatch stopwatch = Stopwatch.StartNew();
+			try
+			{
+				return function();
+			}
+			finally
+			{
+				Add(stage, stopwatch.Elapsed);
+			}
+		}
+
+		/// <summary>
+		/// Runs the given action as part of the given stage.
+		/// </summary>
+		/// <param name="stage">The name of the stage.</param>
+		/// <param name="action">The action to run.</param>
+		public void Time(string stage, Action action)
+		{
+			Time(stage, () =>
+			{
+				action();
+				return true;
+			});
+		}
+
+		/// <summary>
+		/// Adds the given time to a stage.
+		/// </summary>
+		/// <param name="stage">The name of the stage.</param>
+		/// <param name="elapsed">The time spent in the stage.</param>
+		public void Add(string stage, TimeSpan elapsed)
+		{
+			lock (_lock)
+			{
+				TimeSpan total;
+				if (_elapsed.TryGetValue(stage, out total))
+				{
+					_elapsed[stage] = total + elapsed;
+				}
+				else
+				{
+					_names.Add(stage);
+					_elapsed.Add(stage, elapsed);
+				}
+			}
+		}
+	}
+}
@@ -188,7 +188,7 @@ namespace IglooCastle.CLI
 		{
 			get
 			{
-				return Documentation.Types.SelectMany(t => t.Methods).Where(m => m.IsExtension() && m.GetParameters()[0].ParameterType.IsAssignableFrom(this)).ToList();
+				return Documentation.ExtensionMethods.ForType(this);
 			}
 		}
 
@@ -224,12 +224,12 @@ namespace IglooCastle.CLI
 
 		public ICollection<TypeElement> GetChildTypes()
 		{
-			return Documentation.Types.Where(t => t.IsChildTypeOf(this)).ToList();
+			return Documentation.TypeHierarchy.GetChildTypes(this);
 		}
 
 		public ICollection<TypeElement> GetDescendantTypes()
 		{
-			return Documentation.Types.Where(t => t.IsDescendantTypeOf(this)).ToList();
+			return Documentation.TypeHierarchy.GetDescendantTypes(this);
 		}
 
 		public TypeElement[] GetGenericArguments()
@@ -324,7 +324,7 @@ namespace IglooCastle.CLI
 
 		protected override IXmlComment GetXmlComment()
 		{
-			return Documentation.GetXmlComment("//member[@name=\"T:" + Type.FullName + "\"]");
+			return Documentation.GetXmlComment("T:" + Type.FullName);
 		}
 
 		public TypeElement GetElementType()
@@ -0,0 +1,107 @@
+using System;
+using System.Collections.Generic;
+using System.Linq;
+
+namespace IglooCastle.CLI
+{
+	/// <summary>
+	/// Indexes the inheritance relationships between the types of a documentation.
+	/// </summary>
+	/// <remarks>
+	/// The index is built once, by walking the base type chain of every type.
+	/// Looking up the children or descendants of a type is then a dictionary lookup,
+	/// instead of a scan over all types.
+	/// </remarks>
+	internal sealed class TypeHierarchy
+	{
+		private readonly Dictionary<Type, List<TypeElement>> _children = new Dictionary<Type, List<TypeElement>>();
+		private readonly Dictionary<Type, List<TypeElement>> _descendants = new Dictionary<Type, List<TypeElement>>();
+
+		/// <summary>
+		/// Creates an instance of this class.
+		/// </summary>
+		/// <param name="types">The types to index.</param>
+		public TypeHierarchy(IEnumerable<TypeElement> types)
+		{
+			foreach (TypeElement type in types)
+			{
+				Type baseType = type.Type.BaseType;
+				if (baseType == null)
+				{
+					continue;
+				}
+
+				foreach (Type parentKey in ParentKeys(baseType))
+				{
+					Add(_children, parentKey, type);
+				}
+
+				HashSet<Type> ancestorKeys = new HashSet<Type>();
+				for (Type ancestor = baseType; ancestor != null; ancestor = ancestor.BaseType)
+				{
+					ancestorKeys.UnionWith(ParentKeys(ancestor));
+				}
+
+				foreach (Type ancestorKey in ancestorKeys)
+				{
+					Add(_descendants, ancestorKey, type);
+				}
+			}
+		}
+
+		/// <summary>
+		/// Gets the types that derive directly from the given type.
+		/// </summary>
+		/// <seealso cref="TypeElement.IsChildTypeOf"/>
+		public ICollection<TypeElement> GetChildTypes(TypeElement type)
+		{
+			return Get(_children, type);
+		}
+
+		/// <summary>
+		/// Gets the types that derive directly or indirectly from the given type.
+		/// </summary>
+		/// <seealso cref="TypeElement.IsDescendantTypeOf"/>
+		public ICollection<TypeElement> GetDescendantTypes(TypeElement type)
+		{
+			return Get(_descendants, type);
+		}
+
+		/// <summary>
+		/// Gets the types under which a type deriving from the given base type is indexed.
+		/// A type deriving from a constructed generic type is also a child of its generic type definition.
+		/// </summary>
+		private static IEnumerable<Type> ParentKeys(Type baseType)
+		{
+			yield return baseType;
+
+			if (baseType.IsGenericType && !baseType.IsGenericTypeDefinition)
+			{
+				yield return baseType.GetGenericTypeDefinition();
+			}
+		}
+
+		private static void Add(Dictionary<Type, List<TypeElement>> index, Type key, TypeElement type)
+		{
+			List<TypeElement> list;
+			if (!index.TryGetValue(key, out list))
+			{
+				list = new List<TypeElement>();
+				index.Add(key, list);
+			}
+
+			list.Add(type);
+		}
+
+		private static ICollection<TypeElement> Get(Dictionary<Type, List<TypeElement>> index, TypeElement type)
+		{
+			List<TypeElement> list;
+			if (type == null || !index.TryGetValue(type.Type, out list))
+			{
+				return new List<TypeElement>();
+			}
+
+			return list.ToList();
+		}
+	}
+}
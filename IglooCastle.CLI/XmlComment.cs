@@ -6,8 +6,9 @@ namespace IglooCastle.CLI
 {
 	public sealed class XmlComment : IXmlComment
 	{
-		private readonly XmlElement _documentationNode;
 		private readonly Documentation _documentation;
+		private readonly string _xml;
+		private XmlElement _documentationNode;
 
 		public XmlComment(Documentation documentation, XmlElement documentationNode)
 		{
@@ -15,21 +16,51 @@ namespace IglooCastle.CLI
 			_documentationNode = documentationNode;
 		}
 
+		/// <summary>
+		/// Creates an instance of this class from the inner XML of a member element,
+		/// as held by <see cref="XmlCommentStore"/>. It is parsed when it is first used.
+		/// </summary>
+		public XmlComment(Documentation documentation, string xml)
+		{
+			_documentation = documentation;
+			_xml = xml;
+		}
+
 		public string Section(string name)
 		{
-			return FormatComment(_documentationNode.SelectSingleNode(name)).Trim();
+			return FormatComment(DocumentationNode.SelectSingleNode(name)).Trim();
 		}
 
 		public string Section(string sectionName, string attributeName, string attributeValue)
 		{
 			return FormatComment(
-				_documentationNode.SelectSingleNode(
+				DocumentationNode.SelectSingleNode(
 					string.Format("{0}[@{1}=\"{2}\"]", sectionName, attributeName, attributeValue))).Trim();
 		}
 
 		public string InnerText
 		{
-			get { return _documentationNode.InnerText; }
+			get { return DocumentationNode.InnerText; }
+		}
+
+		public string Xml
+		{
+			get { return _xml ?? _documentationNode.OuterXml; }
+		}
+
+		private XmlElement DocumentationNode
+		{
+			get
+			{
+				if (_documentationNode == null)
+				{
+					XmlDocument doc = new XmlDocument();
+					doc.LoadXml("<member>" + _xml + "</member>");
+					_documentationNode = doc.DocumentElement;
+				}
+
+				return _documentationNode;
+			}
 		}
 
 		private string FormatChildren(XmlNode node)
@@ -69,42 +100,17 @@ namespace IglooCastle.CLI
 
 				if (node.Name == "see")
 				{
-					string cref = node.Attributes["cref"].Value;
-					object resolvedCref = ResolveCref(cref);
-					if (resolvedCref is TypeElement)
+					XmlAttribute cref = node.Attributes["cref"];
+					if (cref == null)
 					{
-						return new TypePrinter(_documentation).Print((TypeElement)resolvedCref);
+						return FormatChildren(node);
 					}
 
-					return string.Format("<code>{0}</code>", cref);
+					return _documentation.Crefs.Print(cref.Value) ?? string.Format("<code>{0}</code>", cref.Value);
 				}
 			}
 
 			return FormatChildren(node);
 		}
-
-		private object ResolveCref(string cref)
-		{
-			string[] parts = cref.Split(':');
-			if (parts[0] == "T")
-			{
-				return ResolveTypeCref(parts[1]);
-			}
-
-			// TODO: implement
-			return null;
-		}
-
-		private TypeElement ResolveTypeCref(string typeName)
-		{
-			Type resolvedType = Type.GetType(typeName, false);
-			if (resolvedType == null)
-			{
-				Console.WriteLine("Could not resolve type {0}", typeName);
-				return null;
-			}
-
-			return _documentation.Find(resolvedType);
-		}
 	}
 }
@@ -0,0 +1,84 @@
+﻿using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Xml;
+
+namespace IglooCastle.CLI
+{
+	/// <summary>
+	/// Holds the member comments of an XML documentation file, as XML fragments by documentation ID.
+	/// </summary>
+	/// <remarks>
+	/// The file is read once with a forward-only reader, instead of being kept as a DOM for the whole run.
+	/// A fragment is only parsed when its <see cref="XmlComment"/> is used.
+	/// </remarks>
+	public sealed class XmlCommentStore
+	{
+		private readonly Dictionary<string, string> _members = new Dictionary<string, string>(StringComparer.Ordinal);
+
+		private XmlCommentStore(string fileName)
+		{
+			FileName = fileName;
+		}
+
+		/// <summary>
+		/// Gets the file that the comments were read from, or <c>null</c> if they were not read from a file.
+		/// </summary>
+		public string FileName { get; private set; }
+
+		/// <summary>
+		/// Gets the inner XML of the member elements, by their name attribute, e.g. <c>T:IglooCastle.CLI.Documentation</c>.
+		/// When a member is documented more than once, the first one wins.
+		/// </summary>
+		public IDictionary<string, string> Members
+		{
+			get { return _members; }
+		}
+
+		/// <summary>
+		/// Reads the member comments of the given XML documentation file.
+		/// </summary>
+		public static XmlCommentStore Load(string fileName)
+		{
+			using (XmlReader reader = XmlReader.Create(fileName))
+			{
+				return Load(reader, fileName);
+			}
+		}
+
+		/// <summary>
+		/// Reads the member comments of an XML documentation file from the given reader.
+		/// </summary>
+		public static XmlCommentStore Load(TextReader textReader)
+		{
+			using (XmlReader reader = XmlReader.Create(textReader))
+			{
+				return Load(reader, null);
+			}
+		}
+
+		private static XmlCommentStore Load(XmlReader reader, string fileName)
+		{
+			XmlCommentStore store = new XmlCommentStore(fileName);
+			reader.MoveToContent();
+			while (!reader.EOF)
+			{
+				if (reader.NodeType != XmlNodeType.Element || reader.Name != "member")
+				{
+					reader.Read();
+					continue;
+				}
+
+				// reading the inner XML moves to the node after the member, which can be the next member
+				string name = reader.GetAttribute("name");
+				string xml = reader.ReadInnerXml();
+				if (name != null && !store._members.ContainsKey(name))
+				{
+					store._members.Add(name, xml);
+				}
+			}
+
+			return store;
+		}
+	}
+}
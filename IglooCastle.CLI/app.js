@@ -24,25 +24,219 @@ var myLocalStorage = (function() {
 
 })();
 
+// looks up the search index that generator.py writes:
+// search.json lists the shards and the best entries for every first character,
+// and every shard has the entries whose title starts with the same prefix, sorted.
+// A shard is only downloaded when a query needs it.
+var searchIndex = (function() {
+	var MAX_RESULTS = 50,
+		manifest = null,
+		shards = {};
+
+	function shardName(key, prefixLength) {
+		return key.substr(0, prefixLength).replace(/[^a-z0-9]/g, '_');
+	}
+
+	function loadManifest(callback) {
+		if (manifest) {
+			callback(manifest);
+			return;
+		}
+
+		$.getJSON('search.json', function(data) {
+			manifest = data;
+			callback(manifest);
+		});
+	}
+
+	function loadShard(name, callback) {
+		if (shards[name]) {
+			callback(shards[name]);
+			return;
+		}
+
+		$.getJSON('search-' + name + '.json', function(data) {
+			var entries = data.entries,
+				i;
+
+			// resolve the contexts and keep the lower case titles, to match the queries against
+			for (i = 0; i < entries.length; i++) {
+				entries[i] = [entries[i][0], entries[i][1], data.contexts[entries[i][2]], entries[i][0].toLowerCase()];
+			}
+
+			shards[name] = entries;
+			callback(entries);
+		});
+	}
+
+	// the entries are sorted by their lower case title,
+	// so the matches are found by binary search instead of by scanning the shard
+	function findPrefix(entries, key) {
+		var low = 0,
+			high = entries.length,
+			middle,
+			results = [];
+
+		while (low < high) {
+			middle = (low + high) >> 1;
+			if (entries[middle][3] < key) {
+				low = middle + 1;
+			} else {
+				high = middle;
+			}
+		}
+
+		for (; low < entries.length && results.length < MAX_RESULTS && entries[low][3].indexOf(key) === 0; low++) {
+			results.push(entries[low]);
+		}
+
+		return results;
+	}
+
+	function lookup(query, callback) {
+		var key = $.trim(query).toLowerCase();
+		if (!key) {
+			callback([]);
+			return;
+		}
+
+		loadManifest(function(manifest) {
+			var name;
+			if (key.length < manifest.prefix) {
+				// answered by search.json alone, so the first keystroke needs no shard
+				callback($.grep(manifest.top[shardName(key, 1)] || [], function(entry) {
+					return entry[0].toLowerCase().indexOf(key) === 0;
+				}));
+				return;
+			}
+
+			name = shardName(key, manifest.prefix);
+			if (!manifest.shards[name]) {
+				callback([]);
+				return;
+			}
+
+			loadShard(name, function(entries) {
+				callback(findPrefix(entries, key));
+			});
+		});
+	}
+
+	return {
+		lookup : lookup
+	};
+
+})();
+
 $(function() {
-	function bindEvents() {
-		// handler for expand/collapse tree
-		$('.js-expander').click(function() {
-			var $jsExpander = $(this),
-				$li = $jsExpander.closest('li'),
-				$ol = $li.children('ol');
+	// a branch of the navigation tree with more items than this is shown and hidden at once, without sliding
+	var MAX_ANIMATED_NAV_ITEMS = 50,
+		// a branch with more items than this is shown this many items per frame, so that the first ones paint at once
+		NAV_CHUNK_SIZE = 200,
+		nextFrame = window.requestAnimationFrame
+			? function(callback) { window.requestAnimationFrame(callback); }
+			: function(callback) { setTimeout(callback, 16); };
+
+	function initSearch() {
+		var $search = $('<div class="search"><input type="search" class="js-search" placeholder="Search" /><ol class="js-search-results"></ol></div>'),
+			$results = $search.children('.js-search-results'),
+			latestQuery = null;
+
+		$search.children('.js-search').on('input', function() {
+			var query = $(this).val();
+			latestQuery = query;
+			searchIndex.lookup(query, function(results) {
+				// a shard that loads slowly must not overwrite the results of a later query
+				if (query !== latestQuery) {
+					return;
+				}
+
+				$results.empty();
+				$.each(results, function(index, entry) {
+					$('<li>')
+						.append($('<a>').attr('href', entry[1]).text(entry[0]))
+						.append($('<span class="context">').text(entry[2]))
+						.appendTo($results);
+				});
+			});
+		});
+
+		$('nav').prepend($search);
+	}
+
+	// a collapsed branch is hidden by the collapsed class of its item,
+	// so that collapsing the tree doesn't set the style of every list
+	function setCollapsed($li, collapsed) {
+		$li.toggleClass('collapsed', collapsed);
+		$li.children('.js-expander')
+			.toggleClass('js-collapsed', collapsed)
+			.text(collapsed ? '+' : '-');
+	}
+
+	// expands a big branch with only its first items shown, and shows the others a chunk per frame
+	function expandInChunks($li, $items) {
+		var shown = NAV_CHUNK_SIZE,
+			expansion = ($li.data('expansion') || 0) + 1;
+
+		$li.data('expansion', expansion);
+		$items.slice(shown).addClass('pending');
+		setCollapsed($li, false);
 
-			if ($jsExpander.hasClass('js-collapsed')) {
-				$jsExpander.removeClass('js-collapsed');
-				$jsExpander.text('-');
-				$ol.slideDown();
+		function showNextChunk() {
+			// the branch was expanded again meanwhile, which shows its items itself
+			if ($li.data('expansion') !== expansion) {
+				return;
+			}
+
+			$items.slice(shown, shown + NAV_CHUNK_SIZE).removeClass('pending');
+			shown += NAV_CHUNK_SIZE;
+			if (shown < $items.length) {
+				nextFrame(showNextChunk);
+			}
+		}
+
+		nextFrame(showNextChunk);
+	}
+
+	function bindNavEvents() {
+		// handler for expand/collapse tree, one for all the expanders of the tree
+		$('nav').on('click', '.js-expander', function() {
+			var $li = $(this).closest('li'),
+				$ol = $li.children('ol'),
+				$items = $ol.children(),
+				collapse;
+
+			// a click during the animation finishes it first
+			$ol.stop(true, true);
+			collapse = !$li.hasClass('collapsed');
+			if ($items.length > NAV_CHUNK_SIZE && !collapse) {
+				expandInChunks($li, $items);
+			} else if ($items.length > MAX_ANIMATED_NAV_ITEMS) {
+				setCollapsed($li, collapse);
+			} else if (collapse) {
+				$ol.slideUp(function() {
+					setCollapsed($li, true);
+					$ol.css('display', '');
+				});
 			} else {
-				$jsExpander.addClass('js-collapsed');
-				$jsExpander.text('+');
-				$ol.slideUp();
+				$ol.hide();
+				setCollapsed($li, false);
+				$ol.slideDown(function() {
+					$ol.css('display', '');
+				});
 			}
 		});
+	}
+
+	// the rows of inherited and protected members are hidden by classes of the body,
+	// so that a change restyles the tables at once, instead of row by row
+	function applyFilters() {
+		$('body')
+			.toggleClass('hide-inherited', !myLocalStorage.showInherited())
+			.toggleClass('hide-protected', !myLocalStorage.showProtected());
+	}
 
+	function bindEvents() {
 		$('.js-show-inherited').change(function() {
 			var showInherited = $(this).prop("checked");
 
@@ -51,19 +245,7 @@ $(function() {
 
 			// save to local storage
 			myLocalStorage.showInherited(showInherited);
-
-			if (showInherited) {
-				// show inherited
-				$("tr.inherited").show();
-
-				// but not protected, if not set
-				if (!myLocalStorage.showProtected()) {
-					$("tr.Family").hide();
-				}
-			} else {
-				// hide inherited (perhaps also protected)
-				$("tr.inherited").hide();
-			}
+			applyFilters();
 		});
 
 		$('.js-show-protected').change(function() {
@@ -74,64 +256,114 @@ $(function() {
 
 			// save to local storage
 			myLocalStorage.showProtected(showProtected);
+			applyFilters();
+		});
+	}
+
 
-			if (showProtected) {
-				// show protected
-				$("tr.Family").show();
+	// a large class diagram lists its root types, and the types deriving from a type
+	// are added from the data file of the diagram when the type is expanded
+	function initClassDiagram() {
+		var $diagram = $('.js-class-diagram'),
+			types = null,
+			children = null;
 
-				// but not protected, if not set
-				if (!myLocalStorage.showInherited()) {
-					$("tr.inherited").hide();
+		// the data file has every type as [index of the parent or -1, link], depth first
+		function loadTypes(callback) {
+			if (children) {
+				callback();
+				return;
+			}
+
+			$.getJSON($diagram.data('src'), function(data) {
+				var i;
+				types = data.types;
+				children = {};
+				for (i = 0; i < types.length; i++) {
+					(children[types[i][0]] = children[types[i][0]] || []).push(i);
 				}
-			} else {
-				// hide protected (perhaps also inherited)
-				$("tr.Family").hide();
+
+				callback();
+			});
+		}
+
+		function addChildren($li) {
+			var $ul = $('<ul>');
+			$.each(children[$li.data('index')] || [], function(ignored, index) {
+				var $child = $('<li>').attr('data-index', index).html(types[index][1]);
+				if (children[index]) {
+					$child.prepend('<span class="js-expander js-collapsed">+</span> ');
+				}
+
+				$ul.append($child);
+			});
+
+			$li.append($ul);
+		}
+
+		$diagram.on('click', '.js-expander', function() {
+			var $jsExpander = $(this),
+				$li = $jsExpander.parent();
+
+			if (!$jsExpander.hasClass('js-collapsed')) {
+				$jsExpander.addClass('js-collapsed').text('+');
+				$li.children('ul').hide();
+				return;
 			}
+
+			$jsExpander.removeClass('js-collapsed').text('-');
+			loadTypes(function() {
+				// the children are added once, by the first click that finds them missing
+				if (!$li.children('ul').length) {
+					addChildren($li);
+				}
+
+				$li.children('ul').toggle(!$jsExpander.hasClass('js-collapsed'));
+			});
 		});
 	}
 
+	function isSelected(href, current) {
+		if (current) {
+			return href === current;
+		}
 
-	bindEvents();
+		return window.location.href.indexOf(href) > 0;
+	}
 
-	// collapse up to class level initially
-	$('nav > ol > li > ol > li .js-expander').each(function() {
-		var $jsExpander = $(this),
-			$li = $jsExpander.closest('li'),
-			$ol = $li.children('ol');
-
-		$jsExpander.addClass('js-collapsed');
-		$jsExpander.text('+');
-		$ol.hide();
-	});
-
-	// but expand the selected and mark it bold
-	$('nav a').each(function() {
-		var $a = $(this),
-			$li = $a.closest('li'),
-			$parents;
-
-		if (window.location.href.indexOf($a.attr('href')) > 0) {
-			$li.addClass('selected');
-			$parents = $a.parents('li');
-			$parents.each(function() {
-				var $parent = $(this);
-				var $jsExpander = $parent.children('.js-expander');
-				var $ol = $parent.children('ol');
-				$jsExpander.removeClass('js-collapsed');
-				$jsExpander.text('-');
-				$ol.show();
-			});
-		}
-	});
+	function initNav(current) {
+		bindNavEvents();
 
-	$('.js-show-inherited').prop('checked', myLocalStorage.showInherited());
-	$('.js-show-protected').prop('checked', myLocalStorage.showProtected());
+		// collapse up to class level initially
+		setCollapsed($('nav > ol > li > ol > li .js-expander').parent(), true);
 
-	if (!myLocalStorage.showInherited()) {
-		$("tr.inherited").hide();
+		// but expand the selected and mark it bold
+		$('nav a').filter(function() {
+			return isSelected(this.getAttribute('href'), current);
+		}).each(function() {
+			var $a = $(this);
+			$a.closest('li').addClass('selected');
+			setCollapsed($a.parents('li'), false);
+		});
 	}
 
-	if (!myLocalStorage.showProtected()) {
-		$("tr.Family").hide();
+	bindEvents();
+	initClassDiagram();
+
+	// the navigation tree is either inlined in the page
+	// or written once to nav.js, which the page runs before this script
+	var $sharedNav = $('.js-shared-nav');
+	if (!$sharedNav.length) {
+		initNav();
+	} else if (typeof igloocastleNav === 'string') {
+		var current = $sharedNav.data('current');
+		$('nav').html(igloocastleNav);
+		initNav(current);
 	}
+
+	initSearch();
+
+	$('.js-show-inherited').prop('checked', myLocalStorage.showInherited());
+	$('.js-show-protected').prop('checked', myLocalStorage.showProtected());
+	applyFilters();
 });
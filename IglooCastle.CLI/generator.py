@@ -1,8 +1,18 @@
 ﻿import sys
 import clr
+import math
+import thread
 import System
-from time import gmtime, strftime
-from System.IO import Path
+from System import Uri
+from time import gmtime, strftime, time
+from System.Diagnostics import Stopwatch
+from System.IO import Directory, File, Path
+from System.Net import HttpListener, WebUtility
+from System.Security.Cryptography import SHA1
+from System.Text import Encoding
+from System.Text.RegularExpressions import Regex, RegexOptions
+from System.Threading import Thread, ThreadStart
+from snapshot import SnapshotWriter, read_snapshot
 
 clr.AddReference("IglooCastle.CLI")
 import IglooCastle.CLI
@@ -10,12 +20,13 @@ clr.ImportExtensions(IglooCastle.CLI)
 
 
 def flatten(something):
+	"""Yields the strings of a nested structure of lists and generators of strings."""
 	for x in something:
-		if isinstance(x, list):
+		if isinstance(x, basestring):
+			yield x
+		else:
 			for y in flatten(x):
 				yield y
-		else:
-			yield x
 
 def escape(str):
 	return str.replace("`", "%60")
@@ -24,15 +35,481 @@ def a(href, text):
 	return '<a href="%s">%s</a>' % (escape(href), text)
 
 def fmt_non_empty(template, contents):
-	"""Formats the contents into template, if the contents are not empty."""
-	if len(contents):
+	"""Formats the contents into template, if the contents are not empty.
+
+	The contents can also be a list of fragments, which is kept as is
+	instead of being copied into one string."""
+	if not len(contents):
+		return ""
+	elif isinstance(contents, basestring):
 		return template % contents
 	else:
-		return ""
+		return fmt_fragments(template, contents)
+
+def fmt_fragments(template, fragments):
+	"""Like template % fragments, but returns a list of fragments.
+
+	The fragments can be a generator, e.g. of table rows,
+	which is only consumed when the page is written."""
+	before, after = template.split("%s")
+	return [ before, fragments, after ]
+
+def join_fragments(separator, fragments):
+	"""Like separator.join(fragments), but returns a list of fragments."""
+	result = []
+	for fragment in fragments:
+		if result:
+			result.append(separator)
+		result.append(fragment)
+	return result
+
+QUIET   = 0
+NORMAL  = 1
+VERBOSE = 2
+
+verbosity = NORMAL
+
+def log(level, message, *args):
+	"""Prints the message, formatted with the given arguments, if the verbosity is at least level."""
+	if verbosity >= level:
+		print message % args if args else message
 
 def filter_empty(node_list):
 	return [ n for n in node_list if not n.is_content_empty() ]
 
+def memoized(method):
+	"""Caches the result of a method without arguments on the instance it is called on.
+
+	The result is kept in the attribute "_memoized_" + the method name,
+	which classes with __slots__ have to declare."""
+	key = "_memoized_" + method.__name__
+
+	def wrapper(self):
+		try:
+			return getattr(self, key)
+		except AttributeError:
+			result = method(self)
+			setattr(self, key, result)
+			return result
+
+	wrapper.__name__ = method.__name__
+	wrapper.__doc__  = method.__doc__
+	return wrapper
+
+class RunStats:
+	"""Counts the work done during a run."""
+	def __init__(self):
+		self.nodes     = 0
+		self.clr_calls = 0
+
+	def report(self):
+		log(NORMAL, "Created %d nodes, read %d collections from the documentation model", self.nodes, self.clr_calls)
+
+def clock():
+	"""Returns a high resolution timestamp, in seconds."""
+	return Stopwatch.GetTimestamp() / float(Stopwatch.Frequency)
+
+def percentile(sorted_values, fraction):
+	"""Returns the value that the given fraction of the sorted values is less than or equal to."""
+	index = int(math.ceil(fraction * len(sorted_values))) - 1
+	return sorted_values[max(index, 0)]
+
+def to_json(value, compact = False):
+	"""Formats a value made of dicts, lists, strings, numbers, booleans and None as JSON.
+
+	Compact JSON has no whitespace, for files that are downloaded by the browser."""
+	if value is None:
+		return "null"
+	elif isinstance(value, bool):
+		return "true" if value else "false"
+	elif isinstance(value, float):
+		return repr(round(value, 6))
+	elif isinstance(value, (int, long)):
+		return str(value)
+	elif isinstance(value, basestring):
+		escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+		return '"%s"' % "".join(c if ord(c) >= 32 else "\\u%04x" % ord(c) for c in escaped)
+	elif isinstance(value, dict):
+		items = [ (to_json(k, compact), to_json(value[k], compact)) for k in sorted(value) ]
+		if compact:
+			return "{%s}" % ",".join("%s:%s" % item for item in items)
+		return "{ %s }" % ", ".join("%s: %s" % item for item in items)
+	else:
+		items = [ to_json(v, compact) for v in value ]
+		if compact:
+			return "[%s]" % ",".join(items)
+		return "[ %s ]" % ", ".join(items)
+
+SLOWEST_PAGES = 20
+
+class Profiler:
+	"""Times the stages of a run and every page, grouped by node class.
+
+	The time of a page is split into contents_html_template, which builds the page,
+	and the file write, which also renders the rows that are streamed to the file."""
+	def __init__(self, stage_timer = None):
+		self.stages = []
+		self.pages  = []
+		self.__lock = thread.allocate_lock()
+		if stage_timer:
+			# the stages that ran before the generator, e.g. loading and scanning the assemblies
+			for stage in stage_timer.Stages:
+				self.stages.append((stage.Key, stage.Value.TotalSeconds))
+
+	def stage(self, name):
+		"""Returns a context manager that times the given stage."""
+		return ProfilerStage(self, name)
+
+	def add_page(self, node, href, template_seconds, write_seconds):
+		with self.__lock:
+			self.pages.append((node.__class__.__name__, href, template_seconds, write_seconds))
+
+	def report(self, slowest = SLOWEST_PAGES):
+		"""Returns the timings as a dictionary, in seconds."""
+		stages = [ { "name": name, "seconds": seconds } for name, seconds in self.stages ]
+		stages.append({ "name": "contents_html_template", "seconds": sum(p[2] for p in self.pages) })
+		stages.append({ "name": "file write", "seconds": sum(p[3] for p in self.pages) })
+
+		by_node_class = {}
+		for page in self.pages:
+			by_node_class.setdefault(page[0], []).append(page)
+
+		nodes = {}
+		for node_class, pages in by_node_class.items():
+			totals = sorted(p[2] + p[3] for p in pages)
+			nodes[node_class] = {
+				"count":    len(pages),
+				"total":    sum(totals),
+				"template": sum(p[2] for p in pages),
+				"write":    sum(p[3] for p in pages),
+				"p50":      percentile(totals, 0.5),
+				"p95":      percentile(totals, 0.95),
+				"max":      totals[-1]
+			}
+
+		slowest_pages = sorted(self.pages, key = lambda p: p[2] + p[3], reverse = True)[:slowest]
+		return {
+			"stages":  stages,
+			"nodes":   nodes,
+			"slowest": [ { "node": p[0], "page": p[1], "seconds": p[2] + p[3], "template": p[2], "write": p[3] }
+				for p in slowest_pages ]
+		}
+
+	def print_summary(self):
+		report = self.report()
+		for stage in report["stages"]:
+			log(NORMAL, "%-24s %9.3f s", stage["name"], stage["seconds"])
+		for node_class in sorted(report["nodes"]):
+			timing = report["nodes"][node_class]
+			log(NORMAL, "%-24s %9.3f s in %d pages, p50 %.1f ms, p95 %.1f ms",
+				node_class, timing["total"], timing["count"], timing["p50"] * 1000, timing["p95"] * 1000)
+
+	def write_report(self, filename):
+		f = open(filename, 'w')
+		f.write(to_json(self.report()))
+		f.write("\n")
+		f.close()
+		log(NORMAL, "Wrote profile %s", filename)
+
+class ProfilerStage:
+	def __init__(self, profiler, name):
+		self.profiler = profiler
+		self.name     = name
+
+	def __enter__(self):
+		self.start = clock()
+
+	def __exit__(self, error_type, error, traceback):
+		self.profiler.stages.append((self.name, clock() - self.start))
+		return False
+
+class ElementCache:
+	"""Caches the collections read from the documentation model.
+
+	Properties like TypeElement.Methods build a new collection on every call,
+	so each of them is read only once per element. So are the values derived
+	from them, e.g. the names of the overloaded methods of a type."""
+	def __init__(self, stats):
+		self.stats         = stats
+		self.__collections = {}
+		self.__lock        = thread.allocate_lock()
+
+	def get(self, element, name, compute = None):
+		"""Returns the collection property called name of the element, or what compute returns
+		for the element if given."""
+		key = (element, name)
+		with self.__lock:
+			result = self.__collections.get(key)
+
+		if result is None:
+			if compute is None:
+				result = list(getattr(element, name))
+			else:
+				result = compute(element)
+
+			with self.__lock:
+				if compute is None:
+					self.stats.clr_calls += 1
+				result = self.__collections.setdefault(key, result)
+
+		return result
+
+DEFAULT_FRAGMENT_CACHE_SIZE = 10000
+
+class FragmentCache:
+	"""Caches HTML fragments that many pages repeat, e.g. member rows and type links.
+
+	A fragment is keyed by the element it renders, so a member row is built once
+	and reused by the type page and its members pages. The cache holds at most
+	max_size fragments; when it is full, the least recently used quarter is evicted.
+	A max_size of 0 disables the cache."""
+	def __init__(self, max_size = DEFAULT_FRAGMENT_CACHE_SIZE, name = "Fragment cache"):
+		self.max_size  = max_size
+		self.name      = name
+		self.hits      = 0
+		self.misses    = 0
+		self.evictions = 0
+		self.__entries = {}
+		self.__ticks   = 0
+		self.__lock    = thread.allocate_lock()
+
+	def get(self, key, compute):
+		"""Returns the fragment for the given key, calling compute to build it on a miss."""
+		if self.max_size <= 0:
+			return compute()
+
+		with self.__lock:
+			self.__ticks += 1
+			entry = self.__entries.get(key)
+			if entry is not None:
+				self.hits += 1
+				entry[1] = self.__ticks
+				return entry[0]
+
+			self.misses += 1
+
+		result = compute()
+		with self.__lock:
+			if key not in self.__entries:
+				if len(self.__entries) >= self.max_size:
+					self.__evict()
+				self.__entries[key] = [ result, self.__ticks ]
+
+		return result
+
+	def __evict(self):
+		by_last_use = sorted(self.__entries.items(), key = lambda item: item[1][1])
+		evicted = by_last_use[:max(1, len(by_last_use) // 4)]
+		for key, entry in evicted:
+			del self.__entries[key]
+		self.evictions += len(evicted)
+
+	def report(self):
+		if self.max_size <= 0:
+			log(NORMAL, "%s: disabled", self.name)
+			return
+
+		lookups  = self.hits + self.misses
+		hit_rate = 100.0 * self.hits / lookups if lookups else 0.0
+		log(NORMAL, "%s: %d hits, %d misses (%.1f%% hit rate), %d evictions, %d of %d entries",
+			self.name, self.hits, self.misses, hit_rate, self.evictions, len(self.__entries), self.max_size)
+
+class CommentTracker:
+	"""Records the elements whose XML comments every page shows, for watch mode.
+
+	When the XML documentation changes, only the pages that show
+	a comment that changed need to be rendered again."""
+	def __init__(self):
+		self.pages        = {}
+		self.fingerprints = {}
+		self.__current    = {}
+		self.__lock       = thread.allocate_lock()
+
+	def start_page(self):
+		"""Starts recording the comments that the current thread's page shows."""
+		with self.__lock:
+			self.__current[thread.get_ident()] = set()
+
+	def record(self, element):
+		elements = self.__current.get(thread.get_ident())
+		if elements is not None:
+			elements.add(element)
+
+	def finish_page(self, href):
+		"""Stops recording, and keeps the comments as the ones that the given page shows."""
+		with self.__lock:
+			elements = self.__current.pop(thread.get_ident(), ())
+			for element in elements:
+				self.pages.setdefault(element, set()).add(href)
+				if element not in self.fingerprints:
+					self.fingerprints[element] = comment_fingerprint(element)
+
+	def forget_pages(self, hrefs):
+		"""Forgets what the given pages show, before they are rendered from a rescanned documentation."""
+		hrefs = set(hrefs)
+		for element in list(self.pages):
+			self.pages[element] -= hrefs
+			if not self.pages[element]:
+				del self.pages[element]
+				del self.fingerprints[element]
+
+	def changed_pages(self):
+		"""Returns the pages that show a comment that changed since it was recorded."""
+		result = set()
+		for element, fingerprint in self.fingerprints.items():
+			current = comment_fingerprint(element)
+			if current != fingerprint:
+				self.fingerprints[element] = current
+				result |= self.pages[element]
+		return result
+
+def comment_fingerprint(element):
+	return element.XmlComment.Xml
+
+def track_comment(element):
+	"""Records that the page being rendered shows the XML comment of the given element."""
+	if comment_tracker is not None:
+		comment_tracker.record(element)
+
+# a namespace with more types than this gets its types listed on several pages, and a class diagram loaded on demand
+DEFAULT_PAGE_SIZE = 1000
+
+run_stats       = RunStats()
+element_cache   = ElementCache(run_stats)
+fragment_cache  = FragmentCache()
+comment_tracker = None
+page_size       = DEFAULT_PAGE_SIZE
+
+def members(element, name):
+	"""Returns the collection property called name of the given element, read only once per run."""
+	return element_cache.get(element, name)
+
+def type_link(type_element):
+	"""Returns the HTML link to the given type, built only once per run."""
+	return fragment_cache.get(("type link", type_element), type_element.ToHtml)
+
+def summary(element):
+	"""Returns the summary of the XML comment of the given element, read only once per run."""
+	track_comment(element)
+	return fragment_cache.get(("summary", element), lambda: element.XmlComment.Summary())
+
+def xml_comment(element):
+	"""Returns the XML comment of the given element."""
+	track_comment(element)
+	return element.XmlComment
+
+def overloaded_method_names(type_element):
+	"""Returns the names that more than one method of the given type has, found only once per run."""
+	def compute(type_element):
+		names      = set()
+		overloaded = set()
+		for method in members(type_element, "Methods"):
+			if method.Name in names:
+				overloaded.add(method.Name)
+			names.add(method.Name)
+		return frozenset(overloaded)
+
+	return element_cache.get(type_element, "overloaded method names", compute)
+
+def member_row_key(kind, element):
+	"""Returns the key of the table row of the given member.
+
+	Elements compare the reflected member, which differs for every type that inherits it,
+	so the key is the declaration of the member instead, with the declaring type,
+	which tells apart the constructed types of a generic base type. The rows of an inherited member
+	are the same for all the types that derive from the declaring type, unless one of them
+	overloads a method, which shows its parameters then."""
+	member = element.Member
+	key    = (kind + " row", member.Module, member.MetadataToken, element.DeclaringType, element.IsInherited)
+	if kind == "method":
+		key += (element.Name in overloaded_method_names(element.OwnerType),)
+	return key
+
+def member_row(kind, element, build):
+	"""Returns the table row of the given member, built only once per run."""
+	# a cached row shows the member's summary too
+	track_comment(element)
+	return fragment_cache.get(member_row_key(kind, element), lambda: build(element))
+
+MEMBER_TABLE_CHUNK_SIZE = 250
+# the estimated height of a member row in pixels, for the space of a chunk that isn't rendered yet
+MEMBER_ROW_HEIGHT       = 54
+
+def members_table(template, kind, elements, build):
+	"""Returns the table of the given members, from a template with a placeholder for more classes
+	of the table and one for its rows, which are only built when the page is written.
+
+	A table with more rows than MEMBER_TABLE_CHUNK_SIZE is split into tables of that many rows,
+	that browsers only lay out and paint near the viewport."""
+	def table(css_class, chunk_elements):
+		return fmt_fragments(template % (css_class, "%s"), (member_row(kind, e, build) for e in chunk_elements))
+
+	elements = list(elements)
+	if len(elements) <= MEMBER_TABLE_CHUNK_SIZE:
+		return table("", elements)
+
+	chunks = []
+	for start in range(0, len(elements), MEMBER_TABLE_CHUNK_SIZE):
+		chunk_elements = elements[start:start + MEMBER_TABLE_CHUNK_SIZE]
+		chunks.append("""
+			<div class="chunk" style="contain-intrinsic-size: auto %dpx">""" % (len(chunk_elements) * MEMBER_ROW_HEIGHT))
+		chunks.append(table(" chunked", chunk_elements))
+		chunks.append("</div>")
+
+	return chunks
+
+def is_split(namespace_element):
+	"""Checks if the namespace has too many types to list them, or to draw their class diagram, on one page."""
+	return page_size > 0 and len(members(namespace_element, "Types")) > page_size
+
+def page_filename(filename, number):
+	"""Returns the file of a page that the given page is split into, e.g. N_System-2.html for N_System.html."""
+	return "%s-%d.html" % (filename[:-len(".html")], number)
+
+def types_table(title, types):
+	def table_row(t):
+		return """<tr>
+				<td>%s</td>
+				<td>%s</td>
+			</tr>""" % (type_link(t), summary(t) or "&nbsp;")
+
+	if not types:
+		return ""
+
+	return fmt_fragments("<h2>" + title + """</h2>
+			<table>
+				<thead>
+					<tr>
+						<th>Name</th>
+						<th>Description</th>
+					</tr>
+				</thead>
+				<tbody>
+				%s
+				</tbody>
+			</table>
+		""", (table_row(t) for t in types))
+
+def types_tables(types):
+	"""Returns the tables of the classes, the interfaces and the enumerations among the given types."""
+	return join_fragments("\n", [
+		types_table("Classes", [t for t in types if t.IsClass]),
+		types_table("Interfaces", [t for t in types if t.IsInterface]),
+		types_table("Enumerations", [t for t in types if t.IsEnum])
+	])
+
+class DataFile:
+	"""A file that a node writes instead of a page, e.g. the data of a large class diagram.
+
+	The visitor gives it the navigation tree and the footer of a page, which it ignores."""
+	def __init__(self, contents):
+		self.contents = contents
+		self.nav      = None
+		self.footer   = None
+
+	def write(self, output_writer, filename):
+		output_writer.write(filename, self.contents)
+
 def flatten_single_child(node):
 	children = node.children()
 	if len(children) == 1:
@@ -41,21 +518,7 @@ def flatten_single_child(node):
 		return node
 
 class HtmlTemplate:
-	def __init__(self):
-		self.title  = ""
-		self.h1     = ""
-		self.nav    = ""
-		self.main   = ""
-		self.footer = ""
-
-	def write(self, output_directory, filename):
-		print "Writing file %s" % filename
-		f = open(Path.Combine(output_directory, filename), 'w')
-		f.write(self.__render())
-		f.close()
-
-	def __render(self):
-		return """
+	PAGE = """
 <html>
 <head>
 	<title>%s</title>
@@ -76,14 +539,406 @@ class HtmlTemplate:
 	</footer>
 </body>
 </html>
-	""" % (self.title, self.nav, self.h1 or self.title, self.main, self.footer)
+	"""
+
+	def __init__(self):
+		self.title  = ""
+		self.h1     = ""
+		self.nav    = ""
+		self.main   = ""
+		self.footer = ""
+
+	def write(self, output_writer, filename):
+		output_writer.write_fragments(filename, self.fragments())
+
+	def fragments(self):
+		"""Returns the page as a list of fragments, in the order they are written.
+
+		The main contents can themselves be lists or generators of fragments,
+		so that big tables are written row by row."""
+		parts  = self.PAGE.split("%s")
+		values = [ self.title, self.nav, self.h1 or self.title, self.main, self.footer ]
+		result = [ parts[0] ]
+		for value, part in zip(values, parts[1:]):
+			result.append(value)
+			result.append(part)
 
+		return result
+
+
+BUFFER_SIZE          = 64 * 1024
+PEAK_SAMPLE_INTERVAL = 256
+
+class MemoryStats:
+	"""Tracks the peak managed memory while pages are written.
 
-class NodeBase:
+	The memory is sampled for the whole process, so with several jobs
+	the peak of a page includes the pages rendered at the same time."""
 	def __init__(self):
-		self.EXPANDER = '<span class="js-expander">-</span>'
-		self.__widget_member_filter_id = 0
-		pass
+		self.pages  = 0
+		self.total  = 0
+		self.max    = 0
+		self.__lock = thread.allocate_lock()
+
+	def sample(self):
+		return System.GC.GetTotalMemory(False)
+
+	def add(self, peak):
+		with self.__lock:
+			self.pages += 1
+			self.total += peak
+			self.max    = max(self.max, peak)
+
+	def report(self):
+		if self.pages:
+			log(NORMAL, "Peak memory per page: %.1f MB max, %.1f MB average",
+				self.max / 1048576.0, self.total / 1048576.0 / self.pages)
+
+class OutputWriter:
+	"""Writes the generated files to the output directory."""
+	def __init__(self, output_directory):
+		self.output_directory = output_directory
+		self.memory_stats     = MemoryStats()
+
+	def write(self, filename, contents):
+		self.write_fragments(filename, [ contents ])
+
+	def write_fragments(self, filename, fragments):
+		"""Writes the fragments to a buffered file as they are produced, without joining them."""
+		log(VERBOSE, "Writing file %s", filename)
+		peak = self.memory_stats.sample()
+		f = open(Path.Combine(self.output_directory, filename), 'w', BUFFER_SIZE)
+		for index, fragment in enumerate(flatten(fragments)):
+			f.write(fragment)
+			if index % PEAK_SAMPLE_INTERVAL == 0:
+				peak = max(peak, self.memory_stats.sample())
+		f.close()
+		self.memory_stats.add(peak)
+
+	def copy_file(self, filename, source):
+		"""Copies the given file to the output directory, with the given name."""
+		destination = Path.Combine(self.output_directory, filename)
+		if Path.GetFullPath(source) != Path.GetFullPath(destination):
+			File.Copy(source, destination, True)
+
+	def close(self):
+		"""Called after all files have been written."""
+		self.memory_stats.report()
+
+def report_compression(name, compressor):
+	"""Logs how much the files of the run were compressed, and how long it took."""
+	if not compressor.Files:
+		return
+
+	size       = compressor.UncompressedSize
+	compressed = compressor.CompressedSize
+	log(NORMAL, "%s: %d files, %.1f MB compressed to %.1f MB (%.0f%%) in %.2f seconds",
+		name, compressor.Files, size / 1048576.0, compressed / 1048576.0,
+		100.0 * compressed / size if size else 100.0, compressor.CompressionTime.TotalSeconds)
+
+GZIP_EXTENSION         = IglooCastle.CLI.GzipCompressor.Extension
+GZIP_MANIFEST_FILENAME = "igloocastle-gzip-manifest.txt"
+
+class GzipOutputWriter:
+	"""Wraps an output writer, to also write a gzip-compressed copy of every file, e.g. index.html.gz,
+	that web servers can serve as it is.
+
+	The copy of a file that the wrapped writer leaves unchanged, as an incremental build does,
+	is not written again, and the copies of files that are gone are deleted.
+	The copies are listed in a manifest in the output directory, so that only those are ever deleted,
+	and not other compressed files that happen to be there."""
+	def __init__(self, output_writer):
+		self.output_writer    = output_writer
+		self.output_directory = output_writer.output_directory
+		self.compressor       = IglooCastle.CLI.GzipCompressor()
+		self.previous         = self.__read_manifest()
+		self.current          = set()
+		self.__lock           = thread.allocate_lock()
+
+	def write(self, filename, contents):
+		self.output_writer.write(filename, contents)
+		self.__compress(filename)
+
+	def write_fragments(self, filename, fragments):
+		self.output_writer.write_fragments(filename, fragments)
+		self.__compress(filename)
+
+	def copy_file(self, filename, source):
+		self.output_writer.copy_file(filename, source)
+		self.__compress(filename)
+
+	def close(self):
+		self.output_writer.close()
+		for filename in sorted(self.previous - self.current):
+			path = self.__path(filename)
+			if not File.Exists(path):
+				continue
+
+			if File.Exists(path[:-len(GZIP_EXTENSION)]):
+				# e.g. a page of a previous run that is still there; its copy stays listed
+				self.current.add(filename)
+			else:
+				log(VERBOSE, "Deleting file %s", filename)
+				File.Delete(path)
+
+		self.__write_manifest()
+		report_compression("Gzip", self.compressor)
+
+	def __compress(self, filename):
+		if filename.endswith(GZIP_EXTENSION):
+			# e.g. a copy that a shard compressed
+			self.__add(filename)
+			return
+
+		self.__add(filename + GZIP_EXTENSION)
+		path       = self.__path(filename)
+		compressed = path + GZIP_EXTENSION
+		if File.Exists(compressed) and File.GetLastWriteTimeUtc(compressed) >= File.GetLastWriteTimeUtc(path):
+			return
+
+		self.compressor.Compress(path)
+
+	def __add(self, filename):
+		with self.__lock:
+			self.current.add(filename)
+
+	def __path(self, filename):
+		return Path.Combine(self.output_directory, filename)
+
+	def __read_manifest(self):
+		result = set()
+		if not File.Exists(self.__path(GZIP_MANIFEST_FILENAME)):
+			return result
+
+		f = open(self.__path(GZIP_MANIFEST_FILENAME), 'r')
+		for line in f:
+			line = line.rstrip("\r\n")
+			if line and not line.startswith("#"):
+				result.add(line)
+		f.close()
+		return result
+
+	def __write_manifest(self):
+		f = open(self.__path(GZIP_MANIFEST_FILENAME), 'w')
+		f.write("# The compressed copies written by IglooCastle\n")
+		for filename in sorted(self.current):
+			f.write("%s\n" % filename)
+		f.close()
+
+class ArchiveOutputWriter:
+	"""Writes the generated files into a zip archive, instead of one file each in the output directory."""
+	def __init__(self, filename):
+		self.filename = filename
+		self.archive  = IglooCastle.CLI.SiteArchive(filename)
+
+	def write(self, filename, contents):
+		self.archive.Add(filename, Encoding.UTF8.GetBytes(contents))
+
+	def write_fragments(self, filename, fragments):
+		# the entries are written one at a time, so the page is built before it takes its turn
+		self.write(filename, "".join(flatten(fragments)))
+
+	def copy_file(self, filename, source):
+		self.archive.AddFile(filename, source)
+
+	def close(self):
+		self.archive.Dispose()
+		log(NORMAL, "Wrote archive %s", self.filename)
+		report_compression("Archive", self.archive)
+
+# elements that are blocks or parts of tables, so that whitespace next to their tags doesn't render
+MINIFY_BLOCK_TAGS = "html|head|title|body|nav|section|footer|h1|h2|h3|p|div|dl|dt|dd|ol|ul|li|table|thead|tbody|tr|th|td"
+# fragments at least this long, e.g. the navigation tree inlined into every page, are minified once
+MINIFY_CACHE_MIN_LENGTH = 4096
+MINIFY_CACHE_SIZE       = 64
+
+class HtmlMinifier:
+	"""Removes the comments and the whitespace of the generated HTML that don't change how it renders.
+
+	Whitespace next to the tags of blocks and table parts is removed, and any other run of whitespace
+	becomes one newline, or one space if it had no newline. None of the pages has preformatted text.
+	Only spaces, tabs and newlines are whitespace here; a non-breaking space is kept."""
+	COMMENT    = Regex(r"<!--.*?-->", RegexOptions.Compiled | RegexOptions.Singleline)
+	BLOCK_TAG  = Regex(r"[ \t\r\n]*(</?(?:" + MINIFY_BLOCK_TAGS + r")\b[^>]*>)[ \t\r\n]*", RegexOptions.Compiled)
+	NEWLINE    = Regex(r"[ \t\r]*\n[ \t\r\n]*", RegexOptions.Compiled)
+	WHITESPACE = Regex(r"[ \t\r]{2,}|[\t\r]", RegexOptions.Compiled)
+
+	def __init__(self):
+		self.files    = 0
+		self.size     = 0
+		self.minified = 0
+		self.cache    = {}
+		self.__lock   = thread.allocate_lock()
+
+	def minify(self, html):
+		html = self.COMMENT.Replace(html, "")
+		html = self.BLOCK_TAG.Replace(html, "$1")
+		html = self.NEWLINE.Replace(html, "\n")
+		return self.WHITESPACE.Replace(html, " ")
+
+	def minify_fragment(self, fragment):
+		"""Minifies a fragment of a page; a tag that is split between fragments is left as it is."""
+		if len(fragment) < MINIFY_CACHE_MIN_LENGTH:
+			return self.minify(fragment)
+
+		key = id(fragment)
+		with self.__lock:
+			cached = self.cache.get(key)
+
+		# the fragment is kept with its minified form, so that its id isn't reused meanwhile
+		if cached and cached[0] is fragment:
+			return cached[1]
+
+		minified = self.minify(fragment)
+		with self.__lock:
+			if len(self.cache) >= MINIFY_CACHE_SIZE:
+				self.cache.clear()
+
+			self.cache[key] = (fragment, minified)
+
+		return minified
+
+	def add(self, size, minified):
+		with self.__lock:
+			self.files    += 1
+			self.size     += size
+			self.minified += minified
+
+	def report(self):
+		if self.files:
+			log(NORMAL, "Minify: %d files, %.1f MB to %.1f MB (%.0f%%)",
+				self.files, self.size / 1048576.0, self.minified / 1048576.0,
+				100.0 * self.minified / self.size if self.size else 100.0)
+
+class MinifyingOutputWriter:
+	"""Wraps an output writer, to minify the HTML files before they are written."""
+	def __init__(self, output_writer):
+		self.output_writer = output_writer
+		self.minifier      = HtmlMinifier()
+
+	def write(self, filename, contents):
+		self.write_fragments(filename, [ contents ])
+
+	def write_fragments(self, filename, fragments):
+		if filename.endswith(".html"):
+			fragments = self.__minify(fragments)
+
+		self.output_writer.write_fragments(filename, fragments)
+
+	def copy_file(self, filename, source):
+		self.output_writer.copy_file(filename, source)
+
+	def close(self):
+		self.output_writer.close()
+		self.minifier.report()
+
+	def __minify(self, fragments):
+		# the fragments are still written as they are produced
+		size     = 0
+		minified = 0
+		for fragment in flatten(fragments):
+			result    = self.minifier.minify_fragment(fragment)
+			size     += len(fragment)
+			minified += len(result)
+			yield result
+
+		self.minifier.add(size, minified)
+
+
+MANIFEST_FILENAME = "igloocastle-manifest.txt"
+
+def content_hash(contents):
+	"""Returns the hex SHA-1 hash of the given string."""
+	data = Encoding.UTF8.GetBytes(contents)
+	return System.BitConverter.ToString(SHA1.Create().ComputeHash(data)).replace("-", "")
+
+class IncrementalOutputWriter(OutputWriter):
+	"""Writes only the files whose contents changed since the previous run.
+
+	The content hash of every file is kept in a manifest in the output directory.
+	Files of the previous run that are not generated anymore are deleted,
+	unless the run is partial, i.e. writes only some of the files, as in watch mode."""
+	def __init__(self, output_directory, generated_at, partial = False):
+		OutputWriter.__init__(self, output_directory)
+		self.generated_at = generated_at
+		self.partial      = partial
+		self.previous     = self.__read_manifest()
+		self.current      = {}
+		self.unchanged    = 0
+		self.__lock       = thread.allocate_lock()
+
+	def write(self, filename, contents):
+		hash = content_hash(contents)
+		with self.__lock:
+			self.current[filename] = hash
+			unchanged = self.previous.get(filename) == hash and File.Exists(self.__path(filename))
+			if unchanged:
+				self.unchanged += 1
+
+		if not unchanged:
+			OutputWriter.write_fragments(self, filename, [ contents ])
+
+	def write_fragments(self, filename, fragments):
+		# the hash is needed before deciding to write, so the page is joined first
+		self.write(filename, "".join(flatten(fragments)))
+
+	def close(self):
+		written = len(self.current) - self.unchanged
+		deleted = 0
+		for filename in sorted(self.previous):
+			if filename in self.current or not File.Exists(self.__path(filename)):
+				continue
+
+			if self.partial:
+				# not written this time, but still generated
+				self.current[filename] = self.previous[filename]
+			else:
+				log(VERBOSE, "Deleting file %s", filename)
+				File.Delete(self.__path(filename))
+				deleted += 1
+
+		self.__write_manifest()
+		OutputWriter.close(self)
+		log(NORMAL, "Incremental build: %d files written, %d unchanged, %d deleted",
+			written, self.unchanged, deleted)
+
+	def __path(self, filename):
+		return Path.Combine(self.output_directory, filename)
+
+	def __read_manifest(self):
+		result = {}
+		if not File.Exists(self.__path(MANIFEST_FILENAME)):
+			return result
+
+		f = open(self.__path(MANIFEST_FILENAME), 'r')
+		for line in f:
+			line = line.rstrip("\r\n")
+			if line and not line.startswith("#"):
+				hash, filename = line.split("\t", 1)
+				result[filename] = hash
+		f.close()
+		return result
+
+	def __write_manifest(self):
+		f = open(self.__path(MANIFEST_FILENAME), 'w')
+		f.write("# Generated by IglooCastle at %s\n" % self.generated_at)
+		for filename in sorted(self.current):
+			f.write("%s\t%s\n" % (self.current[filename], filename))
+		f.close()
+
+
+class NodeBase(object):
+	"""A page of the documentation, and its entry in the navigation tree.
+
+	There is a node for every member of a large API, so nodes are kept small:
+	they have __slots__ instead of a __dict__, hold only the element they document
+	and the memoized results of their methods, and compute everything else when it is needed."""
+	__slots__ = ()
+
+	EXPANDER = '<span class="js-expander">-</span>'
+
+	def __init__(self):
+		run_stats.nodes += 1
 
 	def nav_html(self):
 		"""Returns the HTML for the left side navigation tree."""
@@ -108,8 +963,10 @@ class NodeBase:
 		return None
 
 	def visit(self, f):
-		"""Calls f for every node in the tree."""
+		"""Calls f for every node in the tree, and for the nodes of the pages that continue their pages."""
 		f(self)
+		for page in self.more_pages():
+			f(page)
 		for child in self.children():
 			child.visit(f)
 
@@ -122,18 +979,27 @@ class NodeBase:
 		raise NotImplementedError('You need to override text()')
 
 	def children(self):
-		"""Returns the child nodes of this node."""
+		"""Returns the child nodes of this node.
+
+		Overrides should be memoized, so that the tree is built only once."""
+		return []
+
+	def more_pages(self):
+		"""Returns the nodes of the files that this node's page is split into,
+		which are written like pages but are not in the navigation tree."""
 		return []
 
 	def is_content_empty(self):
-		"""Checks if this node is empty. Used in combination with filter_empty."""
+		"""Checks if this node is empty. Used in combination with filter_empty.
+
+		Overrides that do real work should be memoized."""
 		return False
 
 	def inherited_from(self, member_element):
 		if not member_element.IsInherited:
 			inherited_link = ""
 		else:
-			inherited_link = "(Inherited from %s.)" % member_element.DeclaringType.ToHtml()
+			inherited_link = "(Inherited from %s.)" % type_link(member_element.DeclaringType)
 		return inherited_link
 
 	def ___access_css(self, element):
@@ -144,7 +1010,8 @@ class NodeBase:
 		access_str = access.ToAccessString()
 		access_str = """<span class="%s" title="%s">%s</span>""" % (access_str, access_str, access_str)
 
-		if isinstance(element, IglooCastle.CLI.MethodElement) and element.IsStatic:
+		# compare by name, so that elements read from a snapshot are recognized too
+		if type(element).__name__ == "MethodElement" and element.IsStatic:
 			access_str += '<span class="static" title="static">static</span>'
 
 		return access_str
@@ -154,7 +1021,7 @@ class NodeBase:
 
 		def constructor_list_item(constructor_element):
 			description = " ".join([
-				constructor_element.XmlComment.Summary() or "&nbsp;",
+				summary(constructor_element) or "&nbsp;",
 				self.inherited_from(constructor_element)
 			])
 			tr_class    = " ".join([
@@ -174,9 +1041,12 @@ class NodeBase:
 
 			return result
 
-		return fmt_non_empty(
+		if not constructors:
+			return ""
+
+		return members_table(
 			"""
-			<table class="members constructors">
+			<table class="members constructors%s">
 				<thead>
 					<tr>
 						<th>&nbsp;</th>
@@ -187,14 +1057,14 @@ class NodeBase:
 				<tbody>
 				%s
 				</tbody>
-			</table>""", "".join(constructor_list_item(c) for c in constructors))
+			</table>""", "constructor", constructors, constructor_list_item)
 
 	def properties_table(self, properties):
 		"""Prints a table with the given properties."""
 
 		def property_list_item(property_element):
 			description = " ".join([
-				property_element.XmlComment.Summary() or "&nbsp;",
+				summary(property_element) or "&nbsp;",
 				self.inherited_from(property_element)
 			])
 			tr_class    = " ".join([
@@ -211,12 +1081,15 @@ class NodeBase:
 			""" % (tr_class,
 				   self.__access_str(property_element),
 				   property_element.ToHtml(),
-				   property_element.PropertyType.ToHtml(),
+				   type_link(property_element.PropertyType),
 				   description)
 
-		return fmt_non_empty(
+		if not properties:
+			return ""
+
+		return members_table(
 			"""
-			<table class="members properties">
+			<table class="members properties%s">
 				<thead>
 					<tr>
 						<th>&nbsp;</th>
@@ -228,15 +1101,14 @@ class NodeBase:
 				<tbody>
 				%s
 				</tbody>
-			</table>""",
-			"".join(property_list_item(p) for p in properties))
+			</table>""", "property", properties, property_list_item)
 
 	def methods_table(self, methods):
 		"""Prints a table with the given methods."""
 
 		def method_list_item(method_element):
 			description = " ".join([
-				method_element.XmlComment.Summary() or "&nbsp;",
+				summary(method_element) or "&nbsp;",
 				self.inherited_from(method_element)
 			])
 			tr_class    = " ".join([
@@ -256,9 +1128,12 @@ class NodeBase:
 
 			return result
 
-		return fmt_non_empty(
+		if not methods:
+			return ""
+
+		return members_table(
 			"""
-			<table class="members methods">
+			<table class="members methods%s">
 				<thead>
 					<tr>
 						<th>&nbsp;</th>
@@ -269,12 +1144,14 @@ class NodeBase:
 				<tbody>
 				%s
 				</tbody>
-			</table>""", "".join(method_list_item(m) for m in methods))
+			</table>""", "method", methods, method_list_item)
+
+	def widget_member_filter(self, widget_id, show_inherited = True):
+		"""Returns the checkboxes that filter a table of members.
 
-	def widget_member_filter(self, show_inherited = True):
-		self.__widget_member_filter_id = self.__widget_member_filter_id + 1
-		id_inherited = "chkShowInherited%s" % self.__widget_member_filter_id
-		id_protected = "chkShowProtected%s" % self.__widget_member_filter_id
+		The widget_id tells apart the filters of the same page."""
+		id_inherited = "chkShowInherited%s" % widget_id
+		id_protected = "chkShowProtected%s" % widget_id
 
 		inherited_html = ""
 		if show_inherited:
@@ -294,9 +1171,11 @@ class NodeBase:
 
 
 class DocumentationNode(NodeBase):
+	__slots__ = ("documentation_model", "_memoized_children")
+
 	def __init__(self, documentation):
 		NodeBase.__init__(self)
-		self.documentation = documentation
+		self.documentation_model = documentation
 
 	def href(self):
 		raise ValueError("You're not supposed to write the root node to disk.")
@@ -304,17 +1183,20 @@ class DocumentationNode(NodeBase):
 	def text(self):
 		return None
 
+	@memoized
 	def children(self):
-		return [ NamespaceNode(n) for n in self.documentation.Namespaces ]
+		return [ NamespaceNode(n) for n in members(self.documentation_model, "Namespaces") ]
 
 	def nav_html(self):
 		return "<ol>%s</ol>" % self.children_nav_html()
 
 	def documentation(self):
-		return self.documentation
+		return self.documentation_model
 
 
 class NamespaceNode(NodeBase):
+	__slots__ = ("namespace_element", "_memoized_children", "_memoized_more_pages")
+
 	def __init__(self, namespace_element):
 		NodeBase.__init__(self)
 		self.namespace_element = namespace_element
@@ -325,22 +1207,36 @@ class NamespaceNode(NodeBase):
 	def text(self):
 		return self.namespace_element.Namespace + " Namespace"
 
+	@memoized
 	def children(self):
-		result = [ self.__type_node(t) for t in self.namespace_element.Types ]
+		result = [ self.__type_node(t) for t in members(self.namespace_element, "Types") ]
 		result.append(ExtensionMethodsNode(self.namespace_element))
 		result.append(ClassDiagramNode(self.namespace_element))
 		result = filter_empty(result)
 		return result
 
+	@memoized
+	def more_pages(self):
+		"""Returns the pages that the types of the namespace are listed on, if they don't fit on one."""
+		if not is_split(self.namespace_element):
+			return []
+
+		# in the order of a namespace page that isn't split
+		types = members(self.namespace_element, "Types")
+		types = [t for t in types if t.IsClass] + [t for t in types if t.IsInterface] + [t for t in types if t.IsEnum]
+		count = (len(types) + page_size - 1) // page_size
+		return [ NamespacePageNode(self.namespace_element, number, count, types[(number - 1) * page_size:number * page_size])
+			for number in range(1, count + 1) ]
+
 	def contents_html_template(self):
-		print "Generating page for namespace %s" % self.namespace_element.Namespace
+		log(VERBOSE, "Generating page for namespace %s", self.namespace_element.Namespace)
 		html_template       = HtmlTemplate()
 		html_template.title = self.text()
-		html_template.main  = "\n".join([
-			self.__table("Classes", [t for t in self.namespace_element.Types if t.IsClass]),
-			self.__table("Interfaces", [t for t in self.namespace_element.Types if t.IsInterface]),
-			self.__table("Enumerations", [t for t in self.namespace_element.Types if t.IsEnum])
-		])
+		pages               = self.more_pages()
+		if pages:
+			html_template.main = self.__pages_table(pages)
+		else:
+			html_template.main = types_tables(members(self.namespace_element, "Types"))
 
 		# TODO: delegates
 
@@ -355,29 +1251,71 @@ class NamespaceNode(NodeBase):
 		else:
 			return TypeNode(type_element)
 
-	def __table(self, title, types):
-		def table_row(t):
+	def __pages_table(self, pages):
+		"""Returns the index of the pages of the types, with the first and the last type of every page."""
+		def table_row(page):
 			return """<tr>
 				<td>%s</td>
-				<td>%s</td>
-			</tr>""" % (t.ToHtml(), t.XmlComment.Summary() or "&nbsp;")
+				<td>%s &ndash; %s</td>
+				<td>%d</td>
+			</tr>""" % (a(page.href(), "Page %d" % page.number), type_link(page.types[0]), type_link(page.types[-1]), len(page.types))
 
-		return fmt_non_empty("<h2>" + title + """</h2>
+		return fmt_fragments("""<p>%d types, listed on %d pages.</p>
 			<table>
 				<thead>
 					<tr>
-						<th>Name</th>
-						<th>Description</th>
+						<th>Page</th>
+						<th>Types</th>
+						<th>Count</th>
 					</tr>
 				</thead>
 				<tbody>
-				%s
+				%%s
 				</tbody>
 			</table>
-		""", "".join(table_row(t) for t in types))
+		""" % (sum(len(page.types) for page in pages), len(pages)), (table_row(page) for page in pages))
+
+
+class NamespacePageNode(NodeBase):
+	"""One of the pages that list the types of a namespace with more types than page_size."""
+	__slots__ = ("namespace_element", "number", "count", "types")
+
+	def __init__(self, namespace_element, number, count, types):
+		NodeBase.__init__(self)
+		self.namespace_element = namespace_element
+		self.number            = number
+		self.count             = count
+		self.types             = types
+
+	def href(self):
+		return page_filename(self.namespace_element.Filename(), self.number)
+
+	def text(self):
+		return "%s Namespace, page %d of %d" % (self.namespace_element.Namespace, self.number, self.count)
+
+	def documentation(self):
+		return self.namespace_element.Documentation
+
+	def contents_html_template(self):
+		html_template       = HtmlTemplate()
+		html_template.title = self.text()
+		pager               = self.__pager()
+		html_template.main  = [ pager, types_tables(self.types), pager ]
+		return html_template
+
+	def __pager(self):
+		index = self.namespace_element.Filename()
+		links = [ a(index, "All pages") ]
+		if self.number > 1:
+			links.append(a(page_filename(index, self.number - 1), "Previous page"))
+		if self.number < self.count:
+			links.append(a(page_filename(index, self.number + 1), "Next page"))
+		return '<p class="pager">%s</p>' % " | ".join(links)
 
 
 class TypeNode(NodeBase):
+	__slots__ = ("type_element", "_memoized_children")
+
 	def __init__(self, type_element):
 		NodeBase.__init__(self)
 		self.type_element = type_element
@@ -388,6 +1326,7 @@ class TypeNode(NodeBase):
 	def text(self):
 		return self.type_element.ToString("s") + " " + self.type_element.TypeKind
 
+	@memoized
 	def children(self):
 		result = filter_empty([
 			flatten_single_child(ConstructorsNode(self.type_element)),
@@ -399,15 +1338,15 @@ class TypeNode(NodeBase):
 		return result
 
 	def contents_html_template(self):
-		print "Generating page for type %s" % self.type_element.ToString("f")
+		log(VERBOSE, "Generating page for type %s", self.type_element.ToString("f"))
 		type_kind            = self.type_element.TypeKind
 		html_template        = HtmlTemplate()
 		html_template.title  = "%s %s" % (self.type_element.ToString("f"), type_kind)
 		html_template.h1     = "%s %s" % (self.type_element.ToString("s"), type_kind)
-		html_template.main   = "\n".join([
+		html_template.main   = join_fragments("\n", [
 			fmt_non_empty("""
 				<h2>Summary</h2>
-				<p>%s</p>""", self.type_element.XmlComment.Summary()),
+				<p>%s</p>""", summary(self.type_element)),
 			self.__base_type_section(),
 			self.__interfaces_section(),
 			self.__derived_types_section(),
@@ -433,21 +1372,21 @@ class TypeNode(NodeBase):
 		if not base_type or not base_type.BaseType:
 			return ""
 
-		return "<p>Inherits from %s</p>" % base_type.ToHtml()
+		return "<p>Inherits from %s</p>" % type_link(base_type)
 
 	def __interfaces_section(self):
 		interfaces = self.type_element.GetInterfaces()
 		if not interfaces:
 			return ""
 
-		return "<p>Implements interfaces: %s</p>" % ", ".join(t.ToHtml() for t in interfaces)
+		return "<p>Implements interfaces: %s</p>" % ", ".join(type_link(t) for t in interfaces)
 
 	def __derived_types_section(self):
 		derived_types = self.type_element.GetDescendantTypes()
 		if not derived_types:
 			return ""
 
-		return "<p>Known derived types: %s</p>" % ", ".join(t.ToHtml() for t in derived_types)
+		return "<p>Known derived types: %s</p>" % ", ".join(type_link(t) for t in derived_types)
 
 	def __syntax_section(self):
 		return "\n".join([
@@ -459,21 +1398,21 @@ class TypeNode(NodeBase):
 		if not self.type_element.IsGenericType or not self.type_element.IsGenericTypeDefinition:
 			return ""
 
-		result = "<dl>"
+		result = [ "<dl>" ]
 		for t in self.type_element.GetGenericArguments():
-			result += "<dt>"
-			result += t.Name
-			result += "</dt>"
-			result += "<dd>"
-			result += "<p>" + (self.type_element.XmlComment.TypeParam(t.Name) or "&nbsp;") + "</p>"
-			result += "<p>" + self.__generic_argument_constraints(t) + "</p>"
-			result += "</dd>"
-		result += "</dl>"
-		return result
+			result.extend([
+				"<dt>", t.Name, "</dt>",
+				"<dd>",
+				"<p>", xml_comment(self.type_element).TypeParam(t.Name) or "&nbsp;", "</p>",
+				"<p>", self.__generic_argument_constraints(t), "</p>",
+				"</dd>"
+			])
+		result.append("</dl>")
+		return "".join(result)
 
 	def __generic_argument_constraints(self, t):
 		def test(enum, flag):
-			return (enum & flag) == flag
+			return (int(enum) & int(flag)) == int(flag)
 
 		result = []
 		ga = t.GenericParameterAttributes
@@ -484,7 +1423,7 @@ class TypeNode(NodeBase):
 				result.append("class")
 
 		for constraint in t.GetGenericParameterConstraints():
-			if constraint.Member != clr.GetClrType(System.ValueType):
+			if constraint.ToString() != "System.ValueType":
 				result.append(t.Name + " is " + constraint.ToHtml())
 
 		if test(ga, System.Reflection.GenericParameterAttributes.DefaultConstructorConstraint) and \
@@ -495,25 +1434,25 @@ class TypeNode(NodeBase):
 
 	def __constructors_section(self):
 		return fmt_non_empty(
-			"<h2>Constructors</h2>" + self.widget_member_filter(show_inherited = False) + "%s",
-			self.constructors_table(self.type_element.Constructors))
+			"<h2>Constructors</h2>" + self.widget_member_filter(1, show_inherited = False) + "%s",
+			self.constructors_table(members(self.type_element, "Constructors")))
 
 	def __properties_section(self):
 		return fmt_non_empty(
-			"<h2>Properties</h2>" + self.widget_member_filter() + "%s",
-			self.properties_table(self.type_element.Properties))
+			"<h2>Properties</h2>" + self.widget_member_filter(2) + "%s",
+			self.properties_table(members(self.type_element, "Properties")))
 
 	def __methods_section(self):
 		return fmt_non_empty(
-			"<h2>Methods</h2>" + self.widget_member_filter() + "%s",
-			self.methods_table(self.type_element.Methods))
+			"<h2>Methods</h2>" + self.widget_member_filter(3) + "%s",
+			self.methods_table(members(self.type_element, "Methods")))
 
 	def __extension_methods_section(self):
 		return fmt_non_empty(
 			"""
 			<h2>Extension Methods</h2>
 			%s
-			""", self.methods_table(self.type_element.ExtensionMethods))
+			""", self.methods_table(members(self.type_element, "ExtensionMethods")))
 
 #	def exclude_attribute(self, attribute):
 #		if attribute.AttributeType.Name == "__DynamicallyInvokableAttribute":
@@ -525,6 +1464,8 @@ class TypeNode(NodeBase):
 #			System.Security.SecuritySafeCriticalAttribute)
 
 class EnumNode(NodeBase):
+	__slots__ = ("type_element",)
+
 	def __init__(self, type_element):
 		NodeBase.__init__(self)
 		self.type_element = type_element
@@ -536,22 +1477,22 @@ class EnumNode(NodeBase):
 		return self.type_element.ToString("s") + " " + self.type_element.TypeKind
 
 	def contents_html_template(self):
-		print "Generating page for enum %s" % self.type_element.ToString("f")
+		log(VERBOSE, "Generating page for enum %s", self.type_element.ToString("f"))
 		type_kind            = self.type_element.TypeKind
 		has_flags            = self.type_element.HasAttribute("System.FlagsAttribute")
 		html_template        = HtmlTemplate()
 		html_template.title  = "%s %s" % (self.type_element.ToString("f"), type_kind)
 		html_template.h1     = "%s %s" % (self.type_element.ToString("s"), type_kind)
-		html_template.main   = fmt_non_empty("""
+		html_template.main   = [ fmt_non_empty("""
 				<h2>Summary</h2>
-				<p>%s</p>""", self.type_element.XmlComment.Summary())
+				<p>%s</p>""", summary(self.type_element)) ]
 
 		if has_flags:
-			html_template.main += """
+			html_template.main.append("""
 			<p class="info">This is a flags enum;
-			its members can be combined with bitwise operators.</p>"""
+			its members can be combined with bitwise operators.</p>""")
 
-		html_template.main += self.__members_section()
+		html_template.main.append(self.__members_section())
 
 		return html_template
 
@@ -560,11 +1501,11 @@ class EnumNode(NodeBase):
 			return "<tr><td>%s</td><td>%s</td><td>%s</td></tr>" % (
 				enum_member.Name,
 				enum_member.Value,
-				enum_member.XmlComment.Summary() or "&nbsp;"
+				summary(enum_member) or "&nbsp;"
 			)
 
-		html = [ fmt_enum_member(enum_member) for enum_member in self.type_element.EnumMembers ]
-		return """
+		rows = ( fmt_enum_member(enum_member) for enum_member in members(self.type_element, "EnumMembers") )
+		return fmt_fragments("""
 		<h2>Members</h2>
 		<table class=\"enum_members\">
 			<thead>
@@ -578,10 +1519,12 @@ class EnumNode(NodeBase):
 			%s
 			</tbody>
 		</table>
-		""" % "".join(html)
+		""", rows)
 
 
 class TypeMembersNode(NodeBase):
+	__slots__ = ("type_element", "_memoized_children", "_memoized_is_content_empty")
+
 	def __init__(self, type_element):
 		NodeBase.__init__(self)
 		self.type_element = type_element
@@ -600,13 +1543,14 @@ class TypeMembersNode(NodeBase):
 		html_template.title  = "%s %s" % (self.type_element.ToString("f"), self.text())
 		html_template.h1     = "%s %s" % (self.type_element.ToString("s"), self.text())
 		html_template.main   = fmt_non_empty(
-			self.widget_member_filter(show_inherited = not isinstance(self, ConstructorsNode)) + "%s",
+			self.widget_member_filter(1, show_inherited = not isinstance(self, ConstructorsNode)) + "%s",
 			self.main_html_table())
 
 		return html_template
 
+	@memoized
 	def is_content_empty(self):
-		"""Checks if this node is empty. Used in combination with append_if_not_empty."""
+		"""Checks if this node is empty. Used in combination with filter_empty."""
 		return len(self.children()) <= 0
 
 	def main_html_table(self):
@@ -614,48 +1558,59 @@ class TypeMembersNode(NodeBase):
 
 
 class ConstructorsNode(TypeMembersNode):
+	__slots__ = ()
+
 	def __init__(self, type_element):
 		TypeMembersNode.__init__(self, type_element)
 
 	def text(self):
 		return "Constructors"
 
+	@memoized
 	def children(self):
-		return [ ConstructorNode(c) for c in self.type_element.Constructors ]
+		return [ ConstructorNode(c) for c in members(self.type_element, "Constructors") ]
 
 	def main_html_table(self):
-		return self.constructors_table(self.type_element.Constructors)
+		return self.constructors_table(members(self.type_element, "Constructors"))
 
 
 class PropertiesNode(TypeMembersNode):
+	__slots__ = ()
+
 	def __init__(self, type_element):
 		TypeMembersNode.__init__(self, type_element)
 
 	def text(self):
 		return "Properties"
 
+	@memoized
 	def children(self):
-		return [ PropertyNode(p) for p in self.type_element.Properties if not p.IsInherited ]
+		return [ PropertyNode(p) for p in members(self.type_element, "Properties") if not p.IsInherited ]
 
 	def main_html_table(self):
-		return self.properties_table(self.type_element.Properties)
+		return self.properties_table(members(self.type_element, "Properties"))
 
 
 class MethodsNode(TypeMembersNode):
+	__slots__ = ()
+
 	def __init__(self, type_element):
 		TypeMembersNode.__init__(self, type_element)
 
 	def text(self):
 		return "Methods"
 
+	@memoized
 	def children(self):
-		return [ MethodNode(m) for m in self.type_element.Methods if not m.IsInherited ]
+		return [ MethodNode(m) for m in members(self.type_element, "Methods") if not m.IsInherited ]
 
 	def main_html_table(self):
-		return self.methods_table(self.type_element.Methods)
+		return self.methods_table(members(self.type_element, "Methods"))
 
 
 class ExtensionMethodsNode(NodeBase):
+	__slots__ = ("namespace_element", "_memoized_is_content_empty", "_memoized___get_extension_methods")
+
 	def __init__(self, namespace_element):
 		NodeBase.__init__(self)
 		self.namespace_element = namespace_element
@@ -669,6 +1624,7 @@ class ExtensionMethodsNode(NodeBase):
 	def documentation(self):
 		return self.namespace_element.Documentation
 
+	@memoized
 	def is_content_empty(self):
 		return len(self.__get_extension_methods()) <= 0
 
@@ -687,19 +1643,22 @@ class ExtensionMethodsNode(NodeBase):
 
 			lst.append(m)
 
-		html_template.main = ""
+		html_template.main = []
 
 		for extended_type in list(methods_by_extended_type):
-			html_template.main += "<h2>Extension methods for %s</h2>" % extended_type.ToHtml()
-			html_template.main += self.methods_table(methods_by_extended_type[extended_type])
+			html_template.main.append("<h2>Extension methods for %s</h2>" % extended_type.ToHtml())
+			html_template.main.append(self.methods_table(methods_by_extended_type[extended_type]))
 
 		return html_template
 
+	@memoized
 	def __get_extension_methods(self):
-		return [ m for m in self.namespace_element.Methods if not m.IsInherited and m.IsExtension() ]
+		return members(self.namespace_element, "ExtensionMethods")
 
 
 class ClassDiagramNode(NodeBase):
+	__slots__ = ("namespace_element",)
+
 	def __init__(self, namespace_element):
 		NodeBase.__init__(self)
 		self.namespace_element = namespace_element
@@ -713,33 +1672,96 @@ class ClassDiagramNode(NodeBase):
 	def documentation(self):
 		return self.namespace_element.Documentation
 
+	def more_pages(self):
+		if is_split(self.namespace_element):
+			return [ ClassDiagramDataNode(self.namespace_element) ]
+		return []
+
 	def contents_html_template(self):
 
 		html_template        = HtmlTemplate()
 		html_template.title  = "%s Class Diagram" % self.namespace_element.Namespace
 
-		# ignore static types
-		# take types with no base class or base class outside the documentation scope
-		root_types = [ t for t in self.namespace_element.Types if not t.IsStatic and (not t.BaseType or not t.BaseType.IsLocalType) ]
-
-		html_template.main = self.__ul(root_types)
+		root_types = class_diagram_roots(self.namespace_element)
+		if is_split(self.namespace_element):
+			html_template.main = self.__roots_ul(class_hierarchy(root_types))
+		else:
+			html_template.main = self.__ul(root_types)
 		return html_template
 
+	def __roots_ul(self, hierarchy):
+		"""Yields the fragments of the list of the root types of a large diagram,
+		whose child types app.js reads from the data file when they are expanded."""
+		yield '<ul class="js-class-diagram" data-src="%s">' % escape(class_diagram_data_filename(self.namespace_element))
+		for index, (parent, t) in enumerate(hierarchy):
+			if parent >= 0:
+				continue
+
+			has_children = index + 1 < len(hierarchy) and hierarchy[index + 1][0] == index
+			yield '<li data-index="%d">%s%s</li>' % (index, '<span class="js-expander js-collapsed">+</span> ' if has_children else "", type_link(t))
+
+		yield "</ul>"
+
 	def __ul(self, types):
+		"""Yields the fragments of the nested lists of the given types and their child types."""
 		if not types:
-			return ""
+			return
 
-		result = "<ul>"
+		yield "<ul>"
 		for t in types:
-			result += "<li>%s" % t.ToHtml()
-			result += self.__ul(t.GetChildTypes())
-			result += "</li>"
+			yield "<li>%s" % type_link(t)
+			for fragment in self.__ul(t.GetChildTypes()):
+				yield fragment
+			yield "</li>"
+
+		yield "</ul>"
+
+
+def class_diagram_roots(namespace_element):
+	# ignore static types
+	# take types with no base class or base class outside the documentation scope
+	return [ t for t in members(namespace_element, "Types") if not t.IsStatic and (not t.BaseType or not t.BaseType.IsLocalType) ]
+
+def class_hierarchy(root_types):
+	"""Returns the given types and the types deriving from them, depth first,
+	as pairs of the index of the parent, or -1 for a root, and the type."""
+	result = []
+	stack  = [ (-1, t) for t in reversed(root_types) ]
+	while stack:
+		parent, t = stack.pop()
+		index = len(result)
+		result.append((parent, t))
+		stack.extend((index, child) for child in reversed(list(t.GetChildTypes())))
+	return result
+
+def class_diagram_data_filename(namespace_element):
+	return namespace_element.Filename(prefix = "ClassDiagram")[:-len(".html")] + ".json"
+
+class ClassDiagramDataNode(NodeBase):
+	"""The data file of a large class diagram, with every type as [ index of the parent, link ]."""
+	__slots__ = ("namespace_element",)
 
-		result += "</ul>"
-		return result
+	def __init__(self, namespace_element):
+		NodeBase.__init__(self)
+		self.namespace_element = namespace_element
+
+	def href(self):
+		return class_diagram_data_filename(self.namespace_element)
+
+	def text(self):
+		return "Class Diagram Data"
+
+	def documentation(self):
+		return self.namespace_element.Documentation
+
+	def contents_html_template(self):
+		hierarchy = class_hierarchy(class_diagram_roots(self.namespace_element))
+		return DataFile(to_json({ "types": [ [ parent, type_link(t) ] for parent, t in hierarchy ] }, compact = True))
 
 
 class ConstructorNode(NodeBase):
+	__slots__ = ("constructor_element",)
+
 	def __init__(self, constructor_element):
 		NodeBase.__init__(self)
 		self.constructor_element = constructor_element
@@ -775,7 +1797,7 @@ class ConstructorNode(NodeBase):
 				<dt>Assembly</dt>
 				<dd>%s</dd>
 			</dl>
-			""" % (self.constructor_element.XmlComment.Summary(),
+			""" % (xml_comment(self.constructor_element).Summary(),
 				   self.constructor_element.NamespaceElement.ToHtml(),
 				   self.constructor_element.OwnerType.Assembly.ToString())
 
@@ -796,7 +1818,7 @@ class ConstructorNode(NodeBase):
 		return "<li>%s<br />Type: %s %s</li>" % (
 			parameter.Name,
 			parameter.ParameterType.ToHtml(),
-			self.constructor_element.XmlComment.Param(parameter.Name)
+			xml_comment(self.constructor_element).Param(parameter.Name)
 		)
 
 	def __parameters_section(self):
@@ -811,16 +1833,18 @@ class ConstructorNode(NodeBase):
 		return ""
 
 	def __remarks_section(self):
-		return self.constructor_element.XmlComment.Section("remarks")
+		return xml_comment(self.constructor_element).Section("remarks")
 
 	def __example_section(self):
-		return self.constructor_element.XmlComment.Section("example")
+		return xml_comment(self.constructor_element).Section("example")
 
 	def __see_also_section(self):
 		return ""
 
 
 class PropertyNode(NodeBase):
+	__slots__ = ("property_element",)
+
 	def __init__(self, property_element):
 		NodeBase.__init__(self)
 		self.property_element = property_element
@@ -842,7 +1866,7 @@ class PropertyNode(NodeBase):
 		html_template.main   = fmt_non_empty("""
 				<h2>Summary</h2>
 				<p>%s</p>
-				""", self.property_element.XmlComment.Summary()) + \
+				""", xml_comment(self.property_element).Summary()) + \
 				"""
 				<h2>Syntax</h2>
 				<code class="syntax">
@@ -853,6 +1877,8 @@ class PropertyNode(NodeBase):
 
 
 class MethodNode(NodeBase):
+	__slots__ = ("method_element",)
+
 	def __init__(self, method_element):
 		NodeBase.__init__(self)
 		self.method_element = method_element
@@ -889,7 +1915,7 @@ class MethodNode(NodeBase):
 				<dt>Assembly</dt>
 				<dd>%s</dd>
 			</dl>
-			""" % (self.method_element.XmlComment.Summary(),
+			""" % (xml_comment(self.method_element).Summary(),
 				   self.method_element.NamespaceElement.ToHtml(),
 				   self.method_element.OwnerType.Assembly.ToString())
 
@@ -911,7 +1937,7 @@ class MethodNode(NodeBase):
 		return "<li>%s<br />Type: %s %s</li>" % (
 			parameter.Name,
 			parameter.ParameterType.ToHtml(),
-			self.method_element.XmlComment.Param(parameter.Name)
+			xml_comment(self.method_element).Param(parameter.Name)
 		)
 
 	def __parameters_section(self):
@@ -927,36 +1953,267 @@ class MethodNode(NodeBase):
 		<h3>Return Value</h3>
 		<p>Type: %s</p>
 		<p>%s</p>
-		""" % (self.method_element.ReturnType.ToHtml(), self.method_element.XmlComment.Section("returns"))
+		""" % (self.method_element.ReturnType.ToHtml(), xml_comment(self.method_element).Section("returns"))
 
 	def __exceptions_section(self):
 		return ""
 
 	def __remarks_section(self):
-		return self.method_element.XmlComment.Section("remarks")
+		return xml_comment(self.method_element).Section("remarks")
 
 	def __example_section(self):
-		return self.method_element.XmlComment.Section("example")
+		return xml_comment(self.method_element).Section("example")
 
 	def __see_also_section(self):
 		return ""
 
 
-def make_visitor(nav, footer, output_directory):
-	"""Makes the visitor function that processes each navigation node."""
+# the shared navigation tree is a script rather than an HTML file that app.js downloads,
+# since browsers don't let a page opened from disk download files, but they do run its scripts
+SHARED_NAV_FILENAME = "nav.js"
+SHARED_NAV_SCRIPT   = "var igloocastleNav = %s;\n"
+
+def shared_nav_marker(href):
+	"""Returns the placeholder that app.js replaces with the shared navigation tree, and the script that has the tree."""
+	return '<script src="%s"></script><div class="js-shared-nav" data-current="%s"></div>' % (
+		SHARED_NAV_FILENAME, escape(href))
+
+def write_shared_nav(output_writer, nav):
+	"""Writes the shared navigation tree, as a script that sets the igloocastleNav variable of app.js."""
+	minifier = getattr(output_writer, "minifier", None)
+	if minifier:
+		# a minifying output writer only minifies the HTML files
+		nav = minifier.minify(nav)
+
+	output_writer.write(SHARED_NAV_FILENAME, SHARED_NAV_SCRIPT % to_json(nav))
+
+SEARCH_INDEX_FILENAME = "search.json"
+SEARCH_SHARD_FILENAME = "search-%s.json"
+SEARCH_PREFIX_LENGTH  = 2
+SEARCH_TOP_ENTRIES    = 10
+
+def search_key(text):
+	"""Returns the lower case text that the search matches the query against."""
+	return text.lower()
+
+def search_shard(key):
+	"""Returns the shard of the search index that has the given key.
+
+	It is the prefix of the key, with characters that are not letters
+	or digits replaced, so that it can be part of a filename. app.js computes it the same way."""
+	return "".join(c if ("a" <= c <= "z" or "0" <= c <= "9") else "_" for c in key[:SEARCH_PREFIX_LENGTH])
+
+# the nodes of the pages that the search finds; the pages that list members are left out
+SEARCHABLE_NODES = (NamespaceNode, TypeNode, EnumNode, ConstructorNode, PropertyNode, MethodNode)
+
+class SearchIndex:
+	"""Indexes the pages of namespaces, types and members by their title, for the search of app.js.
+
+	Every entry is a list of the title, the page and the title of the page it belongs to,
+	e.g. the type of a member. The entries are split into shards by the prefix
+	of their title, which app.js loads when a query needs them, so even the index of
+	a big API is not downloaded at once. search.json lists the shards and the best
+	entries for every first character, which answer the first keystroke."""
+
+	def __init__(self):
+		self.shards  = {}
+		self.__hrefs = set()
+
+	def add_tree(self, node, context = ""):
+		"""Adds the searchable nodes under the given node.
+
+		The titles of the nodes are HTML, e.g. List&lt;T&gt;, but the index has their text,
+		which app.js escapes when it shows the results."""
+		for child in node.children():
+			if isinstance(child, SEARCHABLE_NODES):
+				title = WebUtility.HtmlDecode(child.text())
+				self.add(title, child.href(), context)
+				self.add_tree(child, title)
+			else:
+				self.add_tree(child, context)
+
+	def add(self, text, href, context):
+		# pages that appear twice in the tree, e.g. a single constructor, are indexed once
+		if href in self.__hrefs:
+			return
+
+		self.__hrefs.add(href)
+		key = search_key(text)
+		self.shards.setdefault(search_shard(key), []).append((key, text, href, context))
+
+	def write(self, output_writer):
+		"""Writes the shards and search.json, and returns the number of entries."""
+		top = {}
+		for shard, entries in self.shards.items():
+			entries.sort()
+			contexts = sorted(set(e[3] for e in entries))
+			context_index = dict((c, i) for i, c in enumerate(contexts))
+			output_writer.write(SEARCH_SHARD_FILENAME % shard, to_json({
+				"contexts": contexts,
+				"entries":  [ [ e[1], e[2], context_index[e[3]] ] for e in entries ]
+			}, True))
+			top.setdefault(shard[:1], []).extend(entries)
+
+		for first, entries in top.items():
+			best = sorted(entries, key = lambda e: (len(e[0]), e[0], e[2]))[:SEARCH_TOP_ENTRIES]
+			top[first] = [ [ e[1], e[2], e[3] ] for e in best ]
+
+		output_writer.write(SEARCH_INDEX_FILENAME, to_json({
+			"prefix": SEARCH_PREFIX_LENGTH,
+			"shards": dict((shard, len(entries)) for shard, entries in self.shards.items()),
+			"top":    top
+		}, True))
+		return len(self.__hrefs)
+
+def write_search_index(root_nav_node, output_writer):
+	index = SearchIndex()
+	index.add_tree(root_nav_node)
+	entries = index.write(output_writer)
+	log(NORMAL, "Wrote search index with %d entries in %d shards", entries, len(index.shards))
+
+def make_visitor(nav, footer, output_writer, profiler):
+	"""Makes the visitor function that processes each navigation node.
+
+	If nav is None, every page gets a marker for the shared navigation tree
+	instead of a copy of it."""
 
 	def visitor(navigation_node):
-		print "visting %s" % navigation_node
+		log(VERBOSE, "visting %s", navigation_node)
+		start = clock()
+		if comment_tracker is not None:
+			comment_tracker.start_page()
+
 		html_template = navigation_node.contents_html_template()
 		if not html_template:
-			return
+			return False
 
-		html_template.nav    = nav
+		href = navigation_node.href()
+		html_template.nav    = nav if nav is not None else shared_nav_marker(href)
 		html_template.footer = footer
-		html_template.write(output_directory, navigation_node.href())
+		built = clock()
+		html_template.write(output_writer, href)
+		profiler.add_page(navigation_node, href, built - start, clock() - built)
+		if comment_tracker is not None:
+			comment_tracker.finish_page(href)
+		return True
 
 	return visitor
 
+PROGRESS_INTERVAL = 100
+
+def render_pages(nodes, visitor, jobs):
+	"""Calls the visitor for every node, on the given number of worker threads.
+
+	Every page only depends on its own node, so the output is the same
+	regardless of the number of jobs."""
+	start = time()
+	if jobs <= 1:
+		pages = len([ n for n in nodes if visitor(n) ])
+	else:
+		pages = render_pages_parallel(nodes, visitor, jobs)
+
+	elapsed = max(time() - start, 0.001)
+	log(NORMAL, "Rendered %d pages in %.2f seconds (%.1f pages/sec)", pages, elapsed, pages / elapsed)
+
+def render_pages_parallel(nodes, visitor, jobs):
+	"""Splits the nodes across worker threads and returns the number of pages written."""
+	counts = [ 0 ] * jobs
+	errors = []
+
+	def worker(index):
+		share = nodes[index::jobs]
+		try:
+			for node in share:
+				if visitor(node):
+					counts[index] += 1
+					if counts[index] % PROGRESS_INTERVAL == 0:
+						log(VERBOSE, "Worker %d: %d pages", index, counts[index])
+		except:
+			errors.append(sys.exc_info())
+
+		log(NORMAL, "Worker %d: done, %d pages", index, counts[index])
+
+	threads = [ Thread(ThreadStart(lambda index = index: worker(index))) for index in range(jobs) ]
+	for t in threads:
+		t.Start()
+
+	for t in threads:
+		t.Join()
+
+	if errors:
+		error_type, error, traceback = errors[0]
+		raise error_type, error, traceback
+
+	return sum(counts)
+
+class Shard:
+	"""Selects the namespaces that one process of a distributed build renders.
+
+	Either the namespaces are split into count shares of about the same number
+	of pages and the share with the given 1-based index is selected, or the
+	namespaces with the given names are. Pages link to each other only by filename,
+	so the pages of all shards can be merged into one directory afterwards."""
+	def __init__(self, index, count, namespaces = None):
+		self.index      = index
+		self.count      = count
+		self.namespaces = set(namespaces) if namespaces else None
+
+	def __str__(self):
+		if self.namespaces is not None:
+			return "Shard of namespaces %s" % ", ".join(sorted(self.namespaces))
+		return "Shard %d/%d" % (self.index, self.count)
+
+	def select(self, namespace_nodes):
+		"""Returns the namespace nodes of this shard, in their original order."""
+		if self.namespaces is not None:
+			unknown = self.namespaces - set(n.namespace_element.Namespace for n in namespace_nodes)
+			if unknown:
+				log(NORMAL, "Warning: the documentation has no namespaces %s", ", ".join(sorted(unknown)))
+			return [ n for n in namespace_nodes if n.namespace_element.Namespace in self.namespaces ]
+
+		# largest namespaces first, each to the shard with the fewest pages so far
+		weights = dict((n, count_nodes(n)) for n in namespace_nodes)
+		loads   = [ 0 ] * self.count
+		owners  = {}
+		for n in sorted(namespace_nodes, key = lambda n: (-weights[n], n.namespace_element.Namespace)):
+			owner = min(range(self.count), key = lambda i: (loads[i], i))
+			loads[owner] += weights[n]
+			owners[n] = owner
+
+		return [ n for n in namespace_nodes if owners[n] == self.index - 1 ]
+
+def make_shard(options):
+	"""Returns the Shard that the options ask for, or None to render every page."""
+	if not options:
+		return None
+	if options.Namespaces:
+		return Shard(1, 1, options.Namespaces)
+	if options.ShardCount > 1:
+		return Shard(options.ShardIndex, options.ShardCount)
+	return None
+
+def count_nodes(node):
+	nodes = []
+	node.visit(nodes.append)
+	return len(nodes)
+
+def merge_shards(shard_directories, output_writer):
+	"""Copies the pages that the shards of a distributed build rendered to the output writer."""
+	owners = {}
+	for directory in shard_directories:
+		for source in Directory.GetFiles(directory):
+			filename = Path.GetFileName(source)
+			if filename == MANIFEST_FILENAME or filename == GZIP_MANIFEST_FILENAME:
+				continue
+
+			if filename in owners:
+				raise ValueError("%s was rendered by more than one shard: %s and %s" % (filename, owners[filename], directory))
+
+			owners[filename] = directory
+			output_writer.copy_file(filename, source)
+
+	log(NORMAL, "Merged %d files from %d shards", len(owners), len(shard_directories))
+
 #	def generate_nant_task_pages(self):
 #		print "NAnt tasks:"
 #		for type in self.documentation.Types:
@@ -964,18 +2221,391 @@ def make_visitor(nav, footer, output_directory):
 #				taskName = type.GetAttribute('NAnt.Core.Attributes.TaskName').Name
 #				print "todo: generate page for nant task " + taskName
 
-def Generate(documentation, output_directory):
-	"""Entry point for IglooCastle"""
-	print "Hello from python!"
-
-	root_nav_node = DocumentationNode(documentation)
-	nav           = root_nav_node.nav_html()
-	footer        = """Generated by IglooCastle at
-			""" + strftime("%Y-%m-%d %H:%M:%S", gmtime()) + """
+def DumpSnapshot(documentation, filename):
+	"""Writes the documentation model to a snapshot file, which LoadSnapshot can render from."""
+	start = time()
+	writer = SnapshotWriter()
+	writer.write(documentation, filename)
+	log(NORMAL, "Wrote snapshot %s with %d elements in %.2f seconds", filename, len(writer.entries), time() - start)
+
+def LoadSnapshot(filename):
+	"""Reads a snapshot file written by DumpSnapshot, instead of reflecting the assemblies."""
+	start = time()
+	documentation = read_snapshot(filename)
+	log(NORMAL, "Loaded snapshot %s in %.2f seconds", filename, time() - start)
+	return documentation
+
+def start_run(options):
+	"""Resets the caches and the statistics of the module for a run with the given options."""
+	global run_stats, element_cache, fragment_cache, verbosity, page_size
+	verbosity      = options.Verbosity if options else NORMAL
+	run_stats      = RunStats()
+	element_cache  = ElementCache(run_stats)
+	fragment_cache = FragmentCache(options.FragmentCacheSize if options else DEFAULT_FRAGMENT_CACHE_SIZE)
+	page_size      = options.PageSize if options else DEFAULT_PAGE_SIZE
+
+# the files that every page loads, next to IglooCastle.exe
+STATIC_FILES = [ "app.js", "jquery-1.11.1.min.js", "style.css" ]
+
+def page_footer(generated_by):
+	return generated_by + """
 			<link type=\"text/css\" rel=\"stylesheet\" href=\"style.css\" />
 			<script src="jquery-1.11.1.min.js"></script>
 			<script src="app.js"></script>
 			</footer>"""
-	visitor = make_visitor(nav, footer, output_directory)
-	root_nav_node.visit(visitor)
-	print "Python out!"
+
+def make_output_writer(output_directory, options, archive = None, merge = False, partial = False):
+	"""Returns the output writer that the options ask for, and the text of the footer of the pages.
+
+	archive is the file to write the pages to instead of the output directory.
+	partial tells that only some of the pages are written, as in watch mode,
+	so that an incremental build keeps the files of the others."""
+	generated_at = strftime("%Y-%m-%d %H:%M:%S", gmtime())
+	if options and options.Incremental and not merge and not archive:
+		# keep the timestamp in the manifest, so that unchanged pages stay the same
+		output_writer = IncrementalOutputWriter(output_directory, generated_at, partial)
+		generated_by  = "Generated by IglooCastle"
+	else:
+		output_writer = ArchiveOutputWriter(archive) if archive else OutputWriter(output_directory)
+		generated_by  = """Generated by IglooCastle at
+			""" + generated_at
+
+	if options and options.Gzip and not archive:
+		output_writer = GzipOutputWriter(output_writer)
+
+	if options and options.Minify:
+		# outermost, so that the gzip copies and the incremental manifest are of the minified pages
+		output_writer = MinifyingOutputWriter(output_writer)
+
+	return output_writer, generated_by
+
+def Generate(documentation, output_directory, options = None, stage_timer = None, static_directory = None):
+	"""Entry point for IglooCastle
+
+	The static files are copied from static_directory when the output is an archive or is compressed;
+	otherwise IglooCastle.exe copies them."""
+	start_run(options)
+	profiler = Profiler(stage_timer)
+	log(NORMAL, "Hello from python!")
+
+	shard = make_shard(options)
+	merge = options and options.Merge
+	# the pages of a shard have to be files, for the merge step to copy them
+	archive = options and options.Archive and not shard
+	output_writer, generated_by = make_output_writer(output_directory, options, options.Archive if archive else None, merge)
+
+	root_nav_node = DocumentationNode(documentation)
+	with profiler.stage("nav build"):
+		nav = root_nav_node.nav_html()
+
+	if options and options.SharedNav:
+		# the navigation tree is written once, to be inserted by app.js;
+		# for a sharded build, the merge step writes it
+		if not shard:
+			write_shared_nav(output_writer, nav)
+		nav = None
+
+	footer = page_footer(generated_by)
+	if not shard:
+		# like the shared navigation tree, the search index of a sharded build is written by the merge step
+		with profiler.stage("search index"):
+			write_search_index(root_nav_node, output_writer)
+
+	if merge:
+		# the pages were rendered by the shards
+		with profiler.stage("merge"):
+			merge_shards(options.Merge, output_writer)
+	else:
+		visitor = make_visitor(nav, footer, output_writer, profiler)
+		nodes   = []
+		if shard:
+			namespace_nodes = shard.select(root_nav_node.children())
+			log(NORMAL, "%s: %d of %d namespaces", shard, len(namespace_nodes), len(root_nav_node.children()))
+			for namespace_node in namespace_nodes:
+				namespace_node.visit(nodes.append)
+		else:
+			root_nav_node.visit(nodes.append)
+
+		with profiler.stage("render"):
+			render_pages(nodes, visitor, options.Jobs if options else 1)
+
+	if static_directory and not shard and (archive or (options and options.Gzip)):
+		for filename in STATIC_FILES:
+			output_writer.copy_file(filename, Path.Combine(static_directory, filename))
+
+	with profiler.stage("finish"):
+		output_writer.close()
+
+	run_stats.report()
+	fragment_cache.report()
+	profiler.print_summary()
+	if options and options.Profile:
+		profiler.write_report(options.Profile)
+
+	log(NORMAL, "Python out!")
+
+
+SERVE_PAGE_CACHE_SIZE = 256
+CONTENT_TYPES         = {
+	".html": "text/html; charset=utf-8",
+	".json": "application/json; charset=utf-8",
+	".js":   "application/javascript",
+	".css":  "text/css"
+}
+
+class MemoryOutputWriter:
+	"""Keeps the written files in memory instead of writing them to disk."""
+	def __init__(self):
+		self.files = {}
+
+	def write(self, filename, contents):
+		self.files[filename] = contents
+
+	def write_fragments(self, filename, fragments):
+		self.write(filename, "".join(flatten(fragments)))
+
+	def close(self):
+		pass
+
+class PreviewServer:
+	"""Renders the pages of a documentation on demand, for Serve.
+
+	The node tree is built once, to find the node of a requested page by its filename
+	and for the navigation tree; a page is only rendered when it is requested,
+	and the most recently requested pages are cached."""
+	def __init__(self, documentation, options, static_directory):
+		self.static_directory = static_directory
+		self.profiler         = Profiler()
+		self.pages            = FragmentCache(SERVE_PAGE_CACHE_SIZE, "Page cache")
+		self.generated        = MemoryOutputWriter()
+		self.root_nav_node    = DocumentationNode(documentation)
+		self.nodes            = {}
+		self.root_nav_node.visit(self.__add_node)
+
+		nav = self.root_nav_node.nav_html()
+		if options and options.SharedNav:
+			write_shared_nav(self.generated, nav)
+			nav = None
+
+		generated_by = """Generated by IglooCastle at
+			""" + strftime("%Y-%m-%d %H:%M:%S", gmtime())
+		self.rendered = MemoryOutputWriter()
+		self.visitor  = make_visitor(nav, page_footer(generated_by), self.rendered, self.profiler)
+
+	def __add_node(self, node):
+		if node is not self.root_nav_node:
+			self.nodes.setdefault(node.href(), node)
+
+	def home(self):
+		"""Returns the page that the root URL redirects to, the first namespace."""
+		children = self.root_nav_node.children()
+		return children[0].href() if children else None
+
+	def respond(self, filename):
+		"""Returns the HTTP status, the content type and the contents of the requested file."""
+		content_type = CONTENT_TYPES.get(filename[filename.rfind("."):], "application/octet-stream")
+		if filename in STATIC_FILES:
+			return 200, content_type, File.ReadAllBytes(Path.Combine(self.static_directory, filename))
+
+		if filename.startswith("search") and filename.endswith(".json") and SEARCH_INDEX_FILENAME not in self.generated.files:
+			# the search index is only built when the search is used
+			write_search_index(self.root_nav_node, self.generated)
+
+		if filename in self.generated.files:
+			return 200, content_type, self.generated.files[filename]
+
+		node = self.nodes.get(filename)
+		if node is None:
+			return 404, "text/plain", "%s is not a page of this documentation" % filename
+
+		return 200, content_type, self.pages.get(filename, lambda: self.__render(node, filename))
+
+	def __render(self, node, filename):
+		self.visitor(node)
+		return self.rendered.files.pop(filename)
+
+	def serve(self, port):
+		"""Answers HTTP requests on the given port, until the process is stopped."""
+		listener = HttpListener()
+		listener.Prefixes.Add("http://localhost:%d/" % port)
+		listener.Start()
+		log(NORMAL, "Serving %d pages at http://localhost:%d/, press Ctrl+C to stop", len(self.nodes), port)
+		while True:
+			context = listener.GetContext()
+			start   = clock()
+			hits    = self.pages.hits
+			filename = Uri.UnescapeDataString(context.Request.Url.AbsolutePath).lstrip("/")
+			response = context.Response
+			try:
+				if not filename and self.home():
+					response.Redirect(self.home())
+					status = 302
+				else:
+					status, content_type, contents = self.respond(filename)
+					if isinstance(contents, basestring):
+						contents = Encoding.UTF8.GetBytes(contents)
+					response.StatusCode      = status
+					response.ContentType     = content_type
+					response.ContentLength64 = contents.Length
+					response.OutputStream.Write(contents, 0, contents.Length)
+			except Exception, e:
+				status = 500
+				response.StatusCode = status
+				log(QUIET, "Error serving %s: %s", filename, e)
+			finally:
+				response.Close()
+
+			log(NORMAL, "%d %s %.1f ms%s", status, filename or "/", (clock() - start) * 1000,
+				" (cached)" if self.pages.hits > hits else "")
+
+def Serve(documentation, options, static_directory):
+	"""Serves the pages of the documentation over HTTP, rendering them when they are requested."""
+	start_run(options)
+	start  = time()
+	server = PreviewServer(documentation, options, static_directory)
+	log(NORMAL, "Mapped %d pages in %.2f seconds", len(server.nodes), time() - start)
+	server.serve(options.Serve)
+
+def page_type(node):
+	"""Returns the type that the page of the given node documents, or the declaring type of its member."""
+	type_element = getattr(node, "type_element", None)
+	if type_element is not None:
+		return type_element
+
+	for name in [ "constructor_element", "property_element", "method_element" ]:
+		member = getattr(node, name, None)
+		if member is not None:
+			return member.DeclaringType
+
+	return None
+
+def type_name(type_element):
+	"""Returns the full name of the given type, or of its generic type definition."""
+	if type_element.IsGenericType and not type_element.IsGenericTypeDefinition:
+		type_element = type_element.GetGenericTypeDefinition()
+	return type_element.ToString("f")
+
+class AffectedTypes:
+	"""Decides which pages depend on the types of rescanned assemblies."""
+	def __init__(self, type_names):
+		self.type_names = type_names
+		self.__affected = {}
+
+	def page_is_affected(self, node):
+		type_element = page_type(node)
+		if type_element is not None:
+			return self.is_affected(type_element)
+
+		# the pages of a namespace list its types, their extension methods and their hierarchy
+		return any(self.is_affected(t) for t in members(node.namespace_element, "Types"))
+
+	def is_affected(self, type_element):
+		"""Checks if the type is one of the rescanned ones, derives from one or is extended by one."""
+		result = self.__affected.get(type_element)
+		if result is None:
+			result = type_name(type_element) in self.type_names \
+				or self.__inherits_affected(type_element) \
+				or any(type_name(m.DeclaringType) in self.type_names for m in members(type_element, "ExtensionMethods"))
+			self.__affected[type_element] = result
+		return result
+
+	def __inherits_affected(self, type_element):
+		base_type = type_element.BaseType
+		while base_type is not None:
+			if type_name(base_type) in self.type_names:
+				return True
+			base_type = base_type.BaseType
+		return False
+
+class WatchSession:
+	"""Keeps the pages of a documentation up to date while its XML files and assemblies change.
+
+	The pages record which comments they show, so that after a change of the XML documentation
+	only the pages that show a changed comment are rendered again. After a change of assemblies,
+	the pages of their types, of the types that derive from them or are extended by them,
+	and of the namespaces of those types are rendered again; every page is, if pages were added
+	or removed or the navigation tree that every page has inlined changed."""
+	def __init__(self, output_directory, options):
+		self.output_directory = output_directory
+		self.options          = options
+		self.shared_nav       = bool(options and options.SharedNav)
+		self.nodes            = {}
+		self.nav              = None
+
+	def build(self, documentation):
+		"""Builds the node tree of the documentation and returns whether the pages or the navigation tree changed."""
+		self.root_nav_node = DocumentationNode(documentation)
+		nav   = self.root_nav_node.nav_html()
+		nodes = {}
+		def add(node):
+			if node is not self.root_nav_node:
+				nodes.setdefault(node.href(), node)
+		self.root_nav_node.visit(add)
+
+		for href in set(self.nodes) - set(nodes):
+			if File.Exists(Path.Combine(self.output_directory, href)):
+				log(VERBOSE, "Deleting file %s", href)
+				File.Delete(Path.Combine(self.output_directory, href))
+
+		changed = set(nodes) != set(self.nodes) or nav != self.nav
+		self.nodes = nodes
+		self.nav   = nav
+		return changed
+
+	def render(self, hrefs, structure_changed, static_directory = None):
+		"""Renders the given pages, and the navigation tree and the search index if the structure changed.
+
+		The static files are copied from static_directory when the output is compressed,
+		as Generate does."""
+		# Options rejects the archive and the shards in watch mode
+		output_writer, generated_by = make_output_writer(self.output_directory, self.options, partial = True)
+		if structure_changed:
+			if self.shared_nav:
+				write_shared_nav(output_writer, self.nav)
+			write_search_index(self.root_nav_node, output_writer)
+
+		nav     = None if self.shared_nav else self.nav
+		visitor = make_visitor(nav, page_footer(generated_by), output_writer, Profiler())
+		render_pages([ self.nodes[href] for href in sorted(hrefs) ], visitor, self.options.Jobs if self.options else 1)
+		if static_directory and self.options and self.options.Gzip:
+			for filename in STATIC_FILES:
+				output_writer.copy_file(filename, Path.Combine(static_directory, filename))
+
+		output_writer.close()
+
+	def CommentsChanged(self):
+		"""Renders the pages that show a comment that changed, after XML documentation files were reloaded."""
+		global fragment_cache
+		fragment_cache = FragmentCache(fragment_cache.max_size)
+		hrefs = [ href for href in comment_tracker.changed_pages() if href in self.nodes ]
+		log(NORMAL, "XML documentation changed, rendering %d of %d pages", len(hrefs), len(self.nodes))
+		self.render(hrefs, False)
+
+	def AssembliesChanged(self, documentation, type_names):
+		"""Renders the pages affected by rescanned assemblies.
+
+		documentation is the new documentation of all the assemblies, and type_names
+		are the full names of the types of the rescanned assemblies, before and after the change."""
+		start_run(self.options)
+		if self.build(documentation):
+			hrefs = list(self.nodes)
+		else:
+			affected = AffectedTypes(set(type_names))
+			hrefs = [ href for href, node in self.nodes.items() if affected.page_is_affected(node) ]
+
+		log(NORMAL, "Assemblies changed, rendering %d of %d pages", len(hrefs), len(self.nodes))
+		comment_tracker.forget_pages(hrefs)
+		self.render(hrefs, True)
+
+def StartWatch(documentation, output_directory, options, static_directory = None):
+	"""Renders every page, like Generate, and returns the WatchSession that keeps them up to date."""
+	global comment_tracker
+	start_run(options)
+	comment_tracker = CommentTracker()
+	log(NORMAL, "Hello from python!")
+
+	session = WatchSession(output_directory, options)
+	session.build(documentation)
+	session.render(list(session.nodes), True, static_directory)
+	run_stats.report()
+	return session
@@ -0,0 +1,243 @@
+import marshal
+import clr
+
+# Summary, Param, TypeParam and ToAccessString are extension methods,
+# which IronPython only finds in the modules that import them
+clr.AddReference("IglooCastle.CLI")
+import IglooCastle.CLI
+clr.ImportExtensions(IglooCastle.CLI)
+
+SNAPSHOT_FORMAT = "IglooCastle snapshot 2"
+
+class SnapshotWriter:
+	"""Records the documentation model as plain data, as far as generator.py uses it.
+
+	Every element is recorded once, with its properties and the results
+	of the method calls that the pages need, e.g. filenames, HTML links
+	and resolved XML comments. Elements refer to each other by index."""
+	def __init__(self):
+		self.entries = []
+		self.__ids   = {}
+		self.__roles = set()
+
+	def write(self, documentation, filename):
+		root = self.ref(documentation, "documentation")
+		f = open(filename, 'wb')
+		marshal.dump({ "format": SNAPSHOT_FORMAT, "root": root[1], "entries": self.entries }, f)
+		f.close()
+
+	def ref(self, element, role):
+		"""Records the element in the given role, if it was not recorded so yet, and returns a reference to it."""
+		if element is None:
+			return None
+
+		id = self.__ids.get(element)
+		if id is None:
+			id = self.__new_entry(element)
+			self.__ids[element] = id
+
+		if (id, role) not in self.__roles:
+			self.__roles.add((id, role))
+			getattr(self, "_record_" + role)(element, self.entries[id])
+
+		return ("e", id)
+
+	def refs(self, elements, role):
+		return [ self.ref(element, role) for element in elements ]
+
+	def __new_entry(self, element):
+		self.entries.append([ type(element).__name__, {}, {} ])
+		return len(self.entries) - 1
+
+	def __comment(self, element):
+		"""Records the summary of the XML comment of the element and returns its index and the comment.
+
+		Comments are not shared between elements, as they are created on demand."""
+		comment = element.XmlComment
+		id      = self.__new_entry(comment)
+		self.__call(self.entries[id], comment, "Summary")
+		return id, comment
+
+	def __member_info(self, member_info):
+		"""Records what identifies the declaration of a reflected member, which inherited members share.
+
+		Member infos are not shared between elements, as they differ by the type they were reflected from."""
+		id = self.__new_entry(member_info)
+		self.entries[id][1]["Module"]        = str(member_info.Module)
+		self.entries[id][1]["MetadataToken"] = member_info.MetadataToken
+		return id
+
+	def __values(self, entry, element, *names):
+		for name in names:
+			entry[1][name] = getattr(element, name)
+
+	def __call(self, entry, element, name, *args, **kwargs):
+		result = getattr(element, name)(*args, **kwargs)
+		entry[2][(name, args, tuple(sorted(kwargs.items())))] = result
+		return result
+
+	def _record_documentation(self, documentation, entry):
+		entry[1]["Namespaces"] = self.refs(documentation.Namespaces, "namespace")
+
+	def _record_namespace(self, namespace, entry):
+		self.__values(entry, namespace, "Namespace")
+		entry[1]["Documentation"]    = self.ref(namespace.Documentation, "documentation")
+		entry[1]["Types"]            = self.refs(namespace.Types, "type")
+		entry[1]["ExtensionMethods"] = self.refs(namespace.ExtensionMethods, "method")
+		self.__call(entry, namespace, "Filename")
+		self.__call(entry, namespace, "Filename", prefix = "ExtensionMethods")
+		self.__call(entry, namespace, "Filename", prefix = "ClassDiagram")
+		self.__call(entry, namespace, "ToHtml")
+
+	def _record_type_ref(self, type_element, entry):
+		"""Records what is needed to link to a type, e.g. a base type or a parameter type."""
+		self.__values(entry, type_element, "IsLocalType")
+		entry[1]["BaseType"] = self.ref(type_element.BaseType, "type_ref")
+		self.__call(entry, type_element, "ToHtml")
+		self.__call(entry, type_element, "ToString")
+
+	def _record_type(self, type_element, entry):
+		"""Records a documented type, which gets its own pages."""
+		self.ref(type_element, "type_ref")
+		self.__values(entry, type_element,
+			"TypeKind", "IsClass", "IsInterface", "IsEnum", "IsStatic", "IsGenericType", "IsGenericTypeDefinition")
+		entry[1]["Documentation"]    = self.ref(type_element.Documentation, "documentation")
+		entry[1]["Assembly"]         = self.ref(type_element.Assembly, "assembly")
+		entry[1]["Constructors"]     = self.refs(type_element.Constructors, "constructor")
+		entry[1]["Properties"]       = self.refs(type_element.Properties, "property")
+		entry[1]["Methods"]          = self.refs(type_element.Methods, "method")
+		entry[1]["ExtensionMethods"] = self.refs(type_element.ExtensionMethods, "method")
+		entry[1]["EnumMembers"]      = self.refs(type_element.EnumMembers, "enum_member")
+
+		generic_arguments = type_element.GetGenericArguments()
+		comment_id, comment = self.__comment(type_element)
+		for t in generic_arguments:
+			self.__call(self.entries[comment_id], comment, "TypeParam", t.Name)
+		entry[1]["XmlComment"] = ("e", comment_id)
+
+		for format in [ "f", "s" ]:
+			self.__call(entry, type_element, "ToString", format)
+		for prefix in [ "Constructors", "Properties", "Methods" ]:
+			self.__call(entry, type_element, "Filename", prefix = prefix)
+		self.__call(entry, type_element, "Filename")
+		self.__call(entry, type_element, "ToSyntax")
+		self.__call(entry, type_element, "HasAttribute", "System.FlagsAttribute")
+		entry[2][("GetInterfaces", (), ())]        = self.refs(type_element.GetInterfaces(), "type_ref")
+		entry[2][("GetChildTypes", (), ())]        = self.refs(type_element.GetChildTypes(), "type_ref")
+		entry[2][("GetDescendantTypes", (), ())]   = self.refs(type_element.GetDescendantTypes(), "type_ref")
+		entry[2][("GetGenericArguments", (), ())]  = self.refs(generic_arguments, "generic_argument")
+
+	def _record_generic_argument(self, type_element, entry):
+		self.ref(type_element, "type_ref")
+		self.__values(entry, type_element, "Name")
+		entry[1]["GenericParameterAttributes"] = int(type_element.GenericParameterAttributes)
+		entry[2][("GetGenericParameterConstraints", (), ())] = self.refs(
+			type_element.GetGenericParameterConstraints(), "type_ref")
+
+	def _record_member(self, member, entry, sections, has_parameters):
+		self.__values(entry, member, "Name", "IsInherited")
+		entry[1]["Documentation"]    = self.ref(member.Documentation, "documentation")
+		entry[1]["DeclaringType"]    = self.ref(member.DeclaringType, "type_ref")
+		entry[1]["OwnerType"]        = self.ref(member.OwnerType, "type")
+		entry[1]["NamespaceElement"] = self.ref(member.NamespaceElement, "namespace")
+		entry[2][("GetAccess", (), ())] = self.ref(member.GetAccess(), "access")
+		self.__call(entry, member, "ToHtml")
+		entry[1]["Member"] = ("e", self.__member_info(member.Member))
+
+		comment_id, comment = self.__comment(member)
+		entry[1]["XmlComment"] = ("e", comment_id)
+		if member.IsInherited:
+			# inherited members are only listed in tables, they don't get their own page
+			return
+
+		for section in sections:
+			self.__call(self.entries[comment_id], comment, "Section", section)
+
+		self.__call(entry, member, "Filename")
+		self.__call(entry, member, "ToSyntax")
+		if has_parameters:
+			parameters = member.GetParameters()
+			for parameter in parameters:
+				self.__call(self.entries[comment_id], comment, "Param", parameter.Name)
+			self.__call(entry, member, "ToSignature")
+			entry[2][("GetParameters", (), ())] = self.refs(parameters, "parameter")
+
+	def _record_constructor(self, constructor, entry):
+		self._record_member(constructor, entry, [ "remarks", "example" ], True)
+
+	def _record_property(self, property, entry):
+		self._record_member(property, entry, [], False)
+		entry[1]["PropertyType"] = self.ref(property.PropertyType, "type_ref")
+
+	def _record_method(self, method, entry):
+		self._record_member(method, entry, [ "remarks", "example", "returns" ], True)
+		self.__values(entry, method, "IsStatic")
+		if not method.IsInherited:
+			entry[1]["ReturnType"] = self.ref(method.ReturnType, "type_ref")
+
+	def _record_enum_member(self, enum_member, entry):
+		self.__values(entry, enum_member, "Name", "Value")
+		entry[1]["XmlComment"] = ("e", self.__comment(enum_member)[0])
+
+	def _record_parameter(self, parameter, entry):
+		self.__values(entry, parameter, "Name")
+		entry[1]["ParameterType"] = self.ref(parameter.ParameterType, "type_ref")
+
+	def _record_assembly(self, assembly, entry):
+		self.__call(entry, assembly, "ToString")
+
+	def _record_access(self, access, entry):
+		self.__call(entry, access, "ToString")
+		self.__call(entry, access, "ToAccessString")
+
+
+class SnapshotElement(object):
+	"""An element read from a snapshot.
+
+	It has the recorded properties as attributes and answers the recorded
+	method calls; the class name is the one of the recorded element."""
+	def __getattr__(self, name):
+		if name in self.__dict__["_methods"]:
+			return lambda *args, **kwargs: self.__call(name, args, kwargs)
+
+		raise AttributeError("%s.%s was not recorded in the snapshot" % (type(self).__name__, name))
+
+	def __call(self, name, args, kwargs):
+		key = (name, args, tuple(sorted(kwargs.items())))
+		try:
+			return self._calls[key]
+		except KeyError:
+			raise AttributeError("%s.%s%r was not recorded in the snapshot" % (type(self).__name__, name, args))
+
+def read_snapshot(filename):
+	"""Reads a snapshot written by SnapshotWriter and returns its documentation element."""
+	f = open(filename, 'rb')
+	data = marshal.load(f)
+	f.close()
+
+	if data.get("format") != SNAPSHOT_FORMAT:
+		raise ValueError("%s is not a snapshot of this version of IglooCastle" % filename)
+
+	classes  = {}
+	elements = []
+	for kind, values, calls in data["entries"]:
+		cls = classes.get(kind)
+		if cls is None:
+			cls = classes[kind] = type(str(kind), (SnapshotElement,), {})
+		elements.append(cls())
+
+	def decode(value):
+		if isinstance(value, tuple):
+			return elements[value[1]]
+		elif isinstance(value, list):
+			return [ decode(v) for v in value ]
+		else:
+			return value
+
+	for element, (kind, values, calls) in zip(elements, data["entries"]):
+		for name, value in values.items():
+			element.__dict__[name] = decode(value)
+		element.__dict__["_calls"]   = dict((key, decode(value)) for key, value in calls.items())
+		element.__dict__["_methods"] = set(key[0] for key in calls)
+
+	return elements[data["root"]]
@@ -0,0 +1,177 @@
+﻿using IglooCastle.CLI;
+using IglooCastle.Demo;
+using NUnit.Framework;
+using System;
+using System.Linq;
+
+namespace IglooCastle.Tests
+{
+	[TestFixture]
+	public class CrefResolverTest : TestBase
+	{
+		[Test]
+		public void TestType()
+		{
+			Assert.AreSame(
+				Documentation.Find(typeof(Documentation)),
+				Documentation.Crefs.Resolve("T:IglooCastle.CLI.Documentation"));
+		}
+
+		[Test]
+		public void TestExternalType()
+		{
+			object element = Documentation.Crefs.Resolve("T:System.String");
+			Assert.IsInstanceOf(typeof(TypeElement), element);
+			Assert.AreEqual(typeof(string), ((TypeElement)element).Member);
+			Assert.IsFalse(((TypeElement)element).IsLocalType);
+		}
+
+		[Test]
+		public void TestMethod()
+		{
+			MethodElement method = (MethodElement)Documentation.Crefs.Resolve("M:IglooCastle.CLI.Documentation.Find(System.Type)");
+			Assert.AreEqual("Find", method.Name);
+			Assert.AreEqual(typeof(Documentation), method.OwnerType.Member);
+		}
+
+		[Test]
+		public void TestGenericType()
+		{
+			MethodElement method = (MethodElement)Documentation.Crefs.Resolve("M:IglooCastle.CLI.DocumentationElement`1.ToSignature(System.Boolean)");
+			Assert.AreEqual("ToSignature", method.Name);
+			Assert.IsFalse(method.IsInherited);
+		}
+
+		[Test]
+		public void TestConstructor()
+		{
+			Assert.IsInstanceOf(typeof(ConstructorElement), Documentation.Crefs.Resolve("M:IglooCastle.CLI.Documentation.#ctor"));
+			Assert.IsInstanceOf(typeof(ConstructorElement), Documentation.Crefs.Resolve("M:IglooCastle.CLI.Documentation.#ctor()"));
+		}
+
+		[Test]
+		public void TestProperty()
+		{
+			PropertyElement property = (PropertyElement)Documentation.Crefs.Resolve("P:IglooCastle.CLI.Options.Snapshot");
+			Assert.AreEqual("Snapshot", property.Name);
+		}
+
+		[Test]
+		public void TestEnumMember()
+		{
+			EnumMemberElement enumMember = (EnumMemberElement)Documentation.Crefs.Resolve("F:IglooCastle.CLI.Elements.Namespace");
+			Assert.AreEqual(1, enumMember.Value);
+		}
+
+		[Test]
+		public void TestMissing()
+		{
+			Assert.IsNull(Documentation.Crefs.Resolve("M:IglooCastle.CLI.Documentation.Missing"));
+			Assert.IsNull(Documentation.Crefs.Print("M:IglooCastle.CLI.Documentation.Missing"));
+			Assert.IsNull(Documentation.Crefs.Print("T:IglooCastle.CLI.Missing"));
+		}
+
+		[Test]
+		public void TestUnresolved()
+		{
+			Documentation.Crefs.Resolve("M:IglooCastle.CLI.Documentation.Missing");
+			Documentation.Crefs.Resolve("T:IglooCastle.CLI.Documentation");
+			Documentation.Crefs.Resolve("M:IglooCastle.CLI.Documentation.Missing");
+
+			// every miss is reported once
+			CollectionAssert.AreEqual(new[] { "M:IglooCastle.CLI.Documentation.Missing" }, Documentation.Crefs.TakeUnresolved());
+			CollectionAssert.IsEmpty(Documentation.Crefs.TakeUnresolved());
+		}
+
+		[Test]
+		public void TestXmlComment()
+		{
+			PropertyElement property = Documentation.Find(typeof(Options)).Properties.Single(p => p.Name == "DumpSnapshot");
+			StringAssert.Contains(">Snapshot</a>", property.XmlComment.Summary());
+		}
+
+		[Test]
+		public void TestNestedTypeOfGenericType()
+		{
+			MethodElement method = (MethodElement)Documentation.Crefs.Resolve(
+				"M:IglooCastle.Demo.GenericNestingDemo`1.CopyNested(IglooCastle.Demo.GenericNestingDemo{System.Int32}.NestedDemo)");
+			Assert.AreEqual("CopyNested", method.Name);
+		}
+
+		[Test]
+		public void TestDeclaringGenericType()
+		{
+			MethodElement method = (MethodElement)Documentation.Crefs.Resolve(
+				"M:IglooCastle.Demo.GenericNestingDemo`1.Copy(IglooCastle.Demo.GenericNestingDemo{`0},IglooCastle.Demo.GenericNestingDemo{`0}.NestedDemo)");
+			Assert.AreEqual("Copy", method.Name);
+		}
+
+		[Test]
+		public void TestExplicitImplementation()
+		{
+			MethodElement method = (MethodElement)Documentation.Crefs.Resolve(
+				"M:IglooCastle.Demo.ExplicitImplementationDemo.System#IDisposable#Dispose");
+			Assert.AreEqual("System.IDisposable.Dispose", method.Member.Name);
+
+			method = (MethodElement)Documentation.Crefs.Resolve(
+				"M:IglooCastle.Demo.ExplicitImplementationDemo.System#IComparable{System#String}#CompareTo(System.String)");
+			Assert.AreEqual(typeof(ExplicitImplementationDemo), method.OwnerType.Member);
+			StringAssert.Contains(">ExplicitImplementationDemo</a>.", Documentation.Crefs.Print(
+				"M:IglooCastle.Demo.ExplicitImplementationDemo.System#IDisposable#Dispose"));
+		}
+
+		[Test]
+		public void TestConversionOperator()
+		{
+			MethodElement method = (MethodElement)Documentation.Crefs.Resolve(
+				"M:IglooCastle.Demo.ExplicitImplementationDemo.op_Implicit(IglooCastle.Demo.ExplicitImplementationDemo)~System.Int32");
+			Assert.AreEqual(typeof(int), method.Member.ReturnType);
+
+			method = (MethodElement)Documentation.Crefs.Resolve(
+				"M:IglooCastle.Demo.ExplicitImplementationDemo.op_Explicit(IglooCastle.Demo.ExplicitImplementationDemo)~System.String");
+			Assert.AreEqual(typeof(string), method.Member.ReturnType);
+		}
+
+		[Test]
+		public void TestMergedDocumentation()
+		{
+			Documentation first = new Documentation();
+			first.Types = new[] { new TypeElement(first, typeof(CalculatorDemo)) };
+			Documentation second = new Documentation();
+			second.Types = new[] { new TypeElement(second, typeof(DemoStruct)) };
+
+			Documentation merged = Documentation.Merge(new[] { first, second });
+			first.ResolveCrefsWith(merged);
+
+			// a comment of the first assembly can refer to a type of the second
+			Assert.AreSame(merged.Crefs, first.Crefs);
+			Assert.AreSame(merged.Find(typeof(DemoStruct)), first.Crefs.Resolve("T:IglooCastle.Demo.DemoStruct"));
+		}
+
+		[Test]
+		public void TestMergeKeepsCrefs()
+		{
+			Documentation first = new Documentation();
+			first.Types = new[] { new TypeElement(first, typeof(CalculatorDemo)) };
+			Documentation second = new Documentation();
+			second.Types = new[] { new TypeElement(second, typeof(DemoStruct)) };
+
+			CrefResolver crefs = first.Crefs;
+			Documentation merged = first.Merge(second);
+
+			// merging doesn't change what the comments of the merged documentations refer to
+			Assert.AreSame(crefs, first.Crefs);
+			Assert.AreNotSame(merged.Crefs, first.Crefs);
+			Assert.AreSame(merged.Find(typeof(DemoStruct)), merged.Crefs.Resolve("T:IglooCastle.Demo.DemoStruct"));
+			Assert.AreNotSame(merged.Find(typeof(DemoStruct)), first.Crefs.Resolve("T:IglooCastle.Demo.DemoStruct"));
+		}
+
+		[Test]
+		public void TestPrint()
+		{
+			string html = Documentation.Crefs.Print("M:IglooCastle.CLI.Documentation.Find(System.Type)");
+			StringAssert.StartsWith("<a href=", html);
+			Assert.AreSame(html, Documentation.Crefs.Print("M:IglooCastle.CLI.Documentation.Find(System.Type)"));
+		}
+	}
+}
@@ -0,0 +1,115 @@
+using System;
+using System.Diagnostics;
+using System.Linq;
+using System.Xml;
+using IglooCastle.CLI;
+using NUnit.Framework;
+
+namespace IglooCastle.Tests
+{
+	/// <summary>
+	/// Measures the latency of type, XML comment and cref lookups,
+	/// compared to a linear scan, an XPath query and resolving every cref again.
+	/// </summary>
+	[TestFixture]
+	[Explicit]
+	[Category("Benchmark")]
+	public class DocumentationLookupBenchmark : TestBase
+	{
+		private const int Iterations = 1000;
+
+		[Test]
+		public void FindType()
+		{
+			Type[] types = Documentation.Types.Select(t => t.Member).ToArray();
+
+			Measure("Documentation.Find(Type)", types.Length, () =>
+			{
+				foreach (Type type in types)
+				{
+					Documentation.Find(type);
+				}
+			});
+
+			Measure("linear scan", types.Length, () =>
+			{
+				foreach (Type type in types)
+				{
+					Documentation.Types.FirstOrDefault(t => t.Member == type);
+				}
+			});
+		}
+
+		[Test]
+		public void XmlComment()
+		{
+			TypeElement[] types = Documentation.Types.ToArray();
+			XmlDocument[] sources = Documentation.DocumentationSources.Select(source =>
+			{
+				XmlDocument doc = new XmlDocument();
+				doc.Load(source.FileName);
+				return doc;
+			}).ToArray();
+
+			Measure("TypeElement.XmlComment", types.Length, () =>
+			{
+				foreach (TypeElement type in types)
+				{
+					Assert.IsNotNull(type.XmlComment);
+				}
+			});
+
+			Measure("XPath query", types.Length, () =>
+			{
+				foreach (TypeElement type in types)
+				{
+					string selector = "//member[@name=\"T:" + type.Member.FullName + "\"]";
+					sources.Select(doc => doc.SelectSingleNode(selector)).FirstOrDefault(n => n != null);
+				}
+			});
+		}
+
+		[Test]
+		public void Cref()
+		{
+			string[] crefs = Documentation.Types.Select(t => "T:" + t.Member.FullName).ToArray();
+
+			Measure("CrefResolver.Print", crefs.Length, () =>
+			{
+				foreach (string cref in crefs)
+				{
+					Documentation.Crefs.Print(cref);
+				}
+			});
+
+			Measure("resolve and print", crefs.Length, () =>
+			{
+				foreach (string cref in crefs)
+				{
+					// as XmlComment did before the cache, without the console line of the types it can't find
+					Type type = Type.GetType(cref.Substring(2), false);
+					if (type != null)
+					{
+						Documentation.Find(type).ToHtml();
+					}
+				}
+			});
+		}
+
+		private static void Measure(string name, int lookupsPerIteration, Action action)
+		{
+			// warm up
+			action();
+
+			Stopwatch stopwatch = Stopwatch.StartNew();
+			for (int i = 0; i < Iterations; i++)
+			{
+				action();
+			}
+
+			stopwatch.Stop();
+			double nanoseconds = stopwatch.Elapsed.TotalMilliseconds * 1000000.0 / (Iterations * (double)lookupsPerIteration);
+			Console.WriteLine("{0,-25} {1,10:F0} ns per lookup", name, nanoseconds);
+		}
+	}
+}
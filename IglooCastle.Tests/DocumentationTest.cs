@@ -1,6 +1,10 @@
 ﻿using IglooCastle.CLI;
 using NUnit.Framework;
 using System;
+using System.Linq;
+using System.IO;
+using System.Reflection;
+using IglooCastle.Demo;
 
 namespace IglooCastle.Tests
 {
@@ -18,5 +22,60 @@ namespace IglooCastle.Tests
 			Assert.IsNotNull(sysTypeElement);
 			Assert.IsNull(sysTypeElement.Filename());
 		}
+
+		[Test]
+		public void FindTypeAfterMerge()
+		{
+			var merged = new Documentation().Merge(Documentation);
+			Assert.AreSame(Documentation.Find(typeof(Documentation)), merged.Find(typeof(Documentation)));
+		}
+
+		[Test]
+		public void MergeMany()
+		{
+			var other = new Documentation();
+			other.Scan(typeof(Assert).Assembly);
+			var merged = Documentation.Merge(new[] { Documentation, other, Documentation });
+			var pairwise = new Documentation().Merge(Documentation).Merge(other).Merge(Documentation);
+			CollectionAssert.AreEqual(pairwise.Types, merged.Types);
+			CollectionAssert.AreEqual(pairwise.Namespaces, merged.Namespaces);
+			Assert.AreEqual(Documentation.Types.Count + other.Types.Count, merged.Types.Count);
+			Assert.AreEqual(1, merged.DocumentationSources.Count);
+		}
+
+		[Test]
+		public void XmlCommentAfterMerge()
+		{
+			var merged = new Documentation().Merge(Documentation);
+			var typeElement = new TypeElement(merged, typeof(CalculatorDemo));
+			Assert.AreEqual("Basic calculator demo.", typeElement.XmlComment.Summary());
+		}
+
+		[Test]
+		public void ReloadDocumentation()
+		{
+			var typeElement = Documentation.Find(typeof(CalculatorDemo));
+			string xml = typeElement.XmlComment.Xml;
+			Assembly assembly = typeof(Documentation).Assembly;
+			string directory = Path.Combine(Path.GetTempPath(), Path.GetRandomFileName());
+			Directory.CreateDirectory(directory);
+			try
+			{
+				// a copy of the XML file, as if it changed after a build
+				string assemblyFile = Path.Combine(directory, Path.GetFileName(assembly.Location));
+				File.WriteAllText(
+					Path.ChangeExtension(assemblyFile, "xml"),
+					File.ReadAllText(Documentation.DocumentationSources.First().FileName).Replace("Basic calculator demo.", "Changed."));
+
+				Assert.IsTrue(Documentation.ReloadDocumentationFromAssemblyFile(assembly, assemblyFile));
+				Assert.AreEqual("Changed.", typeElement.XmlComment.Summary());
+				Assert.AreNotEqual(xml, typeElement.XmlComment.Xml);
+				Assert.AreEqual(1, Documentation.DocumentationSources.Count);
+			}
+			finally
+			{
+				Directory.Delete(directory, true);
+			}
+		}
 	}
 }
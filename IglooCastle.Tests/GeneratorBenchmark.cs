@@ -0,0 +1,268 @@
+using System;
+using System.Diagnostics;
+using System.Globalization;
+using System.IO;
+using System.Linq;
+using System.Threading;
+using IglooCastle.CLI;
+using NUnit.Framework;
+
+namespace IglooCastle.Tests
+{
+	/// <summary>
+	/// Measures how fast generator.py renders documentations of different shapes.
+	/// </summary>
+	/// <remarks>
+	/// The documentations are built by fake_documentation.py, without loading any assembly.
+	/// Every run is appended to generator-benchmark.tsv in the solution directory, which git ignores,
+	/// so that the results of different commits can be compared.
+	/// </remarks>
+	[TestFixture]
+	[Explicit]
+	[Category("Benchmark")]
+	public class GeneratorBenchmark
+	{
+		private const string ResultsFile = "generator-benchmark.tsv";
+
+		private const int MemorySampleInterval = 10;
+
+		/// <summary>
+		/// The page of the "huge" shape that has 5,000 member rows.
+		/// </summary>
+		private const string HugeTypePageFile = "T_Fake.Namespace0.Type1.html";
+
+		/// <summary>
+		/// The files that app-benchmark.html needs next to the page it measures.
+		/// </summary>
+		private static readonly string[] BrowserBenchmarkFiles = { "app-benchmark.html", "app.js", "jquery-1.11.1.min.js", "style.css" };
+
+		private readonly object _peakMemoryLock = new object();
+
+		private long _peakMemory;
+
+		/// <summary>
+		/// The shapes render in the same engine, as the pages of a watch mode run do.
+		/// </summary>
+		private static readonly GeneratorLoader Loader = new GeneratorLoader(AppDomain.CurrentDomain.BaseDirectory, null);
+
+		[TestCase("namespaces")]
+		[TestCase("deep")]
+		[TestCase("wide")]
+		[TestCase("enums")]
+		[TestCase("generics")]
+		public void Generate(string shape)
+		{
+			dynamic fake = Loader.Engine.Runtime.UseFile("fake_documentation.py");
+			dynamic generator = Loader.Load();
+			object documentation = fake.build_shape(shape);
+
+			string outputDirectory = Path.Combine(Path.GetTempPath(), "igloocastle-benchmark-" + shape);
+			if (Directory.Exists(outputDirectory))
+			{
+				Directory.Delete(outputDirectory, true);
+			}
+
+			Directory.CreateDirectory(outputDirectory);
+
+			_peakMemory = GC.GetTotalMemory(true);
+			Stopwatch stopwatch = Stopwatch.StartNew();
+			using (new Timer(SampleMemory, null, 0, MemorySampleInterval))
+			{
+				generator.Generate(documentation, outputDirectory, Options.Parse(new[] { "--verbosity=0" }));
+			}
+
+			stopwatch.Stop();
+			SampleMemory(null);
+
+			FileInfo[] files = new DirectoryInfo(outputDirectory).GetFiles();
+			Assert.IsNotEmpty(files);
+
+			double seconds = stopwatch.Elapsed.TotalSeconds;
+			string result = string.Join(
+				"\t",
+				DateTime.UtcNow.ToString("s", CultureInfo.InvariantCulture),
+				Commit(),
+				shape,
+				files.Length.ToString(CultureInfo.InvariantCulture),
+				seconds.ToString("F3", CultureInfo.InvariantCulture),
+				(files.Length / seconds).ToString("F1", CultureInfo.InvariantCulture),
+				files.Sum(f => f.Length).ToString(CultureInfo.InvariantCulture),
+				(_peakMemory / 1048576.0).ToString("F1", CultureInfo.InvariantCulture));
+
+			string resultsPath = Path.Combine(SolutionDirectory(), ResultsFile);
+			if (!File.Exists(resultsPath))
+			{
+				File.WriteAllText(resultsPath, "date\tcommit\tshape\tpages\tseconds\tpages/sec\tbytes\tpeak MB" + Environment.NewLine);
+			}
+
+			string previous = File.ReadAllLines(resultsPath).LastOrDefault(line => line.Split('\t').ElementAtOrDefault(2) == shape);
+			File.AppendAllText(resultsPath, result + Environment.NewLine);
+
+			Console.WriteLine("{0}: {1} pages in {2:F3} seconds, {3:F1} pages/sec", shape, files.Length, seconds, files.Length / seconds);
+			Console.WriteLine("  this run: {0}", result);
+			if (previous != null)
+			{
+				Console.WriteLine("  previous: {0}", previous);
+			}
+
+			Directory.Delete(outputDirectory, true);
+		}
+
+		/// <summary>
+		/// Measures the memory of the navigation tree of a documentation with half a million members,
+		/// with the nodes of generator.py and with nodes that have a <c>__dict__</c>, as they had before they had <c>__slots__</c>.
+		/// </summary>
+		[Test]
+		public void NodeMemory()
+		{
+			dynamic fake = Loader.Engine.Runtime.UseFile("fake_documentation.py");
+			dynamic generator = Loader.Load();
+			object documentation = fake.build_shape("large");
+			generator.start_run(null);
+
+			// the first tree fills the caches of the documentation model, which the measured ones reuse
+			generator.count_nodes(generator.DocumentationNode(documentation));
+
+			MeasureNodes("__dict__", () => fake.build_unslotted_tree(documentation));
+			MeasureNodes("__slots__", () => generator.DocumentationNode(documentation));
+		}
+
+		/// <summary>
+		/// Writes the pages of a type with 5,000 member rows, half of them inherited, with app-benchmark.html,
+		/// which measures in a browser how long the page takes to load, to apply the filter checkboxes and to expand its biggest navigation branch.
+		/// </summary>
+		/// <remarks>
+		/// The benchmark loads the page in a frame, so the printed directory has to be served over HTTP.
+		/// </remarks>
+		[Test]
+		public void HugeTypePage()
+		{
+			dynamic fake = Loader.Engine.Runtime.UseFile("fake_documentation.py");
+			dynamic generator = Loader.Load();
+			object documentation = fake.build_shape("huge");
+
+			string outputDirectory = Path.Combine(Path.GetTempPath(), "igloocastle-benchmark-browser");
+			if (Directory.Exists(outputDirectory))
+			{
+				Directory.Delete(outputDirectory, true);
+			}
+
+			Directory.CreateDirectory(outputDirectory);
+
+			// without the shared navigation tree, every page of the shape would inline it
+			generator.Generate(documentation, outputDirectory, Options.Parse(new[] { "--verbosity=0", "--shared-nav" }));
+			foreach (string file in BrowserBenchmarkFiles)
+			{
+				File.Copy(Path.Combine(AppDomain.CurrentDomain.BaseDirectory, file), Path.Combine(outputDirectory, file), true);
+			}
+
+			string page = Path.Combine(outputDirectory, HugeTypePageFile);
+			Assert.IsTrue(File.Exists(page));
+			Console.WriteLine("{0}: {1:F1} MB", HugeTypePageFile, new FileInfo(page).Length / 1048576.0);
+			Console.WriteLine("Serve {0} over HTTP and open app-benchmark.html", outputDirectory);
+		}
+
+		/// <summary>
+		/// Measures how long it takes to start the generator from its source,
+		/// when it is compiled into the cache and when it is loaded from the cache.
+		/// </summary>
+		[Test]
+		public void Startup()
+		{
+			string cacheDirectory = Path.Combine(Path.GetTempPath(), "igloocastle-benchmark-cache");
+			if (Directory.Exists(cacheDirectory))
+			{
+				Directory.Delete(cacheDirectory, true);
+			}
+
+			MeasureStartup("source", null);
+			MeasureStartup("compile", cacheDirectory);
+			MeasureStartup("cached", cacheDirectory);
+		}
+
+		private static void MeasureStartup(string name, string cacheDirectory)
+		{
+			GeneratorLoader loader = new GeneratorLoader(AppDomain.CurrentDomain.BaseDirectory, cacheDirectory);
+			Stopwatch stopwatch = Stopwatch.StartNew();
+			Assert.IsNotNull(loader.Engine);
+			TimeSpan engine = stopwatch.Elapsed;
+			Assert.IsNotNull(loader.Load());
+			stopwatch.Stop();
+			Console.WriteLine(
+				"{0,-8} python engine {1:F3} s, generator load {2:F3} s",
+				name,
+				engine.TotalSeconds,
+				(stopwatch.Elapsed - engine).TotalSeconds);
+		}
+
+		private static void MeasureNodes(string name, Func<object> buildTree)
+		{
+			dynamic generator = Loader.Load();
+			long before = GC.GetTotalMemory(true);
+			object root = buildTree();
+			int nodes = generator.count_nodes(root);
+			long after = GC.GetTotalMemory(true);
+			GC.KeepAlive(root);
+
+			Console.WriteLine(
+				"{0,-9} {1} nodes, {2:F1} MB, {3:F0} bytes per node",
+				name,
+				nodes,
+				(after - before) / 1048576.0,
+				(after - before) / (double)nodes);
+		}
+
+		private void SampleMemory(object state)
+		{
+			long memory = GC.GetTotalMemory(false);
+			lock (_peakMemoryLock)
+			{
+				_peakMemory = Math.Max(_peakMemory, memory);
+			}
+		}
+
+		/// <summary>
+		/// Finds the directory of IglooCastle.sln, starting from the directory of the tests.
+		/// </summary>
+		private static string SolutionDirectory()
+		{
+			string baseDirectory = AppDomain.CurrentDomain.BaseDirectory;
+			for (DirectoryInfo directory = new DirectoryInfo(baseDirectory); directory != null; directory = directory.Parent)
+			{
+				if (File.Exists(Path.Combine(directory.FullName, "IglooCastle.sln")))
+				{
+					return directory.FullName;
+				}
+			}
+
+			return baseDirectory;
+		}
+
+		/// <summary>
+		/// Gets the abbreviated hash of the current git commit, or "unknown" if git is not available.
+		/// </summary>
+		private static string Commit()
+		{
+			try
+			{
+				ProcessStartInfo startInfo = new ProcessStartInfo("git", "rev-parse --short HEAD")
+				{
+					WorkingDirectory = SolutionDirectory(),
+					RedirectStandardOutput = true,
+					UseShellExecute = false
+				};
+
+				using (Process process = Process.Start(startInfo))
+				{
+					string commit = process.StandardOutput.ReadToEnd().Trim();
+					process.WaitForExit();
+					return process.ExitCode == 0 ? commit : "unknown";
+				}
+			}
+			catch (Exception)
+			{
+				return "unknown";
+			}
+		}
+	}
+}
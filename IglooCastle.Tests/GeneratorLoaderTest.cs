@@ -0,0 +1,38 @@
+﻿using System.IO;
+using IglooCastle.CLI;
+using NUnit.Framework;
+
+namespace IglooCastle.Tests
+{
+	[TestFixture]
+	public class GeneratorLoaderTest : TemporaryDirectoryTest
+	{
+		[SetUp]
+		public override void SetUp()
+		{
+			base.SetUp();
+			File.WriteAllText(Path.Combine(TemporaryDirectory, "generator.py"), "import snapshot\n");
+			File.WriteAllText(Path.Combine(TemporaryDirectory, "snapshot.py"), "VERSION = 1\n");
+		}
+
+		[Test]
+		public void CacheFile()
+		{
+			string cacheDirectory = Path.Combine(TemporaryDirectory, "cache");
+			string cacheFile = new GeneratorLoader(TemporaryDirectory, cacheDirectory).CacheFile;
+			Assert.AreEqual(cacheDirectory, Path.GetDirectoryName(cacheFile));
+			Assert.AreEqual(cacheFile, new GeneratorLoader(TemporaryDirectory, cacheDirectory).CacheFile);
+
+			// a change of any of the modules compiles them again
+			File.WriteAllText(Path.Combine(TemporaryDirectory, "snapshot.py"), "VERSION = 2\n");
+			Assert.AreNotEqual(cacheFile, new GeneratorLoader(TemporaryDirectory, cacheDirectory).CacheFile);
+		}
+
+		[Test]
+		public void NoCacheDirectory()
+		{
+			Assert.IsNull(new GeneratorLoader(TemporaryDirectory, null).CacheFile);
+			Assert.IsNull(new GeneratorLoader(TemporaryDirectory, string.Empty).CacheFile);
+		}
+	}
+}
@@ -0,0 +1,44 @@
+﻿using System;
+using IglooCastle.CLI;
+using NUnit.Framework;
+
+namespace IglooCastle.Tests
+{
+	/// <summary>
+	/// The base of the tests of generator.py, which can write files to a temporary directory.
+	/// </summary>
+	/// <remarks>
+	/// Starting the python engine and loading generator.py takes seconds,
+	/// so the tests share one engine, and only the caches of the generator are reset for every test.
+	/// </remarks>
+	public abstract class GeneratorTestBase : TemporaryDirectoryTest
+	{
+		/// <summary>
+		/// The loader of generator.py that the tests share.
+		/// </summary>
+		internal static readonly GeneratorLoader Loader = new GeneratorLoader(AppDomain.CurrentDomain.BaseDirectory, null);
+
+		/// <summary>
+		/// Gets the generator module.
+		/// </summary>
+		protected dynamic Generator
+		{
+			get { return Loader.Load(); }
+		}
+
+		/// <summary>
+		/// Gets fake_documentation.py, which builds documentations without loading any assembly.
+		/// </summary>
+		protected dynamic Fake
+		{
+			get { return Loader.Engine.Runtime.UseFile("fake_documentation.py"); }
+		}
+
+		[SetUp]
+		public override void SetUp()
+		{
+			base.SetUp();
+			Generator.start_run(null);
+		}
+	}
+}
@@ -0,0 +1,33 @@
+﻿using System.IO;
+using System.IO.Compression;
+using IglooCastle.CLI;
+using NUnit.Framework;
+
+namespace IglooCastle.Tests
+{
+	[TestFixture]
+	public class GzipCompressorTest : TemporaryDirectoryTest
+	{
+		[Test]
+		public void Compress()
+		{
+			string file = Path.Combine(TemporaryDirectory, "page.html");
+			string contents = string.Join("\n", new string('x', 1000), "<html></html>");
+			File.WriteAllText(file, contents);
+
+			GzipCompressor compressor = new GzipCompressor();
+			compressor.Compress(file);
+
+			using (GZipStream gzip = new GZipStream(File.OpenRead(file + ".gz"), CompressionMode.Decompress))
+			using (StreamReader reader = new StreamReader(gzip))
+			{
+				Assert.AreEqual(contents, reader.ReadToEnd());
+			}
+
+			Assert.AreEqual(1, compressor.Files);
+			Assert.AreEqual(new FileInfo(file).Length, compressor.UncompressedSize);
+			Assert.AreEqual(new FileInfo(file + ".gz").Length, compressor.CompressedSize);
+			Assert.IsTrue(compressor.CompressedSize < compressor.UncompressedSize);
+		}
+	}
+}
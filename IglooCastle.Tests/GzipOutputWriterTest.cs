@@ -0,0 +1,46 @@
+﻿using System.IO;
+using NUnit.Framework;
+
+namespace IglooCastle.Tests
+{
+	/// <summary>
+	/// Tests the GzipOutputWriter of generator.py.
+	/// </summary>
+	[TestFixture]
+	public class GzipOutputWriterTest : GeneratorTestBase
+	{
+		[Test]
+		public void DeletesCopiesOfFilesThatAreGone()
+		{
+			Write("index.html", "page.html");
+			Assert.IsTrue(File.Exists(Path.Combine(TemporaryDirectory, "page.html.gz")));
+
+			File.Delete(Path.Combine(TemporaryDirectory, "page.html"));
+			Write("index.html");
+			Assert.IsTrue(File.Exists(Path.Combine(TemporaryDirectory, "index.html.gz")));
+			Assert.IsFalse(File.Exists(Path.Combine(TemporaryDirectory, "page.html.gz")));
+		}
+
+		[Test]
+		public void KeepsOtherCompressedFiles()
+		{
+			string foreign = Path.Combine(TemporaryDirectory, "backup.tar.gz");
+			File.WriteAllText(foreign, "not written by IglooCastle");
+
+			Write("index.html");
+			Write("index.html");
+			Assert.IsTrue(File.Exists(foreign));
+		}
+
+		private void Write(params string[] filenames)
+		{
+			dynamic writer = Generator.GzipOutputWriter(Generator.OutputWriter(TemporaryDirectory));
+			foreach (string filename in filenames)
+			{
+				writer.write(filename, "<html></html>");
+			}
+
+			writer.close();
+		}
+	}
+}
@@ -0,0 +1,87 @@
+﻿using System.Linq;
+using NUnit.Framework;
+
+namespace IglooCastle.Tests
+{
+	/// <summary>
+	/// Tests the minification of the HTML that generator.py writes with <c>--minify</c>.
+	/// </summary>
+	[TestFixture]
+	public class HtmlMinifierTest : GeneratorTestBase
+	{
+		[Test]
+		public void TableRow()
+		{
+			Assert.AreEqual(
+				"<tr><td><a href=\"T_Foo.html\">Foo</a></td><td>A class.</td></tr>",
+				Minify("<tr>\n\t\t<td>\n\t\t\t<a href=\"T_Foo.html\">Foo</a>\n\t\t</td>\n\t\t<td>A  class.</td>\n\t</tr>\n"));
+		}
+
+		[Test]
+		public void InlineTextAcrossFragments()
+		{
+			// the whitespace between inline elements renders, so one space or newline of it is kept
+			Assert.AreEqual(
+				"<p>Adds <code>x</code> and\n<code>y</code>.</p>",
+				Minify("<p>Adds ", "<code>x</code>", " and\n\t\t", "<code>y</code>", ".</p>"));
+		}
+
+		[Test]
+		public void Comment()
+		{
+			Assert.AreEqual(
+				"<div><span>a</span></div>",
+				Minify("<div>\n\t<!-- generated\n by IglooCastle -->\n\t<span>a</span>\n</div>"));
+		}
+
+		[Test]
+		public void NonBreakingSpace()
+		{
+			Assert.AreEqual(
+				"<td>&nbsp;</td><td>a\u00a0 b</td>",
+				Minify("<td>&nbsp;</td>\n<td>a\u00a0 b</td>"));
+		}
+
+		[Test]
+		public void BlockTags()
+		{
+			// span and pre aren't blocks here, and thead isn't taken for th
+			Assert.AreEqual(
+				"<span> a </span><div>b</div><pre> c </pre><thead><th>d</th></thead>",
+				Minify("<span> a </span>\n<div> b </div>\n<pre> c </pre>\n<thead> <th> d </th> </thead>"));
+		}
+
+		[Test]
+		public void TagAcrossFragments()
+		{
+			// a tag split between fragments is left as it is; only the whitespace after it is collapsed
+			Assert.AreEqual("<td>\nx</td>", Minify("<td", ">\n  x  </td>"));
+		}
+
+		[Test]
+		public void LongFragment()
+		{
+			// long fragments are cached, and the cached form is the same
+			string row = "<tr>\n\t<td>\n\t\tx\n\t</td>\n</tr>\n";
+			string fragment = string.Concat(Enumerable.Repeat(row, 300));
+			string expected = string.Concat(Enumerable.Repeat("<tr><td>x</td></tr>", 300));
+			Assert.AreEqual(expected, Minify(fragment));
+			Assert.AreEqual(expected, Minify(fragment));
+		}
+
+		[Test]
+		public void OtherFiles()
+		{
+			dynamic writer = Generator.MemoryOutputWriter();
+			Generator.MinifyingOutputWriter(writer).write_fragments("app.js", new[] { "a  <div>\n b" });
+			Assert.AreEqual("a  <div>\n b", writer.files["app.js"]);
+		}
+
+		private string Minify(params string[] fragments)
+		{
+			dynamic writer = Generator.MemoryOutputWriter();
+			Generator.MinifyingOutputWriter(writer).write_fragments("page.html", fragments);
+			return writer.files["page.html"];
+		}
+	}
+}
@@ -0,0 +1,29 @@
+﻿using System.IO;
+using System.Threading;
+using IglooCastle.CLI;
+using NUnit.Framework;
+
+namespace IglooCastle.Tests
+{
+	[TestFixture]
+	public class InputWatcherTest : TemporaryDirectoryTest
+	{
+		[Test]
+		public void WaitForChanges()
+		{
+			string watched = Path.Combine(TemporaryDirectory, "test.xml");
+			string other = Path.Combine(TemporaryDirectory, "other.xml");
+			File.WriteAllText(watched, "<doc />");
+			using (InputWatcher watcher = new InputWatcher(new[] { watched, Path.Combine(TemporaryDirectory, "test.dll") }))
+			{
+				ThreadPool.QueueUserWorkItem(state =>
+				{
+					File.WriteAllText(other, "<doc />");
+					File.WriteAllText(watched, "<doc><member /></doc>");
+				});
+
+				CollectionAssert.AreEqual(new[] { Path.GetFullPath(watched) }, watcher.WaitForChanges());
+			}
+		}
+	}
+}
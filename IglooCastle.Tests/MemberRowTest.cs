@@ -0,0 +1,55 @@
+﻿using System;
+using NUnit.Framework;
+
+namespace IglooCastle.Tests
+{
+	/// <summary>
+	/// Tests the cache of the member rows of generator.py.
+	/// </summary>
+	[TestFixture]
+	public class MemberRowTest : GeneratorTestBase
+	{
+		[Test]
+		public void InheritedRowsAreBuiltOnce()
+		{
+			dynamic fake = Fake;
+			dynamic generator = Generator;
+
+			// a type with 5 methods and 5 properties, and two types that derive from it without adding members
+			dynamic documentation = fake.build(1, 1, 5);
+			dynamic baseType = documentation.Types[0];
+			dynamic[] derivedTypes =
+			{
+				fake.TypeElement(baseType.NamespaceElement, "Derived1", "Class", baseType),
+				fake.TypeElement(baseType.NamespaceElement, "Derived2", "Class", baseType)
+			};
+
+			int builds = 0;
+			Func<object, string> build = element =>
+			{
+				builds++;
+				return "<tr></tr>";
+			};
+
+			int misses = generator.fragment_cache.misses;
+			foreach (dynamic derivedType in derivedTypes)
+			{
+				fake._add_members(derivedType, 0, 1);
+				foreach (dynamic method in derivedType.Methods)
+				{
+					Assert.IsTrue(method.IsInherited);
+					generator.member_row("method", method, build);
+				}
+
+				foreach (dynamic property in derivedType.Properties)
+				{
+					Assert.IsTrue(property.IsInherited);
+					generator.member_row("property", property, build);
+				}
+			}
+
+			Assert.AreEqual(10, builds);
+			Assert.AreEqual(10, generator.fragment_cache.misses - misses);
+		}
+	}
+}
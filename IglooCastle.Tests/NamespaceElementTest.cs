@@ -17,6 +17,17 @@ namespace IglooCastle.Tests
 			Assert.AreEqual("IglooCastle.CLI", namespaceElement.Namespace);
 		}
 
+		[Test]
+		public void TestExtensionMethods()
+		{
+			var namespaceElement = Documentation.FindNamespace("IglooCastle.CLI");
+			var result = namespaceElement.ExtensionMethods;
+			CollectionAssert.AreEquivalent(
+				namespaceElement.Methods.Where(m => m.IsExtension()).ToList(),
+				result);
+			Assert.IsTrue(result.Any(m => m.Name == "Summary"));
+		}
+
 		[Test]
 		public void TestHtml()
 		{
@@ -1,3 +1,5 @@
+using System;
+using System.IO;
 using NUnit.Framework;
 using IglooCastle.CLI;
 
@@ -32,5 +34,189 @@ namespace IglooCastle.Tests
 
 			Assert.AreEqual("../html", options.OutputDirectory);
 		}
+
+		[Test]
+		public void ParseSharedNav()
+		{
+			Options options = Options.Parse(new[] { "test.dll", "--shared-nav" });
+			CollectionAssert.AreEqual(
+				new[] { "test.dll" },
+				options.InputAssemblies);
+
+			Assert.IsTrue(options.SharedNav);
+			Assert.IsFalse(Options.Parse(new[] { "test.dll" }).SharedNav);
+		}
+
+		[Test]
+		public void ParseJobs()
+		{
+			Options options = Options.Parse(new[] { "test.dll", "--jobs=4" });
+			CollectionAssert.AreEqual(
+				new[] { "test.dll" },
+				options.InputAssemblies);
+
+			Assert.AreEqual(4, options.Jobs);
+			Assert.AreEqual(1, Options.Parse(new[] { "test.dll" }).Jobs);
+		}
+
+		[Test]
+		public void ParseIncremental()
+		{
+			Options options = Options.Parse(new[] { "test.dll", "--incremental" });
+			Assert.IsTrue(options.Incremental);
+			Assert.IsFalse(Options.Parse(new[] { "test.dll" }).Incremental);
+		}
+
+		[Test]
+		public void ParseSnapshot()
+		{
+			Options options = Options.Parse(new[] { "test.dll", "--dump-snapshot=model.snapshot" });
+			Assert.AreEqual("model.snapshot", options.DumpSnapshot);
+			Assert.IsNull(options.Snapshot);
+
+			options = Options.Parse(new[] { "--snapshot=model.snapshot" });
+			CollectionAssert.IsEmpty(options.InputAssemblies);
+			Assert.AreEqual("model.snapshot", options.Snapshot);
+			Assert.IsNull(options.DumpSnapshot);
+		}
+
+		[Test]
+		public void ParseVerbosityAndProfile()
+		{
+			Options options = Options.Parse(new[] { "test.dll", "--verbosity=2", "--profile=profile.json" });
+			Assert.AreEqual(2, options.Verbosity);
+			Assert.AreEqual("profile.json", options.Profile);
+
+			options = Options.Parse(new[] { "test.dll" });
+			Assert.AreEqual(1, options.Verbosity);
+			Assert.IsNull(options.Profile);
+		}
+
+		[Test]
+		public void ParseFragmentCacheSize()
+		{
+			Assert.AreEqual(500, Options.Parse(new[] { "test.dll", "--fragment-cache-size=500" }).FragmentCacheSize);
+			Assert.AreEqual(0, Options.Parse(new[] { "test.dll", "--fragment-cache-size=0" }).FragmentCacheSize);
+			Assert.AreEqual(10000, Options.Parse(new[] { "test.dll" }).FragmentCacheSize);
+		}
+
+		[Test]
+		public void ParsePageSize()
+		{
+			Assert.AreEqual(200, Options.Parse(new[] { "test.dll", "--page-size=200" }).PageSize);
+			Assert.AreEqual(0, Options.Parse(new[] { "test.dll", "--page-size=0" }).PageSize);
+			Assert.AreEqual(1000, Options.Parse(new[] { "test.dll" }).PageSize);
+		}
+
+		[Test]
+		public void ParseShard()
+		{
+			Options options = Options.Parse(new[] { "test.dll", "--shard=2/4" });
+			Assert.AreEqual(2, options.ShardIndex);
+			Assert.AreEqual(4, options.ShardCount);
+			Assert.IsTrue(options.IsShard);
+
+			options = Options.Parse(new[] { "test.dll" });
+			Assert.AreEqual(1, options.ShardIndex);
+			Assert.AreEqual(1, options.ShardCount);
+			Assert.IsNull(options.Namespaces);
+			Assert.IsFalse(options.IsShard);
+		}
+
+		[Test]
+		public void ParseShardOutOfRange()
+		{
+			Assert.Throws<ArgumentException>(() => Options.Parse(new[] { "test.dll", "--shard=5/4" }));
+			Assert.Throws<ArgumentException>(() => Options.Parse(new[] { "test.dll", "--shard=0/4" }));
+			Assert.Throws<ArgumentException>(() => Options.Parse(new[] { "test.dll", "--shard=4" }));
+		}
+
+		[Test]
+		public void ParseInvalidNumbers()
+		{
+			Assert.Throws<ArgumentException>(() => Options.Parse(new[] { "test.dll", "--jobs=abc" }));
+			Assert.Throws<ArgumentException>(() => Options.Parse(new[] { "test.dll", "--jobs=" }));
+			Assert.Throws<ArgumentException>(() => Options.Parse(new[] { "test.dll", "--verbosity=loud" }));
+			Assert.Throws<ArgumentException>(() => Options.Parse(new[] { "test.dll", "--fragment-cache-size=1e6" }));
+			Assert.Throws<ArgumentException>(() => Options.Parse(new[] { "test.dll", "--page-size=" }));
+			Assert.Throws<ArgumentException>(() => Options.Parse(new[] { "test.dll", "--serve=http" }));
+		}
+
+		[Test]
+		public void ParseServeOutOfRange()
+		{
+			Assert.Throws<ArgumentException>(() => Options.Parse(new[] { "test.dll", "--serve=0" }));
+			Assert.Throws<ArgumentException>(() => Options.Parse(new[] { "test.dll", "--serve=65536" }));
+			Assert.Throws<ArgumentException>(() => Options.Parse(new[] { "test.dll", "--serve=-1" }));
+		}
+
+		[Test]
+		public void ParseNamespaces()
+		{
+			Options options = Options.Parse(new[] { "test.dll", "--namespaces=IglooCastle.CLI, IglooCastle.Tests" });
+			CollectionAssert.AreEqual(new[] { "IglooCastle.CLI", "IglooCastle.Tests" }, options.Namespaces);
+			Assert.IsTrue(options.IsShard);
+		}
+
+		[Test]
+		public void ParseServe()
+		{
+			Assert.AreEqual(0, Options.Parse(new[] { "test.dll" }).Serve);
+			Assert.AreEqual(Options.DefaultServePort, Options.Parse(new[] { "test.dll", "--serve" }).Serve);
+			Assert.AreEqual(9000, Options.Parse(new[] { "test.dll", "--serve=9000" }).Serve);
+		}
+
+		[Test]
+		public void ParseWatch()
+		{
+			Assert.IsTrue(Options.Parse(new[] { "test.dll", "--watch" }).Watch);
+			Assert.IsFalse(Options.Parse(new[] { "test.dll" }).Watch);
+		}
+
+		[Test]
+		public void ParseWatchWithPartialOutput()
+		{
+			Assert.IsTrue(Options.Parse(new[] { "test.dll", "--watch", "--gzip", "--minify", "--incremental" }).Watch);
+			Assert.Throws<ArgumentException>(() => Options.Parse(new[] { "test.dll", "--watch", "--archive=site.zip" }));
+			Assert.Throws<ArgumentException>(() => Options.Parse(new[] { "test.dll", "--watch", "--shard=1/2" }));
+			Assert.Throws<ArgumentException>(() => Options.Parse(new[] { "test.dll", "--watch", "--merge=a" }));
+		}
+
+		[Test]
+		public void ParseCompiledCache()
+		{
+			Assert.AreEqual("cache", Options.Parse(new[] { "test.dll", "--compiled-cache=cache" }).CompiledCache);
+			Assert.AreEqual(string.Empty, Options.Parse(new[] { "test.dll", "--compiled-cache=" }).CompiledCache);
+			Assert.IsNull(Options.Parse(new[] { "test.dll" }).CompiledCache);
+		}
+
+		[Test]
+		public void ParseCompression()
+		{
+			Options options = Options.Parse(new[] { "test.dll", "--gzip", "--archive=site.zip" });
+			Assert.IsTrue(options.Gzip);
+			Assert.AreEqual("site.zip", options.Archive);
+
+			options = Options.Parse(new[] { "test.dll" });
+			Assert.IsFalse(options.Gzip);
+			Assert.IsNull(options.Archive);
+		}
+
+		[Test]
+		public void ParseMinify()
+		{
+			Assert.IsTrue(Options.Parse(new[] { "test.dll", "--minify" }).Minify);
+			Assert.IsFalse(Options.Parse(new[] { "test.dll" }).Minify);
+		}
+
+		[Test]
+		public void ParseMerge()
+		{
+			string value = "shard1" + Path.PathSeparator + "shard2";
+			Options options = Options.Parse(new[] { "--snapshot=model.snapshot", "--merge=" + value });
+			CollectionAssert.AreEqual(new[] { "shard1", "shard2" }, options.Merge);
+			Assert.IsFalse(options.IsShard);
+			Assert.IsNull(Options.Parse(new[] { "test.dll" }).Merge);
+		}
 	}
 }
@@ -0,0 +1,30 @@
+﻿using System.Text;
+using NUnit.Framework;
+
+namespace IglooCastle.Tests
+{
+	/// <summary>
+	/// Tests the search index that generator.py writes for app.js.
+	/// </summary>
+	[TestFixture]
+	public class SearchIndexTest : GeneratorTestBase
+	{
+		[Test]
+		public void TitlesAreText()
+		{
+			dynamic documentation = Fake.build(1, 1, 1, generic_arguments: 1);
+			dynamic writer = Generator.MemoryOutputWriter();
+			Generator.write_search_index(Generator.DocumentationNode(documentation), writer);
+
+			StringBuilder index = new StringBuilder();
+			foreach (dynamic filename in writer.files)
+			{
+				index.Append(writer.files[filename]);
+			}
+
+			// the title of the type page is Type0&lt;T0&gt; Class, which app.js would show escaped twice
+			StringAssert.Contains("\"Type0<T0> Class\"", index.ToString());
+			StringAssert.DoesNotContain("&lt;", index.ToString());
+		}
+	}
+}
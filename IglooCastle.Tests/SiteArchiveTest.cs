@@ -0,0 +1,41 @@
+﻿using System.IO;
+using System.IO.Compression;
+using System.Linq;
+using System.Text;
+using IglooCastle.CLI;
+using NUnit.Framework;
+
+namespace IglooCastle.Tests
+{
+	[TestFixture]
+	public class SiteArchiveTest : TemporaryDirectoryTest
+	{
+		[Test]
+		public void Add()
+		{
+			string fileName = Path.Combine(TemporaryDirectory, "site.zip");
+			string style = Path.Combine(TemporaryDirectory, "style.css");
+			File.WriteAllText(style, "body { }");
+
+			SiteArchive archive = new SiteArchive(fileName);
+			using (archive)
+			{
+				archive.Add("index.html", Encoding.UTF8.GetBytes("<html></html>"));
+				archive.AddFile("style.css", style);
+			}
+
+			Assert.AreEqual(2, archive.Files);
+			Assert.AreEqual(21, archive.UncompressedSize);
+			Assert.AreEqual(new FileInfo(fileName).Length, archive.CompressedSize);
+
+			using (ZipArchive zip = new ZipArchive(File.OpenRead(fileName), ZipArchiveMode.Read))
+			{
+				CollectionAssert.AreEqual(new[] { "index.html", "style.css" }, zip.Entries.Select(e => e.FullName));
+				using (StreamReader reader = new StreamReader(zip.GetEntry("index.html").Open()))
+				{
+					Assert.AreEqual("<html></html>", reader.ReadToEnd());
+				}
+			}
+		}
+	}
+}
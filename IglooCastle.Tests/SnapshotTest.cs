@@ -0,0 +1,29 @@
+﻿using System.IO;
+using IglooCastle.CLI;
+using IglooCastle.Demo;
+using NUnit.Framework;
+
+namespace IglooCastle.Tests
+{
+	[TestFixture]
+	public class SnapshotTest : GeneratorTestBase
+	{
+		[Test]
+		public void RenderFromSnapshot()
+		{
+			Documentation documentation = TestBase.LoadDocumentation();
+			string snapshot = Path.Combine(TemporaryDirectory, "documentation.snapshot");
+			Generator.DumpSnapshot(documentation, snapshot);
+			Assert.IsTrue(File.Exists(snapshot));
+
+			string outputDirectory = Path.Combine(TemporaryDirectory, "output");
+			Directory.CreateDirectory(outputDirectory);
+			Generator.Generate(Generator.LoadSnapshot(snapshot), outputDirectory, Options.Parse(new[] { "--verbosity=0" }));
+
+			string page = Path.Combine(outputDirectory, documentation.Find(typeof(CalculatorDemo)).Filename());
+			Assert.IsTrue(File.Exists(page));
+			StringAssert.Contains("Basic calculator demo.", File.ReadAllText(page));
+			StringAssert.Contains("Adds two numbers.", File.ReadAllText(page));
+		}
+	}
+}
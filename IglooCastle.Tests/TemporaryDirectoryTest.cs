@@ -0,0 +1,29 @@
+﻿using System.IO;
+using NUnit.Framework;
+
+namespace IglooCastle.Tests
+{
+	/// <summary>
+	/// The base of the tests that write files, to a new temporary directory for every test.
+	/// </summary>
+	public abstract class TemporaryDirectoryTest
+	{
+		/// <summary>
+		/// Gets the directory of the current test, which is deleted after it.
+		/// </summary>
+		protected string TemporaryDirectory { get; private set; }
+
+		[SetUp]
+		public virtual void SetUp()
+		{
+			TemporaryDirectory = Path.Combine(Path.GetTempPath(), Path.GetRandomFileName());
+			Directory.CreateDirectory(TemporaryDirectory);
+		}
+
+		[TearDown]
+		public virtual void TearDown()
+		{
+			Directory.Delete(TemporaryDirectory, true);
+		}
+	}
+}
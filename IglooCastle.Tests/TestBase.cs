@@ -19,19 +19,29 @@ namespace IglooCastle.Tests
 		[SetUp]
 		public virtual void SetUp()
 		{
-			_documentation = new Documentation();
+			_documentation = LoadDocumentation();
+		}
+
+		/// <summary>
+		/// Scans IglooCastle.CLI and loads its XML documentation.
+		/// </summary>
+		internal static Documentation LoadDocumentation()
+		{
+			Documentation documentation = new Documentation();
 
 			Assembly assembly = typeof(Documentation).Assembly;
-			_documentation.Scan(assembly);
+			documentation.Scan(assembly);
 
-			if (!_documentation.AddDocumentation(assembly))
+			if (!documentation.AddDocumentation(assembly))
 			{
 				string assemblyFile = Path.Combine(Environment.CurrentDirectory, Path.GetFileName(assembly.Location));
-				if (!_documentation.AddDocumentationFromAssemblyFile(assembly, assemblyFile))
+				if (!documentation.AddDocumentationFromAssemblyFile(assembly, assemblyFile))
 				{
 					Assert.Fail("Could not find documentation");
 				}
 			}
+
+			return documentation;
 		}
 	}
 }
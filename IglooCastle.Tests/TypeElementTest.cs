@@ -239,6 +239,21 @@ namespace IglooCastle.Tests
 				result);
 		}
 
+		[Test]
+		public void TestExtensionMethodsOfInterface()
+		{
+			var typeElement = Documentation.Find(typeof(XmlComment));
+			var result = typeElement.ExtensionMethods.Select(m => m.Name);
+			CollectionAssert.AreEqual(new[] { "Param", "Returns", "Summary", "TypeParam" }, result);
+		}
+
+		[Test]
+		public void TestExtensionMethodsNone()
+		{
+			var typeElement = Documentation.Find(typeof(Sample));
+			Assert.AreEqual(0, typeElement.ExtensionMethods.Count);
+		}
+
 		[Test]
 		public void TestSyntaxOfStruct()
 		{
@@ -0,0 +1,70 @@
+using System;
+using System.Diagnostics;
+using System.Linq;
+using System.Reflection;
+using System.Reflection.Emit;
+using IglooCastle.CLI;
+using NUnit.Framework;
+
+namespace IglooCastle.Tests
+{
+	/// <summary>
+	/// Measures how the derived types queries scale with the number of types.
+	/// </summary>
+	[TestFixture]
+	[Explicit]
+	[Category("Benchmark")]
+	public class TypeHierarchyBenchmark
+	{
+		[Test]
+		public void DerivedTypesOfSyntheticAssemblies()
+		{
+			foreach (int typeCount in new[] { 1000, 2500, 5000, 10000 })
+			{
+				Documentation documentation = new Documentation();
+				documentation.Scan(CreateAssembly(typeCount));
+
+				Stopwatch stopwatch = Stopwatch.StartNew();
+				int children = documentation.Types.Sum(t => t.GetChildTypes().Count);
+				int descendants = documentation.Types.Sum(t => t.GetDescendantTypes().Count);
+				stopwatch.Stop();
+
+				Console.WriteLine(
+					"{0,6} types: {1,6} children, {2,7} descendants in {3,6} ms",
+					typeCount,
+					children,
+					descendants,
+					stopwatch.ElapsedMilliseconds);
+
+				// every type but the roots has exactly one parent
+				Assert.AreEqual(typeCount - typeCount / 10, children);
+			}
+		}
+
+		/// <summary>
+		/// Creates an assembly with the given number of classes.
+		/// Every tenth class derives from object, the rest derive from one of the previous classes.
+		/// </summary>
+		private static Assembly CreateAssembly(int typeCount)
+		{
+			AssemblyBuilder assemblyBuilder = AssemblyBuilder.DefineDynamicAssembly(
+				new AssemblyName("Synthetic" + typeCount),
+				AssemblyBuilderAccess.Run);
+			ModuleBuilder moduleBuilder = assemblyBuilder.DefineDynamicModule("Synthetic" + typeCount);
+
+			Random random = new Random(typeCount);
+			Type[] types = new Type[typeCount];
+			for (int i = 0; i < typeCount; i++)
+			{
+				Type parent = i % 10 == 0 ? typeof(object) : types[random.Next(i)];
+				TypeBuilder typeBuilder = moduleBuilder.DefineType(
+					string.Format("Synthetic.Namespace{0}.Type{1}", i % 20, i),
+					TypeAttributes.Public | TypeAttributes.Class,
+					parent);
+				types[i] = typeBuilder.CreateType();
+			}
+
+			return assemblyBuilder;
+		}
+	}
+}
@@ -0,0 +1,127 @@
+﻿using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.IO;
+using System.Xml;
+using IglooCastle.CLI;
+using NUnit.Framework;
+
+namespace IglooCastle.Tests
+{
+	/// <summary>
+	/// Measures the memory and time it takes to load a large XML documentation file,
+	/// as a <see cref="XmlCommentStore"/> compared to an indexed <see cref="XmlDocument"/>.
+	/// </summary>
+	[TestFixture]
+	[Explicit]
+	[Category("Benchmark")]
+	public class XmlCommentStoreBenchmark
+	{
+		private const int Members = 200000;
+
+		private const int Lookups = 100000;
+
+		private string _file;
+
+		[SetUp]
+		public void SetUp()
+		{
+			_file = Path.Combine(Path.GetTempPath(), Path.GetRandomFileName() + ".xml");
+			using (XmlWriter writer = XmlWriter.Create(_file, new XmlWriterSettings { Indent = true }))
+			{
+				writer.WriteStartElement("doc");
+				writer.WriteStartElement("members");
+				for (int i = 0; i < Members; i++)
+				{
+					writer.WriteStartElement("member");
+					writer.WriteAttributeString("name", "M:Fake.Namespace.Type" + (i / 20) + ".Method" + i + "(System.String,System.Int32)");
+					writer.WriteStartElement("summary");
+					writer.WriteString("Does something with the given ");
+					writer.WriteStartElement("see");
+					writer.WriteAttributeString("cref", "T:System.String");
+					writer.WriteEndElement();
+					writer.WriteString(" and number.");
+					writer.WriteEndElement();
+					writer.WriteStartElement("param");
+					writer.WriteAttributeString("name", "text");
+					writer.WriteString("The text to do something with.");
+					writer.WriteEndElement();
+					writer.WriteStartElement("param");
+					writer.WriteAttributeString("name", "number");
+					writer.WriteString("The number of times to do it.");
+					writer.WriteEndElement();
+					writer.WriteElementString("returns", "The result.");
+					writer.WriteEndElement();
+				}
+
+				writer.WriteEndElement();
+				writer.WriteEndElement();
+			}
+		}
+
+		[TearDown]
+		public void TearDown()
+		{
+			File.Delete(_file);
+		}
+
+		[Test]
+		public void LoadXmlDocument()
+		{
+			Measure("XmlDocument", () =>
+			{
+				XmlDocument doc = new XmlDocument();
+				doc.Load(_file);
+				Dictionary<string, XmlElement> members = new Dictionary<string, XmlElement>(StringComparer.Ordinal);
+				foreach (XmlElement member in doc.SelectNodes("//member[@name]"))
+				{
+					members[member.GetAttribute("name")] = member;
+				}
+
+				return members;
+			});
+		}
+
+		[Test]
+		public void LoadStore()
+		{
+			Measure("XmlCommentStore", () => XmlCommentStore.Load(_file));
+		}
+
+		[Test]
+		public void Summaries()
+		{
+			Documentation documentation = new Documentation();
+			XmlCommentStore store = XmlCommentStore.Load(_file);
+			Stopwatch stopwatch = Stopwatch.StartNew();
+			for (int i = 0; i < Lookups; i++)
+			{
+				int member = i * 7 % Members;
+				string xml = store.Members["M:Fake.Namespace.Type" + (member / 20) + ".Method" + member + "(System.String,System.Int32)"];
+				new CLI.XmlComment(documentation, xml).Summary();
+			}
+
+			stopwatch.Stop();
+			Console.WriteLine("{0} summaries in {1} ms", Lookups, stopwatch.ElapsedMilliseconds);
+		}
+
+		private void Measure(string name, Func<object> load)
+		{
+			long before = GC.GetTotalMemory(true);
+			Stopwatch stopwatch = Stopwatch.StartNew();
+			object loaded = load();
+			stopwatch.Stop();
+			long after = GC.GetTotalMemory(true);
+			GC.KeepAlive(loaded);
+
+			Console.WriteLine(
+				"{0}: {1:F1} MB file, loaded in {2} ms, {3:F1} MB before, {4:F1} MB after, {5:F1} MB retained",
+				name,
+				new FileInfo(_file).Length / 1048576.0,
+				stopwatch.ElapsedMilliseconds,
+				before / 1048576.0,
+				after / 1048576.0,
+				(after - before) / 1048576.0);
+		}
+	}
+}
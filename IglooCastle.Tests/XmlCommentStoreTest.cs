@@ -0,0 +1,39 @@
+﻿using System.IO;
+using IglooCastle.CLI;
+using NUnit.Framework;
+
+namespace IglooCastle.Tests
+{
+	[TestFixture]
+	public class XmlCommentStoreTest
+	{
+		[Test]
+		public void Load()
+		{
+			const string xml = "<?xml version=\"1.0\"?><doc><assembly><name>Test</name></assembly><members>"
+				+ "<member name=\"T:A\"><summary>First <see cref=\"T:B\"/> type.</summary></member>"
+				+ "<member name=\"T:B\"><summary>Second type.</summary></member>"
+				+ "<member><summary>No name.</summary></member>"
+				+ "<member name=\"T:A\"><summary>Duplicate.</summary></member>"
+				+ "</members></doc>";
+
+			XmlCommentStore store = XmlCommentStore.Load(new StringReader(xml));
+
+			Assert.IsNull(store.FileName);
+			Assert.AreEqual(2, store.Members.Count);
+			Assert.AreEqual("<summary>First <see cref=\"T:B\" /> type.</summary>", store.Members["T:A"]);
+			Assert.AreEqual("<summary>Second type.</summary>", store.Members["T:B"]);
+		}
+
+		[Test]
+		public void XmlComment()
+		{
+			XmlComment xmlComment = new XmlComment(
+				new Documentation(),
+				"<summary>\n  Adds two numbers.\n  </summary>\n  <param name=\"x\">The first number.</param>");
+
+			Assert.AreEqual("Adds two numbers.", xmlComment.Summary());
+			Assert.AreEqual("The first number.", xmlComment.Param("x"));
+		}
+	}
+}
@@ -0,0 +1,357 @@
+"""A stand-in for the documentation model of IglooCastle.CLI, to benchmark generator.py.
+
+build() creates a documentation of the given shape without loading any assembly.
+Its elements have the members that generator.py uses, with cheap fake values,
+so that the benchmark measures the generator and not the reflection."""
+
+class Access(object):
+	def __init__(self, name, access_string):
+		self.name          = name
+		self.access_string = access_string
+
+	def ToString(self):
+		return self.name
+
+	def ToAccessString(self):
+		return self.access_string
+
+PUBLIC    = Access("Public", "public")
+PROTECTED = Access("Family", "protected")
+
+class XmlComment(object):
+	def __init__(self, summary):
+		self.summary = summary
+
+	def Summary(self):
+		return self.summary
+
+	def Section(self, name):
+		return ""
+
+	def Param(self, name):
+		return "The %s parameter." % name
+
+	def TypeParam(self, name):
+		return "The %s type parameter." % name
+
+class Assembly(object):
+	def ToString(self):
+		return "Fake, Version=1.0.0.0, Culture=neutral, PublicKeyToken=null"
+
+ASSEMBLY = Assembly()
+
+# GenericParameterAttributes
+REFERENCE_TYPE_CONSTRAINT          = 4
+NOT_NULLABLE_VALUE_TYPE_CONSTRAINT = 8
+DEFAULT_CONSTRUCTOR_CONSTRAINT     = 16
+
+
+class Documentation(object):
+	def __init__(self):
+		self.Namespaces = []
+		self.Types      = []
+
+
+class NamespaceElement(object):
+	def __init__(self, documentation, name):
+		self.Documentation    = documentation
+		self.Namespace        = name
+		self.XmlComment       = XmlComment(None)
+		self.Types            = []
+		self.ExtensionMethods = []
+
+	def Filename(self, prefix = "N"):
+		return "%s_%s.html" % (prefix, self.Namespace)
+
+	def ToHtml(self):
+		return '<a href="%s">%s</a>' % (self.Filename(), self.Namespace)
+
+
+class ExternalTypeElement(object):
+	"""A type outside of the documentation, e.g. System.Object."""
+	IsLocalType = False
+
+	def __init__(self, full_name, base_type = None):
+		self.full_name = full_name
+		self.BaseType  = base_type
+
+	def ToString(self, format = None):
+		return self.full_name
+
+	def ToHtml(self):
+		return self.full_name
+
+OBJECT     = ExternalTypeElement("System.Object")
+VALUE_TYPE = ExternalTypeElement("System.ValueType", OBJECT)
+ENUM       = ExternalTypeElement("System.Enum", VALUE_TYPE)
+STRING     = ExternalTypeElement("System.String", OBJECT)
+INT32      = ExternalTypeElement("System.Int32", VALUE_TYPE)
+
+
+class GenericParameterElement(ExternalTypeElement):
+	def __init__(self, name, attributes, constraints):
+		ExternalTypeElement.__init__(self, name)
+		self.Name                       = name
+		self.GenericParameterAttributes = attributes
+		self.constraints                = constraints
+
+	def GetGenericParameterConstraints(self):
+		return self.constraints
+
+
+class TypeElement(object):
+	IsLocalType = True
+
+	def __init__(self, namespace, name, type_kind = "Class", base_type = OBJECT):
+		self.NamespaceElement  = namespace
+		self.Documentation     = namespace.Documentation
+		self.Name              = name
+		self.TypeKind          = type_kind
+		self.IsClass           = type_kind == "Class"
+		self.IsInterface       = type_kind == "Interface"
+		self.IsEnum            = type_kind == "Enum"
+		self.IsStatic          = False
+		self.BaseType          = base_type
+		self.Assembly          = ASSEMBLY
+		self.XmlComment        = XmlComment("Summary of %s." % name)
+		self.Constructors      = []
+		self.Properties        = []
+		self.Methods           = []
+		self.ExtensionMethods  = []
+		self.EnumMembers       = []
+		self.interfaces        = []
+		self.children          = []
+		self.generic_arguments = []
+
+	@property
+	def IsGenericType(self):
+		return len(self.generic_arguments) > 0
+
+	@property
+	def IsGenericTypeDefinition(self):
+		return self.IsGenericType
+
+	def ToString(self, format = None):
+		# HTML, as the type printer writes it
+		name = self.Name
+		if self.generic_arguments:
+			name += "&lt;%s&gt;" % ", ".join(t.Name for t in self.generic_arguments)
+
+		return name if format == "s" else self.NamespaceElement.Namespace + "." + name
+
+	def ToHtml(self):
+		return '<a href="%s">%s</a>' % (self.Filename(), self.ToString("s"))
+
+	def ToSyntax(self):
+		return "public %s %s" % (self.TypeKind.lower(), self.ToString("s"))
+
+	def Filename(self, prefix = "T"):
+		return "%s_%s.%s.html" % (prefix, self.NamespaceElement.Namespace, self.Name)
+
+	def GetInterfaces(self):
+		return list(self.interfaces)
+
+	def GetChildTypes(self):
+		return list(self.children)
+
+	def GetDescendantTypes(self):
+		result = []
+		for child in self.children:
+			result.append(child)
+			result.extend(child.GetDescendantTypes())
+		return result
+
+	def GetGenericArguments(self):
+		return list(self.generic_arguments)
+
+	def HasAttribute(self, attribute_name):
+		return self.IsEnum and attribute_name == "System.FlagsAttribute"
+
+
+class ParameterElement(object):
+	def __init__(self, name, parameter_type):
+		self.Name          = name
+		self.ParameterType = parameter_type
+
+
+class MemberInfo(object):
+	"""The declaration of a member, which the members inherited from it share."""
+	last_token = 0
+
+	def __init__(self):
+		MemberInfo.last_token += 1
+		self.Module        = ASSEMBLY
+		self.MetadataToken = MemberInfo.last_token
+
+
+class MemberElement(object):
+	PREFIX = None
+
+	def __init__(self, owner_type, name, declaring_type = None, parameters = None, access = PUBLIC, member = None):
+		self.Member           = member or MemberInfo()
+		self.OwnerType        = owner_type
+		self.DeclaringType    = declaring_type or owner_type
+		self.Documentation    = owner_type.Documentation
+		self.NamespaceElement = owner_type.NamespaceElement
+		self.Name             = name
+		self.XmlComment       = XmlComment("Summary of %s." % name)
+		self.IsInherited      = self.DeclaringType is not owner_type
+		self.parameters       = parameters or []
+		self.access           = access
+
+	def GetAccess(self):
+		return self.access
+
+	def GetParameters(self):
+		return list(self.parameters)
+
+	def Filename(self):
+		return "%s_%s.%s.%s.html" % (self.PREFIX, self.DeclaringType.NamespaceElement.Namespace, self.DeclaringType.Name, self.Name)
+
+	def ToHtml(self):
+		return '<a href="%s">%s</a>' % (self.Filename(), self.Name)
+
+	def ToSignature(self):
+		return "%s(%s)" % (self.Name, ", ".join(p.ParameterType.ToString("s") for p in self.parameters))
+
+	def ToSyntax(self):
+		return "%s %s(%s)" % (
+			self.access.ToAccessString(),
+			self.Name,
+			", ".join("%s %s" % (p.ParameterType.ToString("s"), p.Name) for p in self.parameters))
+
+	def inherited_by(self, owner_type):
+		"""Returns this member as seen from a type deriving from its declaring type."""
+		return self.__class__(owner_type, self.Name, self.DeclaringType, self.parameters, self.access, self.Member)
+
+
+class ConstructorElement(MemberElement):
+	PREFIX = "C"
+
+class MethodElement(MemberElement):
+	PREFIX   = "M"
+	IsStatic = False
+
+	@property
+	def ReturnType(self):
+		return self.parameters[0].ParameterType if self.parameters else STRING
+
+class PropertyElement(MemberElement):
+	PREFIX       = "P"
+	PropertyType = STRING
+
+	def ToSyntax(self):
+		return "%s string %s { get; set; }" % (self.access.ToAccessString(), self.Name)
+
+
+class EnumMemberElement(object):
+	def __init__(self, name, value):
+		self.Name       = name
+		self.Value      = value
+		self.XmlComment = XmlComment("Summary of %s." % name)
+
+
+def build(namespaces = 1, types = 10, members = 5, depth = 1, interfaces = 0,
+	enums = 0, enum_members = 0, generic_arguments = 0, parameters = 1):
+	"""Builds a documentation with the given shape.
+
+	Every namespace has the given number of classes, interfaces and enums.
+	The classes form inheritance chains of the given depth, and inherit the
+	methods and properties of their base types. Every class declares
+	the given number of methods and properties, with the given number of parameters,
+	and is generic with the given number of type parameters."""
+	documentation = Documentation()
+	for n in range(namespaces):
+		namespace = NamespaceElement(documentation, "Fake.Namespace%d" % n)
+		documentation.Namespaces.append(namespace)
+
+		namespace_interfaces = [ TypeElement(namespace, "IInterface%d" % i, "Interface", None) for i in range(interfaces) ]
+		namespace.Types.extend(namespace_interfaces)
+
+		previous = None
+		for t in range(types):
+			base_type = previous if t % depth else OBJECT
+			type_element = TypeElement(namespace, "Type%d" % t, base_type = base_type)
+			if base_type is not OBJECT:
+				base_type.children.append(type_element)
+
+			type_element.interfaces = namespace_interfaces[:]
+			type_element.generic_arguments = [ _generic_argument(g, namespace_interfaces) for g in range(generic_arguments) ]
+			_add_members(type_element, members, parameters)
+			namespace.Types.append(type_element)
+			previous = type_element
+
+		for e in range(enums):
+			enum = TypeElement(namespace, "Enum%d" % e, "Enum", ENUM)
+			enum.EnumMembers = [ EnumMemberElement("Member%d" % m, m) for m in range(enum_members) ]
+			namespace.Types.append(enum)
+
+		documentation.Types.extend(namespace.Types)
+
+	return documentation
+
+def _generic_argument(index, interfaces):
+	attributes = [ 0, REFERENCE_TYPE_CONSTRAINT | DEFAULT_CONSTRUCTOR_CONSTRAINT, NOT_NULLABLE_VALUE_TYPE_CONSTRAINT ][index % 3]
+	constraints = [ VALUE_TYPE ] if attributes == NOT_NULLABLE_VALUE_TYPE_CONSTRAINT else interfaces[:1]
+	return GenericParameterElement("T%d" % index, attributes, constraints)
+
+def _add_members(type_element, members, parameters):
+	parameter_types = [ STRING, INT32 ] + type_element.generic_arguments
+	def make_parameters(m):
+		return [ ParameterElement("arg%d" % p, parameter_types[(m + p) % len(parameter_types)]) for p in range(parameters) ]
+
+	type_element.Constructors = [ ConstructorElement(type_element, "Type%d" % m, parameters = make_parameters(m)) for m in range(2) ]
+	type_element.Properties = [ PropertyElement(type_element, "Property%d" % m, access = PUBLIC if m % 4 else PROTECTED)
+		for m in range(members) ]
+	type_element.Methods = [ MethodElement(type_element, "Method%d" % m, parameters = make_parameters(m), access = PUBLIC if m % 4 else PROTECTED)
+		for m in range(members) ]
+
+	base_type = type_element.BaseType
+	if base_type is not OBJECT:
+		type_element.Properties.extend(p.inherited_by(type_element) for p in base_type.Properties)
+		type_element.Methods.extend(m.inherited_by(type_element) for m in base_type.Methods)
+
+SHAPES = {
+	"namespaces": dict(namespaces = 100, types = 1, members = 2),
+	"deep":       dict(namespaces = 1, types = 30, members = 10, depth = 30),
+	"wide":       dict(namespaces = 1, types = 2, members = 300),
+	"enums":      dict(namespaces = 1, types = 2, enums = 20, enum_members = 2000),
+	"generics":   dict(namespaces = 2, types = 10, members = 5, interfaces = 3, generic_arguments = 4, parameters = 6),
+	"large":      dict(namespaces = 10, types = 500, members = 50),
+	# the page of Type1 has 5,000 member rows, half of them inherited
+	"huge":       dict(namespaces = 1, types = 2, members = 1250, depth = 2)
+}
+
+def build_shape(name):
+	"""Builds the documentation of one of the SHAPES."""
+	return build(**SHAPES[name])
+
+def build_unslotted_tree(documentation):
+	"""Builds the whole navigation tree of the documentation with nodes that have a __dict__,
+	as the nodes of generator.py had before they had __slots__, along with the EXPANDER
+	and the member filter id that every node kept then. The baseline of GeneratorBenchmark.NodeMemory."""
+	import generator
+
+	# the nodes create their children by the names of their classes;
+	# the base classes keep their names, because the classes call their __init__ by name
+	originals = dict((name, value) for name, value in vars(generator).items()
+		if isinstance(value, type) and issubclass(value, generator.NodeBase) and not value.__subclasses__())
+
+	for name, node_class in originals.items():
+		setattr(generator, name, type(name, (node_class,), { "__init__": _unslotted_init(node_class) }))
+
+	try:
+		root = generator.DocumentationNode(documentation)
+		generator.count_nodes(root)
+		return root
+	finally:
+		for name, node_class in originals.items():
+			setattr(generator, name, node_class)
+
+def _unslotted_init(node_class):
+	def __init__(self, *args):
+		node_class.__init__(self, *args)
+		self.EXPANDER = node_class.EXPANDER
+		self._NodeBase__widget_member_filter_id = 0
+
+	return __init__